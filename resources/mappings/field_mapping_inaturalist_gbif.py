@@ -14,14 +14,19 @@ Notes:
 
 import logging
 import hashlib
-from typing import Optional, Dict, Tuple
-from decimal import Decimal
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 # pylint: disable=no-member
 import lbsnstructure as lbsn
 
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
+from lbsntransform.tools.record_factory import LBSNRecordFactory
+
+if TYPE_CHECKING:
+    import numpy as np
 
 MAPPING_ID: int = 231
 TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%S"  # gbif time format used
@@ -296,6 +301,30 @@ class importer:
 
     ORIGIN_NAME = "iNaturalist"
     ORIGIN_ID = 23
+    # columns read from gbif records,
+    # only these are loaded from parquet and arrow input
+    INPUT_COLUMNS = (
+        "occurrenceID",
+        "identifiedBy",
+        "rightsHolder",
+        "recordedBy",
+        "decimalLatitude",
+        "decimalLongitude",
+        "coordinateUncertaintyInMeters",
+        "countryCode",
+        "dateIdentified",
+        "eventDate",
+        "license",
+        "species",
+        "genus",
+        "family",
+        "order",
+        "class",
+        "phylum",
+        "kingdom",
+    )
+    # records without these are skipped with --ignore_non_geotagged
+    GEOTAG_COLUMNS = ("decimalLatitude", "decimalLongitude")
 
     def __init__(
         self,
@@ -306,6 +335,8 @@ class importer:
         origin = lbsn.Origin()
         origin.origin_id = lbsn.Origin.INATURALIST
         self.origin = origin
+        # lbsn records with composite keys of origin
+        self.record_factory = LBSNRecordFactory(origin)
         # this is where all the data will be stored
         self.lbsn_records = []
         self.lbsn_relationships = []
@@ -337,6 +368,45 @@ class importer:
         lbsn_records = self.extract_gbif_occurrence(record)
         return lbsn_records
 
+    def parse_csv_batch(self, records: List[Dict[str, str]]):
+        """Entry point for batches of iNaturalist CSV data of type gbif
+
+        Geoaccuracy and license columns are converted for the whole
+        batch, lat/lng as in parse_csv_record. lbsn records are only
+        created for occurrences with a guid.
+
+        Returns lbsn records of all rows, in input order.
+        """
+        lbsn_records = []
+        if not records:
+            return lbsn_records
+        has_guid = HF.get_csv_column(records, "occurrenceID") != ""
+        for record in (record for record, guid in zip(records, has_guid) if not guid):
+            HF.check_notice_empty_post_guid(record.get("occurrenceID"))
+        post_rows = [record for record, guid in zip(records, has_guid) if guid]
+        geoaccuracies = importer.gbif_map_geoaccuracy_column(
+            HF.get_csv_column(post_rows, "coordinateUncertaintyInMeters")
+        )
+        license_ids = HF.map_column_values(
+            HF.get_csv_column(post_rows, "license"), self.lic_dict
+        )
+        for record, geoaccuracy, license_id in zip(
+            post_rows, geoaccuracies.tolist(), license_ids.tolist()
+        ):
+            post_latlng = self.gbif_extract_postlatlng(
+                lat_entry=record.get("decimalLatitude"),
+                lng_entry=record.get("decimalLongitude"),
+            )
+            lbsn_records.extend(
+                self.map_gbif_occurrence(
+                    record,
+                    post_latlng=post_latlng,
+                    geoaccuracy=geoaccuracy,
+                    license_id=license_id,
+                )
+            )
+        return lbsn_records
+
     def extract_gbif_occurrence(self, record):
         """Main function for processing iNaturalist gbif CSV data.
 
@@ -390,17 +460,33 @@ class importer:
         46 mediaType - StillImage;StillImage
         47 issue
 
+        """
+        if not HF.check_notice_empty_post_guid(record.get("occurrenceID")):
+            return None
+        post_latlng = self.gbif_extract_postlatlng(
+            lat_entry=record.get("decimalLatitude"),
+            lng_entry=record.get("decimalLongitude"),
+        )
+        geoaccuracy = importer.gbif_map_geoaccuracy(
+            record.get("coordinateUncertaintyInMeters")
+        )
+        license_id = None
+        license_ref = record.get("license")
+        if license_ref:
+            license_id = self.get_license_number_from_license_name(license_ref)
+        return self.map_gbif_occurrence(record, post_latlng, geoaccuracy, license_id)
+
+    def map_gbif_occurrence(self, record, post_latlng, geoaccuracy, license_id):
+        """Map gbif CSV entry with converted lat/lng,
+        geoaccuracy and license id to lbsn records
         """
         # note that one input record may contain many lbsn records
         # therefore, return list of processed records
         lbsn_records = []
         # start mapping input to lbsn_records
         post_guid = record.get("occurrenceID")
-
-        if not HF.check_notice_empty_post_guid(post_guid):
-            return None
         post_guid = self.strip_occurence_guid(post_guid)
-        post_record = HF.new_lbsn_record_with_id(lbsn.Post(), post_guid, self.origin)
+        post_record = self.record_factory.new_record(lbsn.Post, post_guid)
 
         # the user ID is not provided in gbif;
         # in order to normalize for recurring users, a user ref is
@@ -415,28 +501,21 @@ class importer:
             user_ref = record.get("recordedBy")
         user_name = user_ref
         user_guid = hashlib.md5(user_ref.encode("utf-8")).hexdigest()
-        user_record = HF.new_lbsn_record_with_id(lbsn.User(), user_guid, self.origin)
+        user_record = self.record_factory.new_record(lbsn.User, user_guid)
         user_record.user_name = user_name
-        if user_record:
-            post_record.user_pkey.CopyFrom(user_record.pkey)
+        self.record_factory.set_pkey(post_record.user_pkey, user_guid)
         lbsn_records.append(user_record)
 
-        post_record.post_latlng = self.gbif_extract_postlatlng(
-            lat_entry=record.get("decimalLatitude"),
-            lng_entry=record.get("decimalLongitude"),
-        )
-        geoaccuracy = importer.gbif_map_geoaccuracy(
-            record.get("coordinateUncertaintyInMeters")
-        )
+        post_record.post_latlng = post_latlng
         if geoaccuracy:
             post_record.post_geoaccuracy = geoaccuracy
         country_ref = record.get("countryCode")
         if country_ref:
-            country_record = HF.new_lbsn_record_with_id(
-                lbsn.Country(), country_ref, self.origin
+            country_record = self.record_factory.new_record(
+                lbsn.Country, country_ref
             )
             lbsn_records.append(country_record)
-            post_record.country_pkey.CopyFrom(country_record.pkey)
+            self.record_factory.set_pkey(post_record.country_pkey, country_ref)
         # gbif comes without timezone, see [1] and [2], so we treat it that way
         # [1]: https://github.com/gbif/gbif-api/issues/3
         # [2]: https://github.com/gbif/portal-feedback/issues/548
@@ -473,11 +552,8 @@ class importer:
         # post_record.post_thumbnail_url = ""
         post_record.post_type = lbsn.Post.IMAGE
         # replace text-string of content license by integer-id
-        license_ref = record.get("license")
-        if license_ref:
-            license_id = self.get_license_number_from_license_name(license_ref)
-            if license_id:
-                post_record.post_content_license = license_id
+        if license_id:
+            post_record.post_content_license = license_id
         # species to emoji
         emoji = importer.map_species_emoji(record, tax_emoji=TAX_EMOJI)
         if emoji:
@@ -506,8 +582,11 @@ class importer:
             try:
                 l_lng = Decimal(lng_entry)
                 l_lat = Decimal(lat_entry)
-            except ValueError:
+            except (ValueError, InvalidOperation):
                 l_lat, l_lng = 0, 0
+            else:
+                if l_lat.is_nan() or l_lng.is_nan():
+                    l_lat, l_lng = 0, 0
         if (
             (l_lat == 0 and l_lng == 0)
             or l_lat > 90
@@ -557,6 +636,35 @@ class importer:
         else:
             return lbsn.Post.COUNTRY
 
+    @staticmethod
+    def gbif_map_geoaccuracy_column(gbif_geo_accuracy_meters: "np.ndarray"):
+        """Map numpy array of gbif coordinateUncertaintyInMeters to
+           LBSNstructure levels, see gbif_map_geoaccuracy()
+
+        Returns integer array, 0 for values that cannot be mapped.
+        """
+        np = lazy_import("numpy")
+        is_empty = gbif_geo_accuracy_meters == ""
+        meters_accuracy = np.abs(HF.parse_float_column(gbif_geo_accuracy_meters))
+        with np.errstate(invalid="ignore"):
+            return np.select(
+                [
+                    is_empty,
+                    np.isnan(meters_accuracy),
+                    meters_accuracy <= 100,
+                    meters_accuracy <= 1000,
+                    meters_accuracy <= 30000,
+                ],
+                [
+                    lbsn.Post.LATLNG,
+                    0,
+                    lbsn.Post.LATLNG,
+                    lbsn.Post.PLACE,
+                    lbsn.Post.CITY,
+                ],
+                default=lbsn.Post.COUNTRY,
+            )
+
     def get_license_number_from_license_name(self, license_name: str) -> Optional[int]:
         """gbif contains only full string names of licenses
         This function converts names to ids.
@@ -14,6 +14,7 @@ from typing import Any, Dict
 import lbsnstructure as lbsn
 
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.text_features import get_text_features
 
 MAPPING_ID = 14
 
@@ -178,7 +179,7 @@ class importer:
                 post_record.post_body = post_caption.replace("\n", " ").replace(
                     "\r", ""
                 )
-                hashtags = HF.extract_hashtags_from_string(post_caption)
+                hashtags = get_text_features(post_caption).hashtags
                 if hashtags:
                     for hashtag in hashtags:
                         post_record.hashtags.append(hashtag)
@@ -190,7 +191,7 @@ class importer:
             )
         else:
             post_record.post_type = lbsn.Post.IMAGE
-        post_record.emoji.extend(HF.extract_emoji(post_record.post_body))
+        post_record.emoji.extend(get_text_features(post_record.post_body).emoji)
         self.lbsn_records.append(post_record)
 
     def extract_place(self, postplace_json):
@@ -15,6 +15,7 @@ from typing import Any, Dict, Optional
 import lbsnstructure as lbsn
 
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.text_features import get_text_features
 
 MAPPING_ID = 81
 SKIP_DELETED = False  # Set to true to skip posts of deleted users;
@@ -131,7 +132,7 @@ class importer:
         post_caption = json_string_dict.get("selftext")
         if post_caption:
             post_record.post_body = post_caption
-            hashtags = HF.extract_hashtags_from_string(post_caption)
+            hashtags = get_text_features(post_caption).hashtags
             if hashtags:
                 for hashtag in hashtags:
                     post_record.hashtags.append(hashtag)
@@ -166,7 +167,7 @@ class importer:
             # e.g. posts where the content was removed
             # and it not possible to tell anymore what it was
             post_record.post_type = lbsn.Post.OTHER
-        post_record.emoji.extend(HF.extract_emoji(post_record.post_body))
+        post_record.emoji.extend(get_text_features(post_record.post_body).emoji)
         title = json_string_dict.get("title")
         if title:
             post_record.post_title = title
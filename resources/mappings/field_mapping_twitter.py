@@ -11,10 +11,11 @@ import re
 from typing import Optional
 
 import lbsnstructure as lbsn
-import shapely.geometry as geometry
-from shapely.geometry.polygon import Polygon
 
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
+from lbsntransform.tools.record_factory import LBSNRecordFactory
+from lbsntransform.tools.text_features import get_text_features
 
 MAPPING_ID = 3
 
@@ -44,6 +45,8 @@ class importer:
         origin = lbsn.Origin()
         origin.origin_id = lbsn.Origin.TWITTER
         self.origin = origin
+        # lbsn records with composite keys of origin
+        self.record_factory = LBSNRecordFactory(origin)
         # this is where all the data will be stored
         # self.lbsn_records = LBSNRecordDicts()
         self.lbsn_records = []
@@ -100,9 +103,7 @@ class importer:
         # decide if main object is post or user json
         if input_lbsn_type and input_lbsn_type in ("friendslist", "followerslist"):
             for user, related_user_list in json_string_dict.items():
-                user_record = HF.new_lbsn_record_with_id(
-                    lbsn.User(), str(user), self.origin
-                )
+                user_record = self.record_factory.new_record(lbsn.User, str(user))
                 self.lbsn_records.append(user_record)
                 self.extract_related_users(
                     related_user_list, input_lbsn_type, user_record
@@ -137,8 +138,8 @@ class importer:
     def extract_related_users(self, related_user_list, input_lbsn_type, user_record):
         """Extract related users from user list"""
         for related_user in related_user_list:
-            related_record = HF.new_lbsn_record_with_id(
-                lbsn.User(), str(related_user), self.origin
+            related_record = self.record_factory.new_record(
+                lbsn.User, str(related_user)
             )
             self.lbsn_records.append(related_record)
             # note the switch of order here,
@@ -243,21 +244,18 @@ class importer:
             elif json_string_dict.get("in_reply_to_status_id_str"):
                 # if reply, original tweet is not available (?)
                 post_reaction_record.reaction_type = lbsn.PostReaction.COMMENT
-                ref_post_record = HF.new_lbsn_record_with_id(
-                    lbsn.Post(),
-                    json_string_dict.get("in_reply_to_status_id_str"),
-                    self.origin,
+                ref_post_record = self.record_factory.new_record(
+                    lbsn.Post, json_string_dict.get("in_reply_to_status_id_str")
                 )
-                ref_user_record = HF.new_lbsn_record_with_id(
-                    lbsn.User(),
-                    json_string_dict.get("in_reply_to_user_id_str"),
-                    self.origin,
+                ref_user_guid = json_string_dict.get("in_reply_to_user_id_str")
+                ref_user_record = self.record_factory.new_record(
+                    lbsn.User, ref_user_guid
                 )
                 ref_user_record.user_name = json_string_dict.get(
                     "in_reply_to_screen_name"
                 )  # Needs to be saved
                 self.lbsn_records.append(ref_user_record)
-                ref_post_record.user_pkey.CopyFrom(ref_user_record.pkey)
+                self.record_factory.set_pkey(ref_post_record.user_pkey, ref_user_guid)
 
             # add referenced post pkey to reaction
             if not self.disable_reaction_post_referencing:
@@ -283,9 +281,7 @@ class importer:
     def extract_user(self, json_string_dict):
         """Extract lbsn.User from Twitter json"""
         user = json_string_dict
-        user_record = HF.new_lbsn_record_with_id(
-            lbsn.User(), user.get("id_str"), self.origin
-        )
+        user_record = self.record_factory.new_record(lbsn.User, user.get("id_str"))
         # get additional information about the user, if available
         user_record.user_fullname = user.get("name")
         user_record.follows = user.get("friends_count")
@@ -359,7 +355,7 @@ class importer:
 
         if not HF.check_notice_empty_post_guid(post_guid):
             return None, None
-        post_record = HF.new_lbsn_record_with_id(lbsn.Post(), post_guid, self.origin)
+        post_record = self.record_factory.new_record(lbsn.Post, post_guid)
         post_geoacc = None
         user_record = None
         user_info = json_string_dict.get("user")
@@ -368,9 +364,7 @@ class importer:
             user_record = self.extract_user(json_string_dict.get("user"))
         elif user_pkey:
             # userPkey is already available for posts that are statuses
-            user_record = HF.new_lbsn_record_with_id(
-                lbsn.User(), user_pkey.id, self.origin
-            )
+            user_record = self.record_factory.new_record(lbsn.User, user_pkey.id)
         if user_record:
             # self.lbsn_records.append(user_record)
             self.lbsn_records.append(user_record)
@@ -525,7 +519,7 @@ class importer:
             post_record.post_type = HF.assign_media_post_type(media_json)
         else:
             post_record.post_type = lbsn.Post.TEXT
-        post_record.emoji.extend(HF.extract_emoji(post_record.post_body))
+        post_record.emoji.extend(get_text_features(post_record.post_body).emoji)
         # because standard print statement will produce escaped text,
         # we can use protobuf text_format to give us a human friendly
         # version of the text
@@ -572,6 +566,8 @@ class importer:
         lat_center = 0
         bounding_box = place.get("bounding_box")
         if bounding_box:
+            # shapely is imported for the first place with bounding box
+            geometry = lazy_import("shapely.geometry")
             bound_coordinates = bounding_box.get("coordinates")
             if bound_coordinates:
                 bounding_box_points = bound_coordinates[0]
@@ -592,8 +588,8 @@ class importer:
             # - country_code is already unique
             country_code = place.get("country_code")
             if country_code:
-                place_record = HF.new_lbsn_record_with_id(
-                    lbsn.Country(), place.get("country_code"), self.origin
+                place_record = self.record_factory.new_record(
+                    lbsn.Country, place.get("country_code")
                 )
                 if not post_geoaccuracy:
                     post_geoaccuracy = lbsn.Post.COUNTRY
@@ -604,9 +600,7 @@ class importer:
                 return None, post_geoaccuracy, None
         elif place_type in ("city", "neighborhood", "admin"):
             # city_guid
-            place_record = HF.new_lbsn_record_with_id(
-                lbsn.City(), place.get("id"), self.origin
-            )
+            place_record = self.record_factory.new_record(lbsn.City, place.get("id"))
             if not place_type == "city":
                 place_record.sub_type = place_type
             if not post_geoaccuracy or post_geoaccuracy == lbsn.Post.COUNTRY:
@@ -614,9 +608,7 @@ class importer:
         elif place_type == "poi":
             # place_guid
             # For POIs, lbsn.City is not available on Twitter
-            place_record = HF.new_lbsn_record_with_id(
-                lbsn.Place(), place.get("id"), self.origin
-            )
+            place_record = self.record_factory.new_record(lbsn.Place, place.get("id"))
             if not post_geoaccuracy or post_geoaccuracy in (
                 lbsn.Post.COUNTRY,
                 lbsn.Post.CITY,
@@ -648,13 +640,13 @@ class importer:
         place_record.geom_center = "POINT(%s %s)" % (lon_center, lat_center)
         if bounding_box and bound_coordinates:
             # prints: 'POLYGON ((0 0, 1 0, 1 1, 0 1, 0 0))'
-            place_record.geom_area = Polygon(bounding_box_points).wkt
+            place_record.geom_area = geometry.Polygon(bounding_box_points).wkt
         ref_country_record = None
         if not isinstance(place_record, lbsn.Country):
             ref_country_code = place.get("country_code")
             if ref_country_code:
-                ref_country_record = HF.new_lbsn_record_with_id(
-                    lbsn.Country(), ref_country_code, self.origin
+                ref_country_record = self.record_factory.new_record(
+                    lbsn.Country, ref_country_code
                 )
                 # At the moment, only English name references are processed
                 if (
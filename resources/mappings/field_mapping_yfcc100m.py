@@ -7,13 +7,18 @@ Module for mapping Flickr YFCC100M dataset to common LBSN Structure.
 import csv
 import logging
 import re
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from urllib.parse import unquote
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import lbsnstructure as lbsn
 
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
+from lbsntransform.tools.record_factory import LBSNRecordFactory
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # pylint: disable=no-member
 
@@ -117,6 +122,8 @@ class importer:
         origin = lbsn.Origin()
         origin.origin_id = lbsn.Origin.FLICKR
         self.origin = origin
+        # lbsn records with composite keys of origin
+        self.record_factory = LBSNRecordFactory(origin)
         self.null_island = 0
         self.log = logging.getLogger("__main__")  # get the main logger object
         self.skipped_count = 0
@@ -164,6 +171,52 @@ class importer:
         lbsn_records = self.extract_flickr_post(record)
         return lbsn_records
 
+    def parse_csv_batch(self, records: List[List[str]]):
+        """Entry point for batches of flickr CSV rows
+
+        Geoaccuracy and license columns of post rows are converted
+        for the whole batch, lat/lng as in parse_csv_record. Place rows,
+        malformed or incomplete rows are processed by parse_csv_record.
+
+        Returns lbsn records of all rows, in input order.
+        """
+        lbsn_records = []
+        if not records:
+            return lbsn_records
+        np = lazy_import("numpy")
+        row_lengths = np.fromiter(
+            (len(record) for record in records), dtype=np.int64, count=len(records)
+        )
+        is_post = (
+            (row_lengths > 17)
+            & np.char.isdigit(HF.get_csv_column(records, 0))
+            & (HF.get_csv_column(records, 1) != "")
+        )
+        post_rows = [record for record, post in zip(records, is_post) if post]
+        geoaccuracies = importer.flickr_map_geoaccuracy_column(
+            HF.get_csv_column(post_rows, 14)
+        )
+        license_ids = HF.map_column_values(
+            HF.get_csv_column(post_rows, 17), self.lic_dict
+        )
+        post_values = zip(geoaccuracies.tolist(), license_ids.tolist())
+        for record, post in zip(records, is_post):
+            if not post:
+                row_records = self.parse_csv_record(record)
+                if row_records:
+                    lbsn_records.extend(row_records)
+                continue
+            geoaccuracy, license_id = next(post_values)
+            lbsn_records.extend(
+                self.map_flickr_post(
+                    record,
+                    post_latlng=self.flickr_extract_postlatlng(record),
+                    geoaccuracy=geoaccuracy,
+                    license_id=license_id,
+                )
+            )
+        return lbsn_records
+
     def extract_flickr_post(self, record):
         """Main function for processing Flickr YFCC100M CSV entry.
            This mothod is adapted to a special structure, adapt if needed.
@@ -205,22 +258,32 @@ class importer:
             25 Photo/video identifier
             26 Place references (null to multiple)
         """
+        if not HF.check_notice_empty_post_guid(record[1]):
+            return None
+        post_latlng = self.flickr_extract_postlatlng(record)
+        geoaccuracy = importer.flickr_map_geoaccuracy(record[14])
+        license_id = None
+        if record[17] is not None:
+            license_id = self.get_license_number_from_license_name(record[17])
+        return self.map_flickr_post(record, post_latlng, geoaccuracy, license_id)
+
+    def map_flickr_post(self, record, post_latlng, geoaccuracy, license_id):
+        """Map Flickr YFCC100M CSV entry with converted lat/lng,
+        geoaccuracy and license id to lbsn records
+        """
         # note that one input record may contain many lbsn records
         # therefore, return list of processed records
         lbsn_records = []
         # start mapping input to lbsn_records
         post_guid = record[1]
-        if not HF.check_notice_empty_post_guid(post_guid):
-            return None
-        post_record = HF.new_lbsn_record_with_id(lbsn.Post(), post_guid, self.origin)
-        user_record = HF.new_lbsn_record_with_id(lbsn.User(), record[3], self.origin)
+        user_guid = record[3]
+        post_record = self.record_factory.new_record(lbsn.Post, post_guid)
+        user_record = self.record_factory.new_record(lbsn.User, user_guid)
         user_record.user_name = unquote(record[4]).replace("+", " ")
-        user_record.url = f"http://www.flickr.com/photos/{user_record.pkey.id}/"
-        if user_record:
-            post_record.user_pkey.CopyFrom(user_record.pkey)
+        user_record.url = f"http://www.flickr.com/photos/{user_guid}/"
+        self.record_factory.set_pkey(post_record.user_pkey, user_guid)
         lbsn_records.append(user_record)
-        post_record.post_latlng = self.flickr_extract_postlatlng(record)
-        geoaccuracy = importer.flickr_map_geoaccuracy(record[14])
+        post_record.post_latlng = post_latlng
         if geoaccuracy:
             post_record.post_geoaccuracy = geoaccuracy
         # place record available in separate yfcc100m dataset
@@ -277,9 +340,7 @@ class importer:
             post_record.post_type = lbsn.Post.IMAGE
         # replace text-string of content license by integer-id
         if record[17] is not None:
-            post_record.post_content_license = (
-                self.get_license_number_from_license_name(record[17])
-            )
+            post_record.post_content_license = license_id
         # place record available in separate yfcc100m dataset
         # if records parsed as joined urls, length is larger than 25
         if len(record) > 25:
@@ -339,9 +400,7 @@ class importer:
             if post_guid is None:
                 raise ValueError("Cannot create lbsn.Post without post_guid")
             # create new post record
-            post_record = HF.new_lbsn_record_with_id(
-                lbsn.Post(), post_guid, self.origin
-            )
+            post_record = self.record_factory.new_record(lbsn.Post, post_guid)
         if place_records is None:
             return post_record
         for place_record in place_records:
@@ -460,6 +519,36 @@ class importer:
                 lbsn_geoaccuracy = lbsn.Post.COUNTRY
         return lbsn_geoaccuracy
 
+    @staticmethod
+    def flickr_map_geoaccuracy_column(flickr_geo_accuracy_levels: "np.ndarray"):
+        """Map numpy array of Flickr Geoaccuracy Levels to
+           LBSNstructure levels, see flickr_map_geoaccuracy()
+
+        Returns integer array, 0 for levels that cannot be mapped.
+        """
+        np = lazy_import("numpy")
+        stripped_levels = np.char.strip(
+            np.char.lstrip(flickr_geo_accuracy_levels, "Level")
+        )
+        is_digit = np.char.isdigit(stripped_levels)
+        level_numbers = np.zeros(len(stripped_levels), dtype=np.int64)
+        level_numbers[is_digit] = stripped_levels[is_digit].astype(np.int64)
+        numbered_geoaccuracy = np.select(
+            [level_numbers >= 15, level_numbers >= 12, level_numbers >= 8],
+            [lbsn.Post.LATLNG, lbsn.Post.PLACE, lbsn.Post.CITY],
+            default=lbsn.Post.COUNTRY,
+        )
+        named_geoaccuracy = np.select(
+            [
+                flickr_geo_accuracy_levels == "Street",
+                np.isin(flickr_geo_accuracy_levels, ("lbsn.City", "Region")),
+                np.isin(flickr_geo_accuracy_levels, ("lbsn.Country", "World")),
+            ],
+            [lbsn.Post.LATLNG, lbsn.Post.CITY, lbsn.Post.COUNTRY],
+            default=0,
+        )
+        return np.where(is_digit, numbered_geoaccuracy, named_geoaccuracy)
+
     def flickr_extract_postlatlng(self, record):
         """Basic routine for extracting lat/lng coordinates from post.
         - checks for consistency and errors
@@ -473,8 +562,11 @@ class importer:
             try:
                 l_lng = Decimal(lng_entry)
                 l_lat = Decimal(lat_entry)
-            except ValueError:
+            except (ValueError, InvalidOperation):
                 l_lat, l_lng = 0, 0
+            else:
+                if l_lat.is_nan() or l_lng.is_nan():
+                    l_lat, l_lng = 0, 0
         if (
             (l_lat == 0 and l_lng == 0)
             or l_lat > 90
@@ -3,6 +3,8 @@
 """LBSNtransform package import specifications"""
 
 from lbsntransform.version import __version__
+# first, marks start of imports for --profile-imports
+from lbsntransform.tools import lazy_imports
 
 from lbsntransform.lbsntransform_ import LBSNTransform
 from lbsntransform.config.config import BaseConfig
@@ -18,7 +18,9 @@ __license__ = "GNU GPLv3"
 # version: see version.py
 
 import sys
+import time
 
+from lbsntransform.tools.lazy_imports import STARTUP_TIME, import_report
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
 from lbsntransform.output.shared_structure import TimeMonitor
 from lbsntransform.input.load_data import LoadData
@@ -37,6 +39,8 @@ def main(config: BaseConfig = None):
         config = BaseConfig()
         # Parse args
         config.parse_args()
+    # imports and config, reported with --profile-imports
+    startup_seconds = time.perf_counter() - STARTUP_TIME
 
     # initialize mapping class
     # depending on lbsn origin
@@ -73,6 +77,7 @@ def main(config: BaseConfig = None):
         dry_run=config.dry_run,
         hmac_key=config.hmac_key,
         commit_volume=config.commit_volume,
+        proto_output=config.proto_output,
     )
 
     # initialize input reader
@@ -104,7 +109,26 @@ def main(config: BaseConfig = None):
         zip_records=config.zip_records,
         include_lbsn_objects=config.include_lbsn_objects,
         override_lbsn_query_schema=config.override_lbsn_query_schema,
+        workers=config.workers,
+        origin=config.origin,
+        mappings_path=config.mappings_path,
+        number_of_records_to_fetch=config.number_of_records_to_fetch,
+        server_side_cursor=config.server_side_cursor,
+        copy_input=config.copy_input,
+        json_backend=config.json_backend,
+        input_partitions=config.input_partitions,
+        partition_bookmarks=config.partition_bookmarks,
+        db_input_conn_args=lbsntransform.db_input_conn_args,
+        prefetch_depth=config.prefetch_depth,
+        web_offsets=config.web_offsets,
+        checkpoint_file=config.checkpoint_file,
+        mmap_csv=config.mmap_csv,
+        map_csv_batches=config.map_csv_batches,
+        join_files=config.join_files,
+        join_key_column=config.join_key_column,
     )
+    # store input position whenever output has been committed
+    lbsntransform.store_callbacks.append(input_data.write_checkpoint)
 
     # Manually add entries that need submission prior to parsing data
     # add_bundestag_group_example(import_mapper)
@@ -157,6 +181,9 @@ def main(config: BaseConfig = None):
 
     lbsntransform.log.info(f"Done. {how_long.stop_time()}")
 
+    if config.profile_imports:
+        lbsntransform.log.info(f"\n{import_report(startup_seconds)}")
+
     lbsntransform.close_log()
 
 
@@ -9,12 +9,12 @@ Config module for parsing input args for lbsntransform package.
 import argparse
 import logging
 from pathlib import Path
+from types import ModuleType
 from typing import List, Tuple
 
-from shapely import geos
-
 import lbsnstructure as lbsn
 from lbsntransform import __version__
+from lbsntransform.tools.lazy_imports import on_import
 
 
 class BaseConfig:
@@ -78,8 +78,23 @@ class BaseConfig:
         self.override_lbsn_query_schema = None
         self.mappings_path = None
         self.dry_run = None
+        self.profile_imports = False
         self.hmac_key = None
         self.commit_volume = None
+        self.workers = None
+        self.server_side_cursor = False
+        self.copy_input = False
+        self.json_backend = None
+        self.input_partitions = None
+        self.partition_bookmarks = None
+        self.prefetch_depth = None
+        self.web_offsets = None
+        self.checkpoint_file = None
+        self.mmap_csv = False
+        self.map_csv_batches = False
+        self.join_files = None
+        self.join_key_column = None
+        self.proto_output = None
 
         BaseConfig.set_options()
 
@@ -125,6 +140,18 @@ class BaseConfig:
             '  '
             'with no changes made '
             'to database/output')
+        parser.add_argument(
+            "--profile-imports",
+            action='store_true',
+            help='Report startup and import times '
+            '  '
+            '  '
+            '* Reports the time spent on imports and config '
+            'at startup, the time of each deferred import '
+            '(e.g. shapely, nltk, requests) and the '
+            'heavy dependencies loaded, after processing.  '
+            '* Use to check that dependencies are only loaded '
+            'by the code paths that need them.  ')
         # Local Input
         local_input_args = parser.add_argument_group('Local Input')
         local_input_args.add_argument(
@@ -149,7 +176,12 @@ class BaseConfig:
             ' (`json`, `csv` etc.) '
             '  '
             '  '
-            '* only applies if `--file_input` is used.  ',
+            '* only applies if `--file_input` is used.  '
+            '* `parquet` and `arrow` (Arrow IPC) files are read in record '
+            'batches, rows are mapped as dicts (like `--use_csv_dictreader`). '
+            'Requires the `pyarrow` package.  '
+            '* `lbsnproto` reads archives of `--proto_output`, lbsn records '
+            'are not mapped again.  ',
             type=str)
         local_input_args.add_argument(
             "--input_path_url",
@@ -161,7 +193,8 @@ class BaseConfig:
             '* You can also provide a web-url, '
             'starting with `http(s)`  '
             '* URLs will be accessed using '
-            '`requests.get(url, stream=True)`.  '
+            '`requests.get(url, stream=True)`. Broken streams are '
+            'resumed with HTTP Range requests, see also `--web_offsets`.  '
             '* To separate multiple urls, use '
             'semicolon (`;`). In this case, see also '
             '`--zip_records`.  ',
@@ -397,6 +430,123 @@ class BaseConfig:
             'limit the number of records to fetch at once.  '
             '* Defaults to 10000  ',
             type=int)
+        settings_args.add_argument(
+            "--workers",
+            default=None,
+            help='Map input records in x worker processes. '
+            '  '
+            '  '
+            '* Batches of input records are sent to a pool of worker '
+            'processes, each running its own instance of the input mapping.  '
+            '* Output order and record counts (e.g. for `--skip_until_record`) '
+            'are preserved.  '
+            '* Defaults to None (= map records in the main process)  '
+            '* Use up to the number of available CPU cores.  ',
+            type=int)
+        settings_args.add_argument(
+            "--mmap_csv",
+            action='store_true',
+            help='Read local csv files memory-mapped in chunks. '
+            '  '
+            '  '
+            '* Requires `--workers`. Each csv file is split into byte '
+            'ranges aligned to line endings, which are parsed and mapped '
+            'in the worker processes, e.g. to use all cores for a single '
+            'large file (YFCC100M).  '
+            '* Records must not contain line breaks (`QUOTE_NONE`).  '
+            '* Not supported for compressed files, `--zip_records`, '
+            '`--use_csv_dictreader` and `--skip_until_record`.  ')
+        settings_args.add_argument(
+            "--map_csv_batches",
+            action='store_true',
+            help='Map csv records in batches, with columnar conversion. '
+            '  '
+            '  '
+            '* Requires a mapping with `parse_csv_batch()` (e.g. YFCC100M, '
+            'iNaturalist/gbif), otherwise records are mapped one by one.  '
+            '* Records are mapped in batches of 500: progress counts and '
+            '`--checkpoint_file` positions are updated per batch, not per '
+            'record.  '
+            '* Only about 6% faster than mapping records one by one '
+            '(YFCC100M), defaults to off.  '
+            '* With `--workers`, records are always mapped in batches '
+            '(in worker processes).  ')
+        settings_args.add_argument(
+            "--server_side_cursor",
+            action='store_true',
+            help='Stream records from input db with a server-side cursor. '
+            '  '
+            '  '
+            '* If set, a single query per lbsn object is executed '
+            'and rows are streamed continuously, instead of querying '
+            'one page of `--records_tofetch` records after another.  '
+            '* `--records_tofetch` defines the number of rows transferred '
+            'per network round trip.  '
+            '* Only for input db format `lbsn`.  ')
+        settings_args.add_argument(
+            "--copy_input",
+            action='store_true',
+            help='Stream json records from input db with COPY TO STDOUT. '
+            '  '
+            '  '
+            '* If set, a single `COPY (SELECT in_id, data ...) TO STDOUT` '
+            'statement is executed, instead of querying one page of '
+            '`--records_tofetch` records after another.  '
+            '* Json is transferred as text and decoded during mapping, '
+            'in parallel with `--workers`.  '
+            '* Only for input db format `json`.  ')
+        settings_args.add_argument(
+            "--json_backend",
+            default=None,
+            help='Library used to decode json records. '
+            '  '
+            '  '
+            '* `json` (default): Python standard library.  '
+            '* `orjson`: faster decoding, requires the `orjson` package.  '
+            '* `simdjson`: decodes fields on demand, only fields read by '
+            'the mapping are converted to Python objects, requires the '
+            '`pysimdjson` package.  '
+            '* Applies to line separated json (`--is_line_separated_json`), '
+            'json from input db and `--copy_input`.  ')
+        settings_args.add_argument(
+            "--input_partitions",
+            default=None,
+            help='Read lbsn input db tables in x parallel key ranges. '
+            '  '
+            '  '
+            '* Key boundaries are estimated from a sample of the '
+            'key column (e.g. `post_guid`).  '
+            '* Each key range is read on its own connection to the input db, '
+            'records of all ranges are processed as they arrive '
+            '(no global order).  '
+            '* Only for input db format `lbsn`.  '
+            '* Use `--partition_bookmarks` to resume interrupted reads.  ',
+            type=int)
+        settings_args.add_argument(
+            "--partition_bookmarks",
+            default=None,
+            help='Path to a json file with key range bookmarks. '
+            '  '
+            '  '
+            '* Used with `--input_partitions`.  '
+            '* The last key of each range committed to the output is '
+            'written to this file after each commit. If the file exists, key ranges are '
+            'restored from it and reading resumes from the bookmarks.  ',
+            type=str)
+        settings_args.add_argument(
+            "--prefetch_depth",
+            default=None,
+            help='Read db or web input x batches ahead. '
+            '  '
+            '  '
+            '* If set, input records are fetched in a background thread, '
+            'while previous records are processed.  '
+            '* For db input, one batch is one page of `--records_tofetch` '
+            'records, e.g. `--prefetch_depth 2` fetches up to two '
+            'pages ahead.  '
+            '* Time spent waiting for input is reported at the end.  '
+            '* Defaults to None (no read-ahead)  ',
+            type=int)
         settings_args.add_argument(
             "--disable_transfer_reactions",
             action='store_true',
@@ -542,6 +692,17 @@ class BaseConfig:
             'If set, will store all '
             'submit values to local CSV instead. '
             'Currently, this type of output is not available.')
+        settings_args.add_argument(
+            "--proto_output",
+            help='Archive lbsn records as length-delimited ProtoBuf. '
+            '  '
+            '  '
+            'Provide a folder, lbsn records are appended to one file per '
+            'lbsn type (e.g. `Post.lbsnproto`), in addition to any database '
+            'output. Archives can be read again with '
+            '`--file_type lbsnproto`, e.g. to transfer archived records '
+            'to a new hll database without mapping input again.',
+            type=str)
         settings_args.add_argument(
             "--csv_allow_linebreaks",
             action='store_true',
@@ -606,6 +767,29 @@ class BaseConfig:
             'until record `x` '
             '(default: start with first)',
             type=int)
+        settings_args.add_argument(
+            "--web_offsets",
+            help='Path to a json file with byte offsets of web sources. '
+            '  '
+            '  '
+            '* The byte offset of the last line per url committed to '
+            'the output is written to this file after each commit.  '
+            '* If the file exists, web sources are resumed from '
+            'these offsets (via HTTP Range requests), instead of '
+            're-reading records with `--skip_until_record`.  ',
+            type=str)
+        settings_args.add_argument(
+            "--checkpoint_file",
+            help='Path to a json file with input checkpoints. '
+            '  '
+            '  '
+            '* After each commit to the output, the current input file, '
+            'byte offset and record number are written to this file.  '
+            '* If the file exists, processing continues directly at '
+            'the stored byte offset, without re-reading previous records '
+            '(unlike `--skip_until_record`).  '
+            '* Supported for local csv, txt and line separated json input.  ',
+            type=str)
         settings_args.add_argument(
             "--zip_records",
             action='store_true', default=False,
@@ -617,6 +801,30 @@ class BaseConfig:
             '* e.g. `List1[A,B,C]`, `List2[1,2,3]` will be '
             'combined (zipped) on read to '
             '`List[A1,B2,C3]`  ')
+        settings_args.add_argument(
+            "--join_files",
+            help='Join csv records with rows of other csv files, by key. '
+            '  '
+            '  '
+            '* Path to one or more csv files (separated by semicolon `;`), '
+            'with the join key in the first column, e.g. '
+            '`yfcc100m_places.csv`.  '
+            '* Rows with a matching key are appended to the input record '
+            '(see `--join_key_column`). Unlike `--zip_records`, input '
+            'and join files do not need to be aligned, and input can be '
+            'split into many files.  '
+            '* An index of each join file is stored next to it (`*.idx`) '
+            'and reused in later runs.  ',
+            type=str)
+        settings_args.add_argument(
+            "--join_key_column",
+            default=None,
+            help='Column of join key in input records. '
+            '  '
+            '  '
+            '* Used with `--join_files`  '
+            '* Defaults to `1` (photo id in YFCC100M dataset)  ',
+            type=int)
         settings_args.add_argument(
             "--min_geoaccuracy",
             help='Min geoaccuracy to use '
@@ -802,6 +1010,8 @@ class BaseConfig:
             self.dbname_input = args.dbname_input
         if args.dry_run:
             self.dry_run = True
+        if args.profile_imports:
+            self.profile_imports = True
         if args.csv_output:
             raise NotImplementedError(
                 "CSV output is currently not available.")
@@ -855,6 +1065,29 @@ class BaseConfig:
             self.transfer_count = args.transfer_count
         if args.records_tofetch:
             self.number_of_records_to_fetch = args.records_tofetch
+        if args.workers:
+            self.workers = args.workers
+        if args.mmap_csv:
+            self.mmap_csv = True
+        if args.map_csv_batches:
+            self.map_csv_batches = True
+        if args.join_files:
+            self.join_files = [
+                Path(join_file) for join_file in args.join_files.split(";")]
+        if args.join_key_column is not None:
+            self.join_key_column = args.join_key_column
+        if args.server_side_cursor:
+            self.server_side_cursor = True
+        if args.copy_input:
+            self.copy_input = True
+        if args.json_backend:
+            self.json_backend = args.json_backend
+        if args.input_partitions:
+            self.input_partitions = args.input_partitions
+        if args.partition_bookmarks:
+            self.partition_bookmarks = Path(args.partition_bookmarks)
+        if args.prefetch_depth:
+            self.prefetch_depth = args.prefetch_depth
         if args.disable_transfer_reactions:
             self.transfer_reactions = False
         if args.disable_reaction_post_referencing:
@@ -889,6 +1122,12 @@ class BaseConfig:
             self.zip_records = True
         if args.skip_until_record:
             self.skip_until_record = args.skip_until_record
+        if args.web_offsets:
+            self.web_offsets = Path(args.web_offsets)
+        if args.checkpoint_file:
+            self.checkpoint_file = Path(args.checkpoint_file)
+        if args.proto_output:
+            self.proto_output = Path(args.proto_output)
         if args.mappings_path:
             self.mappings_path = Path(args.mappings_path)
         if args.min_geoaccuracy:
@@ -960,7 +1199,13 @@ class BaseConfig:
     def set_options():
         """Includes global options in other packages to be set
         prior execution"""
-        # tell shapely to include the srid when generating WKBs
+        # tell shapely to include the srid when generating WKBs,
+        # once shapely is imported
+        on_import("shapely.geos", BaseConfig._set_shapely_options)
+
+    @staticmethod
+    def _set_shapely_options(geos: ModuleType):
+        """Set global shapely options"""
         geos.WKBWriter.defaults["include_srid"] = True
 
     @classmethod
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for reading Parquet and Arrow IPC files.
+
+Record batches are streamed row group by row group (Parquet) or
+batch by batch (Arrow IPC, memory-mapped). Only the columns read by
+the importer are projected. Rows are returned as dicts of strings,
+as from csv.DictReader (`--use_csv_dictreader`).
+"""
+
+import datetime as dt
+import importlib.util
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from lbsntransform.tools.lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+PYARROW_AVAIL = None
+if importlib.util.find_spec("pyarrow") is not None:
+    # pyarrow is installed, it is imported
+    # on first use (only for parquet and arrow files)
+    PYARROW_AVAIL = True
+
+# file types read with pyarrow
+ARROW_FILE_TYPES = ("parquet", "arrow")
+# maximum number of rows per record batch
+ARROW_BATCH_SIZE = 10000
+
+
+def _to_csv_value(value: Any) -> str:
+    """Format value of arrow column as csv string"""
+    if value is None:
+        return ""
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class ArrowRecordReader:
+    """Iterate rows of a Parquet or Arrow IPC file as dicts
+
+    Args:
+        file_name: Parquet or Arrow IPC (file or stream format) file
+        file_type: One of ARROW_FILE_TYPES
+        columns: Columns to read, all columns if None;
+            columns missing in the file are ignored
+        not_null_columns: Skip rows (and whole Parquet row groups,
+            based on statistics) with null values in any of these columns,
+            e.g. lat/lng for --ignore_non_geotagged
+    """
+
+    def __init__(
+        self,
+        file_name: Union[str, Path],
+        file_type: str,
+        columns: Optional[Sequence[str]] = None,
+        not_null_columns: Optional[Sequence[str]] = None,
+        batch_size: int = ARROW_BATCH_SIZE,
+    ):
+        if not PYARROW_AVAIL:
+            raise ValueError(
+                f"Reading {file_type} files requires the pyarrow package, "
+                f"install with `pip install pyarrow`."
+            )
+        if file_type not in ARROW_FILE_TYPES:
+            raise ValueError(f"Format {file_type} not supported.")
+        self.file_name = file_name
+        self.file_type = file_type
+        self.not_null_columns = list(not_null_columns or [])
+        self.columns = None
+        if columns is not None:
+            # columns of filter are always read
+            self.columns = list(
+                dict.fromkeys([*columns, *self.not_null_columns])
+            )
+        self.batch_size = batch_size
+        self.skipped_row_groups = 0
+        self.skipped_rows = 0
+
+    def _select_columns(self, names: List[str]) -> Optional[List[str]]:
+        """Return projected columns available in file"""
+        if self.columns is None:
+            return None
+        return [column for column in self.columns if column in names]
+
+    def _is_null_row_group(self, row_group) -> bool:
+        """Check statistics of row group for filter columns with only nulls"""
+        for column_index in range(row_group.num_columns):
+            column = row_group.column(column_index)
+            if column.path_in_schema not in self.not_null_columns:
+                continue
+            if (
+                column.is_stats_set
+                and column.statistics.has_null_count
+                and column.statistics.null_count == row_group.num_rows
+            ):
+                return True
+        return False
+
+    def _iter_parquet_batches(self) -> Iterator["pa.RecordBatch"]:
+        """Yield record batches of Parquet file, row group by row group"""
+        parquet_file = lazy_import("pyarrow.parquet").ParquetFile(self.file_name)
+        columns = self._select_columns(parquet_file.schema_arrow.names)
+        for row_group_index in range(parquet_file.num_row_groups):
+            row_group = parquet_file.metadata.row_group(row_group_index)
+            if self.not_null_columns and self._is_null_row_group(row_group):
+                self.skipped_row_groups += 1
+                self.skipped_rows += row_group.num_rows
+                continue
+            for batch in parquet_file.iter_batches(
+                batch_size=self.batch_size,
+                row_groups=[row_group_index],
+                columns=columns,
+            ):
+                yield batch
+
+    def _iter_ipc_batches(self) -> Iterator["pa.RecordBatch"]:
+        """Yield record batches of memory-mapped Arrow IPC file"""
+        pa = lazy_import("pyarrow")
+        lazy_import("pyarrow.ipc")
+        with pa.memory_map(str(self.file_name), "r") as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (
+                    reader.get_batch(index)
+                    for index in range(reader.num_record_batches)
+                )
+            except pa.ArrowInvalid:
+                # Arrow IPC stream format
+                source.seek(0)
+                reader = pa.ipc.open_stream(source)
+                batches = iter(reader)
+            columns = self._select_columns(reader.schema.names)
+            for batch in batches:
+                if columns is not None:
+                    batch = batch.select(columns)
+                yield batch
+
+    def _filter_not_null(self, batch: "pa.RecordBatch") -> "pa.RecordBatch":
+        """Remove rows with null values in filter columns"""
+        pc = lazy_import("pyarrow.compute")
+        mask = None
+        for column in self.not_null_columns:
+            if column not in batch.schema.names:
+                continue
+            is_valid = pc.is_valid(batch.column(column))
+            mask = is_valid if mask is None else pc.and_(mask, is_valid)
+        if mask is None:
+            return batch
+        filtered = batch.filter(mask)
+        self.skipped_rows += batch.num_rows - filtered.num_rows
+        return filtered
+
+    def iter_batches(self) -> Iterator["pa.RecordBatch"]:
+        """Yield projected and filtered record batches"""
+        if self.file_type == "parquet":
+            batches = self._iter_parquet_batches()
+        else:
+            batches = self._iter_ipc_batches()
+        for batch in batches:
+            if self.not_null_columns:
+                batch = self._filter_not_null(batch)
+            yield batch
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for batch in self.iter_batches():
+            for row in batch.to_pylist():
+                yield {key: _to_csv_value(value) for key, value in row.items()}
+
+    def report(self) -> str:
+        """Return filter statistics as formatted string"""
+        return (
+            f"Skipped {self.skipped_rows} rows of {self.file_name} with empty "
+            f"{', '.join(self.not_null_columns)} "
+            f"({self.skipped_row_groups} complete row groups)."
+        )
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for byte offset checkpoints of line based local input
+(csv, txt and line separated json).
+
+A checkpoint stores the file, the byte offset after the last
+converted record and the record count. On restart, the file is
+opened at this offset, no records before it need to be parsed.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+# bytes discarded per read, if input cannot seek (compressed files)
+SKIP_CHUNK_SIZE = 2**20
+
+
+class OffsetLineReader:
+    """Iterate decoded lines of a binary file, tracking the byte offset
+
+    Args:
+        file_handle: File opened in binary mode
+        offset: Byte offset to start reading from
+        header: If True and offset > 0, the first line of the file
+            is returned before continuing at offset (csv header)
+    """
+
+    def __init__(
+        self,
+        file_handle: IO[bytes],
+        offset: int = 0,
+        header: bool = False,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+    ):
+        self.file_handle = file_handle
+        self.offset = offset
+        self.header = header
+        self.encoding = encoding
+        self.errors = errors
+
+    def _skip_to_offset(self, position: int = 0):
+        """Move file position to offset"""
+        if self.file_handle.seekable():
+            self.file_handle.seek(self.offset)
+            return
+        remaining = self.offset - position
+        while remaining > 0:
+            chunk = self.file_handle.read(min(remaining, SKIP_CHUNK_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.offset:
+            position = 0
+            if self.header:
+                header_line = self.file_handle.readline()
+                position = len(header_line)
+                yield header_line.decode(self.encoding, self.errors)
+            self._skip_to_offset(position)
+        for line in self.file_handle:
+            self.offset += len(line)
+            yield line.decode(self.encoding, self.errors)
+
+    def close(self):
+        """Close underlying file"""
+        self.file_handle.close()
+
+
+class InputCheckpoint:
+    """Last converted position of local input, stored as json
+
+    Format: {"file": path, "offset": bytes, "record": count}
+    """
+
+    def __init__(self, checkpoint_path: Path):
+        self.checkpoint_path = checkpoint_path
+        self.file_name: Optional[str] = None
+        self.offset = 0
+        self.record = 0
+        if Path(checkpoint_path).exists():
+            with open(checkpoint_path, "r", encoding="utf-8") as file_handle:
+                checkpoint = json.load(file_handle)
+            self.file_name = checkpoint.get("file")
+            self.offset = checkpoint.get("offset", 0)
+            self.record = checkpoint.get("record", 0)
+
+    def update(self, file_name: Union[str, Path], offset: int, record: int):
+        """Set position after the last converted record"""
+        self.file_name = str(file_name)
+        self.offset = offset
+        self.record = record
+
+    def save(self):
+        """Write checkpoint to json file"""
+        if self.file_name is None:
+            return
+        # replace atomically, an interrupted write must not
+        # corrupt the last checkpoint
+        tmp_path = Path(f"{self.checkpoint_path}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file_handle:
+            json.dump(
+                {"file": self.file_name, "offset": self.offset, "record": self.record},
+                file_handle,
+            )
+        os.replace(tmp_path, self.checkpoint_path)
+        logging.getLogger("__main__").debug(
+            f"Checkpoint: record {self.record}, byte {self.offset} "
+            f"of {self.file_name}"
+        )
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for reading compressed input files (gzip, bz2, xz, zstd).
+
+Decompression runs in a background thread, which overlaps
+with parsing and mapping of records in the main thread. The
+stdlib decompressors (zlib, bz2, lzma) and zstandard release
+the GIL while decompressing.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+from pathlib import Path
+from typing import IO, Optional, Union
+
+ZSTD_AVAIL = None
+try:
+    # check if zstandard is installed
+    import zstandard
+
+    ZSTD_AVAIL = True
+except ImportError:
+    pass
+
+# compression detected by file suffix
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+# compression detected by leading bytes of file
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    # bz2: "BZh" and block size 1-9
+    **{b"BZh%d" % block_size: "bz2" for block_size in range(1, 10)},
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+# number of bytes decompressed per chunk
+DECOMPRESS_CHUNK_SIZE = 2**20
+# number of decompressed chunks buffered ahead of the parser
+DECOMPRESS_QUEUE_SIZE = 8
+
+
+def detect_compression(file_name: Union[str, Path]) -> Optional[str]:
+    """Return compression of file based on suffix or magic bytes,
+    or None for uncompressed files
+    """
+    compression = COMPRESSION_SUFFIXES.get(Path(file_name).suffix.lower())
+    if compression:
+        return compression
+    with open(file_name, "rb") as file_handle:
+        head = file_handle.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_binary(file_name: Union[str, Path], compression: str) -> IO[bytes]:
+    """Return binary stream of decompressed data"""
+    if compression == "gzip":
+        return gzip.open(file_name, "rb")
+    if compression == "bz2":
+        return bz2.open(file_name, "rb")
+    if compression == "xz":
+        return lzma.open(file_name, "rb")
+    if compression == "zstd":
+        if not ZSTD_AVAIL:
+            raise ValueError(
+                f"Reading {file_name} requires the zstandard package, "
+                f"install with `pip install zstandard`."
+            )
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(file_name, "rb"), closefd=True
+        )
+    raise ValueError(f"Compression {compression} not supported.")
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """Raw binary stream fed by a background decompression thread
+
+    Decompressed chunks are handed over through a bounded queue,
+    limiting memory use to DECOMPRESS_QUEUE_SIZE chunks.
+    """
+
+    def __init__(
+        self,
+        source: IO[bytes],
+        chunk_size: int = DECOMPRESS_CHUNK_SIZE,
+        queue_size: int = DECOMPRESS_QUEUE_SIZE,
+    ):
+        super().__init__()
+        self._source = source
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._pending = b""
+        self._eof = False
+        self._thread = threading.Thread(
+            target=self._decompress, name="lbsn-decompress", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        """Put item to queue, returns False if reader was closed"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self):
+        """Thread target: read decompressed chunks from source"""
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self._chunk_size)
+                if not chunk:
+                    break
+                if not self._put(chunk):
+                    return
+        except Exception as err:  # pylint: disable=broad-except
+            # re-raised in reading thread
+            self._put(err)
+            return
+        finally:
+            self._source.close()
+        self._put(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = item
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+
+def open_compressed_binary(file_name: Union[str, Path], compression: str) -> IO[bytes]:
+    """Open compressed file as binary stream, decompressed in background"""
+    raw = ThreadedDecompressor(_open_binary(file_name, compression))
+    return io.BufferedReader(raw, buffer_size=DECOMPRESS_CHUNK_SIZE)
+
+
+def open_compressed(
+    file_name: Union[str, Path],
+    compression: str,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+) -> IO[str]:
+    """Open compressed file as text stream, decompressed in background"""
+    return io.TextIOWrapper(
+        open_compressed_binary(file_name, compression),
+        encoding=encoding,
+        errors=errors,
+        newline=None,
+    )
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for joining csv records with rows of other csv files by key
+(e.g. YFCC100M photos with YFCC100M places).
+
+For each join file, a compact on-disk index (hashed key -> byte offset)
+is built once and stored next to the file (*.idx). It is reused in later
+runs, as long as the join file has not changed. Records are enriched by
+key lookup, independent of their order or of how input is sharded.
+"""
+
+import csv
+import logging
+import os
+import struct
+from array import array
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from lbsntransform.tools.lazy_imports import lazy_import
+
+# magic, number of entries, size and mtime of indexed file
+INDEX_HEADER = struct.Struct("<8sQQd")
+INDEX_MAGIC = b"LBSNIDX1"
+
+
+def hash_key(key: bytes) -> int:
+    """Return 64 bit hash of join key"""
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+
+
+class KeyOffsetIndex:
+    """Sorted on-disk index of key hashes and line offsets of a csv file
+
+    The key is the first column of each line. Hash collisions are
+    resolved by comparing the key of the referenced line.
+    """
+
+    def __init__(
+        self,
+        file_name: Union[str, Path],
+        delimiter: str = "\t",
+        index_path: Optional[Path] = None,
+    ):
+        self.file_name = Path(file_name)
+        self.delimiter = delimiter.encode("utf-8")
+        if index_path is None:
+            index_path = Path(f"{self.file_name}.idx")
+        self.index_path = index_path
+        if not self._is_valid():
+            self.build()
+        self._load()
+
+    def _source_stat(self):
+        stat = os.stat(self.file_name)
+        return stat.st_size, stat.st_mtime
+
+    def _is_valid(self) -> bool:
+        """Check if index exists and matches the current join file"""
+        if not self.index_path.exists():
+            return False
+        with open(self.index_path, "rb") as index_file:
+            header = index_file.read(INDEX_HEADER.size)
+        if len(header) < INDEX_HEADER.size:
+            return False
+        magic, __, size, mtime = INDEX_HEADER.unpack(header)
+        return magic == INDEX_MAGIC and (size, mtime) == self._source_stat()
+
+    def build(self):
+        """Read join file once and write sorted index"""
+        logging.getLogger("__main__").info(
+            f"Building join index for {self.file_name}.."
+        )
+        hashes = array("Q")
+        offsets = array("Q")
+        offset = 0
+        with open(self.file_name, "rb") as file_handle:
+            for line in file_handle:
+                key = line.split(self.delimiter, 1)[0].strip()
+                if key:
+                    hashes.append(hash_key(key))
+                    offsets.append(offset)
+                offset += len(line)
+        np = lazy_import("numpy")
+        hash_values = np.frombuffer(hashes, dtype=np.uint64)
+        offset_values = np.frombuffer(offsets, dtype=np.uint64)
+        order = np.argsort(hash_values, kind="stable")
+        size, mtime = self._source_stat()
+        tmp_path = Path(f"{self.index_path}.tmp")
+        with open(tmp_path, "wb") as index_file:
+            index_file.write(
+                INDEX_HEADER.pack(INDEX_MAGIC, len(hash_values), size, mtime)
+            )
+            index_file.write(hash_values[order].astype("<u8").tobytes())
+            index_file.write(offset_values[order].astype("<u8").tobytes())
+        os.replace(tmp_path, self.index_path)
+        logging.getLogger("__main__").info(
+            f"Indexed {len(hash_values)} keys in {self.index_path}"
+        )
+
+    def _load(self):
+        """Memory-map hashes and offsets of index"""
+        with open(self.index_path, "rb") as index_file:
+            __, count, __, __ = INDEX_HEADER.unpack(
+                index_file.read(INDEX_HEADER.size)
+            )
+        np = lazy_import("numpy")
+        if count == 0:
+            self.hashes = np.empty(0, dtype="<u8")
+            self.offsets = np.empty(0, dtype="<u8")
+            return
+        self.hashes = np.memmap(
+            self.index_path,
+            dtype="<u8",
+            mode="r",
+            offset=INDEX_HEADER.size,
+            shape=(count,),
+        )
+        self.offsets = np.memmap(
+            self.index_path,
+            dtype="<u8",
+            mode="r",
+            offset=INDEX_HEADER.size + 8 * count,
+            shape=(count,),
+        )
+
+    def lookup(self, key: str) -> Iterator[int]:
+        """Yield byte offsets of lines with matching key hash"""
+        np = lazy_import("numpy")
+        key_hash = np.uint64(hash_key(key.encode("utf-8")))
+        idx = int(np.searchsorted(self.hashes, key_hash, side="left"))
+        while idx < len(self.hashes) and self.hashes[idx] == key_hash:
+            yield int(self.offsets[idx])
+            idx += 1
+
+
+class CsvJoin:
+    """Append the matching row of join files to csv records
+
+    Args:
+        join_files: csv files with join key in first column
+        key_column: column of the join key in input records
+        csv_kwargs: csv dialect (delimiter, quoting) of join files
+    """
+
+    def __init__(
+        self,
+        join_files: List[Union[str, Path]],
+        key_column: int,
+        csv_kwargs: Dict[str, Any],
+    ):
+        self.key_column = key_column
+        self.csv_kwargs = csv_kwargs
+        self.joined_count = 0
+        self.unmatched_count = 0
+        self.sources = []
+        for join_file in join_files:
+            index = KeyOffsetIndex(join_file, delimiter=csv_kwargs["delimiter"])
+            self.sources.append((index, open(join_file, "rb")))
+
+    def lookup(self, key: str) -> Optional[List[str]]:
+        """Return row of join files with key, or None"""
+        for index, file_handle in self.sources:
+            for offset in index.lookup(key):
+                file_handle.seek(offset)
+                line = file_handle.readline().decode("utf-8", "replace")
+                row = next(csv.reader([line.rstrip("\r\n")], **self.csv_kwargs))
+                if row and row[0] == key:
+                    return row
+        return None
+
+    def join(self, record: List[str]) -> List[str]:
+        """Return record with matching join row appended"""
+        if len(record) <= self.key_column:
+            return record
+        row = self.lookup(record[self.key_column].strip())
+        if row is None:
+            self.unmatched_count += 1
+            return record
+        self.joined_count += 1
+        return record + row
+
+    def report(self) -> str:
+        """Return join statistics as formatted string"""
+        return (
+            f"Joined {self.joined_count} records, "
+            f"{self.unmatched_count} without matching key."
+        )
+
+    def close(self):
+        """Close join files"""
+        for __, file_handle in self.sources:
+            file_handle.close()
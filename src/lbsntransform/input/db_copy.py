@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for streaming json records from Postgres with COPY TO STDOUT.
+
+A single COPY statement returns all rows as csv text. It runs in a
+background thread (psycopg2 copy_expert() blocks until all rows have
+been written), rows are handed over through a bounded queue. The json
+text of rows is returned undecoded, to be decoded in the mapping
+(or its worker processes).
+"""
+
+import codecs
+import csv
+import queue
+import threading
+from typing import Iterator, List, Union
+
+# number of data chunks (usually rows) buffered ahead of the consumer
+COPY_QUEUE_SIZE = 1024
+
+
+class CopyAborted(Exception):
+    """Raised in COPY thread if the consumer stopped reading"""
+
+
+class CopyStream:
+    """Iterate csv rows of a COPY ... TO STDOUT WITH (FORMAT csv) statement
+
+    Args:
+        cursor: psycopg2 cursor, only used by the COPY thread
+        copy_sql: COPY statement
+    """
+
+    _DONE = object()
+
+    def __init__(self, cursor, copy_sql: str, queue_size: int = COPY_QUEUE_SIZE):
+        self.cursor = cursor
+        self.copy_sql = copy_sql
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._copy, name="lbsn-copy", daemon=True
+        )
+
+    def _put(self, item) -> bool:
+        """Put item to queue, returns False if consumer stopped"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def write(self, data: Union[bytes, str]):
+        """File interface for copy_expert(), called per chunk of data"""
+        if not self._put(data):
+            # abort COPY
+            raise CopyAborted()
+
+    def _copy(self):
+        """Thread target: run COPY statement"""
+        try:
+            self.cursor.copy_expert(self.copy_sql, self)
+        except Exception as err:  # pylint: disable=broad-except
+            if self._stop.is_set():
+                # consumer stopped, COPY was aborted
+                self.cursor.connection.rollback()
+                return
+            # re-raised in reading thread
+            self._put(err)
+            return
+        self._put(self._DONE)
+
+    def _iter_lines(self) -> Iterator[str]:
+        """Yield decoded lines (with line ending) of COPY output"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._DONE:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            pending += chunk
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield f"{line}\n"
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    def __iter__(self) -> Iterator[List[str]]:
+        self._thread.start()
+        try:
+            # csv format: quoted values may contain line breaks
+            for row in csv.reader(self._iter_lines()):
+                yield row
+        finally:
+            self._stop.set()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for reading lbsn tables from Postgres in parallel,
+partitioned by ranges of the key column.
+
+Key boundaries are estimated from sampled quantiles. Each key range
+is read on its own connection in a separate thread, rows of all
+ranges are merged into a single (bounded) queue. The last key
+committed to the output per range is kept as a bookmark, to allow
+resuming.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from lbsntransform.input.mappings.db_query import InputSQL, get_key_quantiles_sql
+
+# number of rows buffered per key range
+PARTITION_QUEUE_SIZE = 10000
+# percentage of table pages sampled for estimating key boundaries
+PARTITION_SAMPLE_PERCENT = 1.0
+
+KeyRange = Tuple[Optional[Union[int, str]], Optional[Union[int, str]]]
+
+
+def sample_key_ranges(
+    cursor,
+    schema_name: str,
+    table_name: str,
+    key_col: str,
+    partitions: int,
+    start_id: Optional[Union[int, str]] = None,
+    sample_percent: float = PARTITION_SAMPLE_PERCENT,
+) -> List[KeyRange]:
+    """Split key space of table into (start, end] ranges
+    based on sampled quantiles of the key column
+
+    The first range starts at start_id (or the table start),
+    the last range is open-ended.
+    """
+    if partitions < 2:
+        return [(start_id, None)]
+    cursor.execute(
+        get_key_quantiles_sql(
+            schema_name=schema_name,
+            table_name=table_name,
+            key_col=key_col,
+            partitions=partitions,
+            sample_percent=sample_percent,
+            start_id=start_id,
+        )
+    )
+    row = cursor.fetchone()
+    boundaries = []
+    if row and row[0]:
+        for boundary in row[0]:
+            # small samples may return duplicate boundaries
+            if boundary is not None and boundary not in boundaries:
+                boundaries.append(boundary)
+    starts = [start_id] + boundaries
+    ends = boundaries + [None]
+    return list(zip(starts, ends))
+
+
+class PartitionBookmarks:
+    """Last committed key per key range, stored as json
+
+    Format: {"schema.table": [[start, end, last], ...]}
+    """
+
+    def __init__(self, bookmarks_path: Optional[Path] = None):
+        self.bookmarks_path = bookmarks_path
+        self.bookmarks: Dict[str, List[List[Any]]] = {}
+        if bookmarks_path and Path(bookmarks_path).exists():
+            with open(bookmarks_path, "r", encoding="utf-8") as file_handle:
+                self.bookmarks = json.load(file_handle)
+
+    def get_ranges(self, table_ref: str) -> Optional[List[List[Any]]]:
+        """Return stored [start, end, last] entries for table, if any"""
+        return self.bookmarks.get(table_ref)
+
+    def set_ranges(self, table_ref: str, ranges: List[List[Any]]):
+        """Store [start, end, last] entries for table"""
+        self.bookmarks[table_ref] = ranges
+
+    def save(self):
+        """Write bookmarks to json file"""
+        if not self.bookmarks_path:
+            return
+        # replace atomically, bookmarks are stored after each commit
+        tmp_path = Path(f"{self.bookmarks_path}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file_handle:
+            json.dump(self.bookmarks, file_handle, indent=2, default=str)
+        os.replace(tmp_path, self.bookmarks_path)
+        logging.getLogger("__main__").debug(
+            f"Stored partition bookmarks in {self.bookmarks_path}"
+        )
+
+
+class PartitionedReader:
+    """Read key ranges of a lbsn table in parallel threads
+
+    Each thread opens its own connection with connect(),
+    which must return a tuple (connection, dict_cursor).
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        connect,
+        schema_name: str,
+        table_name: str,
+        key_col: str,
+        key_ranges: List[List[Any]],
+        number_of_records_to_fetch: int = 10000,
+    ):
+        self.connect = connect
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.key_col = key_col
+        # entries of [start, end, last consumed key]
+        self.key_ranges = key_ranges
+        self.number_of_records_to_fetch = number_of_records_to_fetch
+        self._queue = queue.Queue(
+            maxsize=PARTITION_QUEUE_SIZE * max(len(key_ranges), 1)
+        )
+        self._stop = threading.Event()
+
+    def _put(self, item) -> bool:
+        """Put item to queue, returns False if reading was stopped"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_range(self, range_idx: int):
+        """Thread target: page through a single key range"""
+        __, end_id, last_id = self.key_ranges[range_idx]
+        conn = None
+        try:
+            conn, cursor = self.connect()
+            while not self._stop.is_set():
+                cursor.execute(
+                    InputSQL.LBSN.get_sql(
+                        schema_name=self.schema_name,
+                        table_name=self.table_name,
+                        start_id=last_id,
+                        end_id=end_id,
+                        number_of_records_to_fetch=self.number_of_records_to_fetch,
+                        key_col=self.key_col,
+                    )
+                )
+                records = cursor.fetchall()
+                if not records:
+                    break
+                for record in records:
+                    if not self._put((range_idx, record)):
+                        return
+                last_id = records[-1].get(self.key_col)
+        except Exception as err:  # pylint: disable=broad-except
+            # re-raised in consuming thread
+            self._put((range_idx, err))
+            return
+        finally:
+            if conn is not None:
+                conn.close()
+        self._put((range_idx, self._DONE))
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield rows of all key ranges, as they arrive
+
+        The last key returned of each range is updated in key_ranges.
+        """
+        threads = [
+            threading.Thread(
+                target=self._read_range,
+                args=(range_idx,),
+                name=f"lbsn-partition-{range_idx}",
+                daemon=True,
+            )
+            for range_idx in range(len(self.key_ranges))
+        ]
+        for thread in threads:
+            thread.start()
+        running = len(threads)
+        try:
+            while running:
+                range_idx, record = self._queue.get()
+                if record is self._DONE:
+                    running -= 1
+                    continue
+                if isinstance(record, Exception):
+                    raise record
+                self.key_ranges[range_idx][2] = record.get(self.key_col)
+                yield record
+        finally:
+            self._stop.set()
@@ -10,20 +10,49 @@ import os
 import sys
 import logging
 import traceback
-from contextlib import closing
+from collections.abc import Mapping
 from itertools import zip_longest
-from typing import Tuple, List, Union, Iterator, Optional, IO
-import psycopg2
+from typing import Any, Dict, Tuple, List, Union, Iterator, Optional, IO
 
 import ntpath
-import requests
+from pathlib import Path
 import lbsnstructure as lbsn
 
 from lbsntransform.tools.db_connection import DBConnection
 from lbsntransform.output.shared_structure import GeocodeLocations
+from lbsntransform.output.proto.store_proto import PROTO_FILE_TYPE, read_proto_stream
+from lbsntransform.input.mapping_pool import (
+    MappingPool,
+    WORKER_BATCH_SIZE,
+    iter_csv_chunks,
+)
+from lbsntransform.input.arrow_input import ARROW_FILE_TYPES, ArrowRecordReader
+from lbsntransform.input.csv_join import CsvJoin
+from lbsntransform.input.checkpoints import InputCheckpoint, OffsetLineReader
+from lbsntransform.input.db_copy import CopyStream
+from lbsntransform.input.web_stream import (
+    ResumableHTTPStream,
+    load_web_offsets,
+    save_web_offsets,
+)
+from lbsntransform.input.read_ahead import ReadAhead, READ_AHEAD_BATCH_SIZE
+from lbsntransform.input.db_partitions import (
+    PartitionBookmarks,
+    PartitionedReader,
+    sample_key_ranges,
+)
+from lbsntransform.input.compression import (
+    COMPRESSION_SUFFIXES,
+    detect_compression,
+    open_compressed,
+    open_compressed_binary,
+)
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.json_backend import set_json_backend, loads as json_loads
+from lbsntransform.tools.lazy_imports import lazy_import
 from lbsntransform.input.mappings.db_query import (
     InputSQL,
+    JSON_INPUT_TABLE,
     LBSN_SCHEMA,
     optional_schema_override,
 )
@@ -43,6 +72,11 @@ LBSNObjects = Union[
     lbsn.User,
     lbsn.UserGroup,
 ]
+# read position of db and web input: db key, byte offsets per url,
+# (table reference, [start, end, last key] per range) of partitioned reads
+ResumeState = Tuple[
+    Any, Optional[Dict[str, int]], Optional[Tuple[str, List[List[Any]]]]
+]
 
 
 class LoadData:
@@ -79,10 +113,28 @@ class LoadData:
         include_lbsn_objects=None,
         override_lbsn_query_schema=None,
         use_csv_dictreader=None,
+        workers=None,
+        origin=None,
+        mappings_path=None,
+        number_of_records_to_fetch=None,
+        server_side_cursor=None,
+        input_partitions=None,
+        partition_bookmarks=None,
+        db_input_conn_args=None,
+        prefetch_depth=None,
+        web_offsets=None,
+        checkpoint_file=None,
+        mmap_csv=None,
+        map_csv_batches=None,
+        join_files=None,
+        join_key_column=None,
+        copy_input=None,
+        json_backend=None,
     ):
         self.is_local_input = is_local_input
         self.start_number = 1
-        self.continue_number = None
+        # read position of input, see continue_number
+        self.read_number = None
         self.skip_until_record = None
         if not self.is_local_input:
             # Start Value, Modify to continue from last processing
@@ -96,6 +148,35 @@ class LoadData:
             zip_records = False
         self.zip_records = zip_records
         self.cursor_input = cursor_input
+        if number_of_records_to_fetch is None:
+            number_of_records_to_fetch = 10000
+        self.number_of_records_to_fetch = number_of_records_to_fetch
+        self.server_side_cursor = server_side_cursor
+        # optional: stream json input db with COPY TO STDOUT
+        self.copy_input = copy_input
+        # optional: decode json with orjson or simdjson
+        self.json_backend = json_backend
+        set_json_backend(json_backend)
+        if self.cursor_input and json_backend not in (None, "json"):
+            # json columns of input db are decoded by psycopg2
+            extras = lazy_import("psycopg2.extras")
+            for register in (
+                extras.register_default_json,
+                extras.register_default_jsonb,
+            ):
+                register(self.cursor_input.connection, loads=json_loads)
+        # optional: read key ranges of lbsn tables in parallel,
+        # each on its own connection
+        self.input_partitions = input_partitions
+        self.db_input_conn_args = db_input_conn_args
+        self.partition_bookmarks = None
+        if self.cursor_input and input_partitions and input_partitions > 1:
+            self.partition_bookmarks = PartitionBookmarks(partition_bookmarks)
+        # table reference and reader of current partitioned read
+        self.partition_reader: Optional[Tuple[str, PartitionedReader]] = None
+        # optional: read db and web input ahead of processing
+        self.prefetch_depth = prefetch_depth
+        self.read_ahead = None
         if self.is_local_input and not self.source_web:
             self.filelist = LoadData._read_local_files(
                 input_path=input_path,
@@ -105,6 +186,13 @@ class LoadData:
             )
         elif self.is_local_input and self.source_web:
             self.filelist = input_path
+        # optional: resume web sources at stored byte offsets
+        self.web_offsets_path = web_offsets
+        self.web_offsets = load_web_offsets(web_offsets)
+        self.web_streams: Dict[str, ResumableHTTPStream] = {}
+        # read position of input converted completely,
+        # stored after each commit, see write_checkpoint()
+        self.resume_state = None
         self.finished = False
         self.dbformat_input = dbformat_input
 
@@ -121,8 +209,17 @@ class LoadData:
         if include_lbsn_objects is None:
             include_lbsn_objects = ["post"]
         self.include_lbsn_objects = include_lbsn_objects
+        self.ignore_non_geotagged = ignore_non_geotagged
+        # parquet and arrow readers, for reporting filtered rows
+        self.arrow_readers: List[ArrowRecordReader] = []
         self.count_glob = 0
         self.current_source = None
+        # optional: byte offset checkpoints for line based local input
+        self.checkpoint = None
+        self.line_reader = None
+        self.resume_offset = 0
+        if checkpoint_file:
+            self._init_checkpoint(checkpoint_file)
         # self.transferlimit = cfg.transferlimit
         # Optional Geocoding
         self.geocode_dict = None
@@ -156,6 +253,51 @@ class LoadData:
         # initialize field mapping structure
         self.import_mapper = importer(**kwargs)
         self.finished = False
+        # optional: map records in worker processes,
+        # each worker initializes its own importer (by origin)
+        self.workers = workers
+        self.origin = origin
+        self.mappings_path = mappings_path
+        self.importer_kwargs = kwargs
+        # optional: split large csv files into chunks for workers
+        self.mmap_csv = mmap_csv
+        # optional: map csv records in batches (parse_csv_batch of importer)
+        self.map_csv_batches = map_csv_batches
+        # optional: join csv records with rows of other files, by key
+        self.csv_join = None
+        if join_files:
+            if self.file_format not in ("txt", "csv") or self.use_csv_dictreader:
+                raise ValueError(
+                    "--join_files is only supported for csv input "
+                    "(without --use_csv_dictreader)."
+                )
+            if join_key_column is None:
+                join_key_column = 1
+            self.csv_join = CsvJoin(
+                join_files,
+                key_column=join_key_column,
+                csv_kwargs={
+                    "delimiter": self.csv_delim or ",",
+                    "quotechar": '"',
+                    "quoting": csv.QUOTE_NONE,
+                },
+            )
+
+    @property
+    def continue_number(self):
+        """Resume key (or file/record number) of input processed so far
+
+        With read-ahead, records are read in a background thread,
+        ahead of processing: the key of the last batch handed over
+        is returned, not the last key read.
+        """
+        if self.read_ahead is not None:
+            return self.read_ahead.position[0]
+        return self.read_number
+
+    @continue_number.setter
+    def continue_number(self, value):
+        self.read_number = value
 
     def __enter__(self) -> Iterator[LBSNObjects]:
         """Main pipeline for reading input data
@@ -164,12 +306,56 @@ class LoadData:
         returned for being processed by with-statement
         """
         if self.cursor_input or self.source_web:
-            return self.convert_records(self._process_input())
+            records = self._process_input()
+            if self.csv_join:
+                records = self._join_records(records)
+            if self.prefetch_depth:
+                # fetch db pages or web records in background thread
+                batch_size = READ_AHEAD_BATCH_SIZE
+                if self.cursor_input:
+                    batch_size = self.number_of_records_to_fetch
+                self.read_ahead = ReadAhead(
+                    records,
+                    depth=self.prefetch_depth,
+                    batch_size=batch_size,
+                    get_position=self._get_read_state,
+                )
+                records = iter(self.read_ahead)
+            if (
+                self._track_resume_state()
+                and not (self.workers and self.workers > 1)
+                and not self._use_csv_batches()
+            ):
+                records = self._track_processed(records)
+            return self.convert_records(records)
         else:
-            return self.convert_records(self._process_input(self._open_input_files()))
+            if self._use_mmap_csv():
+                return self._convert_csv_chunks_parallel()
+            records = self._process_input(self._open_input_files())
+            if self.csv_join:
+                records = self._join_records(records)
+            if (
+                self.checkpoint
+                and not (self.workers and self.workers > 1)
+                and not self._use_csv_batches()
+            ):
+                records = self._track_checkpoint(records)
+            return self.convert_records(records)
 
     def __exit__(self, exception_type, exception_value, tb_value):
-        """Contextmanager exit: nothing to do here if no exception is raised"""
+        """Contextmanager exit: report exceptions
+
+        Positions for resuming (web offsets, partition bookmarks) are
+        stored after each commit of output, see write_checkpoint().
+        """
+        if self.read_ahead:
+            logging.getLogger("__main__").info(self.read_ahead.report())
+        if self.csv_join:
+            logging.getLogger("__main__").info(self.csv_join.report())
+            self.csv_join.close()
+        for arrow_reader in self.arrow_readers:
+            if arrow_reader.not_null_columns:
+                logging.getLogger("__main__").info(arrow_reader.report())
         if any(v is not None for v in [exception_type, exception_value, tb_value]):
             # only if any of these variables is not None
             # catch exception and output additional information
@@ -192,6 +378,35 @@ class LoadData:
             self.continue_number += 1
             self.current_source = file_name
             HF.log_main_debug(f"Current file: {ntpath.basename(file_name)}")
+            if self.file_format in ARROW_FILE_TYPES:
+                yield self._get_arrow_reader(file_name)
+                continue
+            compression = detect_compression(file_name)
+            if self.file_format == PROTO_FILE_TYPE:
+                # length-delimited lbsn archives are read binary
+                if compression:
+                    yield open_compressed_binary(file_name, compression)
+                else:
+                    yield open(file_name, "rb")
+                continue
+            if self.checkpoint:
+                # read binary to track byte offset of records
+                if compression:
+                    file_handle = open_compressed_binary(file_name, compression)
+                else:
+                    file_handle = open(file_name, "rb")
+                self.line_reader = OffsetLineReader(
+                    file_handle,
+                    offset=self.resume_offset,
+                    header=bool(self.use_csv_dictreader),
+                )
+                self.resume_offset = 0
+                yield self.line_reader
+                continue
+            if compression:
+                # decompressed in background thread
+                yield open_compressed(file_name, compression)
+                continue
             yield open(file_name, "r", encoding="utf-8", errors="replace")
 
     def _process_input(
@@ -214,58 +429,44 @@ class LoadData:
             if len(self.filelist) == 1:
                 # single web file query
                 url = self.filelist[0]
-                with closing(requests.get(url, stream=True)) as file_handle:
-                    record_reader = csv.reader(
-                        codecs.iterdecode(
-                            file_handle.iter_lines(), "utf-8"
-                        ),  # pylint: disable=maybe-no-member
-                        **kwargs,
+                stream = self._get_web_stream(url)
+                lines = codecs.iterdecode(stream.iter_lines(), "utf-8")
+                if self.use_csv_dictreader:
+                    record_reader = csv.DictReader(
+                        lines, fieldnames=self._get_web_header(stream, kwargs), **kwargs
                     )
-                    if self.use_csv_dictreader:
-                        record_reader = csv.DictReader(
-                            codecs.iterdecode(
-                                file_handle.iter_lines(), "utf-8"
-                            ),  # pylint: disable=maybe-no-member
-                            **kwargs,
-                        )
-                    for record in record_reader:
-                        # for record in zip_longest(r1, r2)
-                        yield record, None
+                else:
+                    record_reader = csv.reader(lines, **kwargs)
+                for record in record_reader:
+                    yield record, None
             else:
                 # multiple web file query
                 if self.zip_records and len(self.filelist) == 2:
                     # zip 2 web csv sources in parallel, e.g.
                     # zip_longest('ABCD', 'xy', fillvalue='-') --> Ax By C- D-
-                    url1 = self.filelist[0]
-                    url2 = self.filelist[1]
-                    with closing(requests.get(url1, stream=True)) as fhandle1, closing(
-                        requests.get(url2, stream=True)
-                    ) as fhandle2:
-                        if self.use_csv_dictreader:
-                            logging.getLogger("__main__").warning(
-                                "--use_csv_dictreader not supported with flag --zip_records."
-                            )
-                        reader1 = csv.reader(
-                            codecs.iterdecode(fhandle1.iter_lines(), "utf-8"), **kwargs
-                        )
-                        reader2 = csv.reader(
-                            codecs.iterdecode(fhandle2.iter_lines(), "utf-8"), **kwargs
+                    stream1 = self._get_web_stream(self.filelist[0])
+                    stream2 = self._get_web_stream(self.filelist[1])
+                    if self.use_csv_dictreader:
+                        logging.getLogger("__main__").warning(
+                            "--use_csv_dictreader not supported with flag --zip_records."
                         )
-                        for zipped_record in zip_longest(reader1, reader2):
-                            # catch any type-error None record
-                            # if zipped_record[0] is None:
-                            #     yield zipped_record[1]
-                            # if zipped_record[1] is None:
-                            #     yield zipped_record[0]
-                            # two combine lists
-                            try:
-                                yield zipped_record[0] + zipped_record[1], None
-                            except TypeError:
-                                sys.exit(
-                                    f"Stream appears to have broken. "
-                                    f"Check connection and continue at "
-                                    f"{self.count_glob}"
-                                )
+                    reader1 = csv.reader(
+                        codecs.iterdecode(stream1.iter_lines(), "utf-8"), **kwargs
+                    )
+                    reader2 = csv.reader(
+                        codecs.iterdecode(stream2.iter_lines(), "utf-8"), **kwargs
+                    )
+                    for zipped_record in zip_longest(reader1, reader2):
+                        # two combine lists
+                        try:
+                            yield zipped_record[0] + zipped_record[1], None
+                        except TypeError:
+                            sys.exit(
+                                f"Stream appears to have broken. "
+                                f"Check connection and continue at "
+                                f"{self.count_glob} (byte offsets: "
+                                f"{self._get_resume_web_offsets()})"
+                            )
                     return
                 else:
                     raise ValueError(
@@ -309,10 +510,31 @@ class LoadData:
                 for lbsn_type, schema_name, table_name, key_col in self.lbsn_schema:
                     if lbsn_type.lower() not in self.include_lbsn_objects:
                         continue
-                    while self.cursor_input:
+                    if self.cursor_input and self.partition_bookmarks:
+                        for record in self._read_partitioned(
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            key_col=key_col,
+                        ):
+                            yield record, lbsn_type
+                    elif self.cursor_input and self.server_side_cursor:
+                        for record in self.stream_json_data_from_lbsn(
+                            cursor=self.cursor_input,
+                            start_id=self.read_number,
+                            schema_name=schema_name,
+                            table_name=table_name,
+                            key_col=key_col,
+                        ):
+                            yield record, lbsn_type
+                    while (
+                        self.cursor_input
+                        and not self.server_side_cursor
+                        and not self.partition_bookmarks
+                    ):
                         records = self.fetch_json_data_from_lbsn(
                             cursor=self.cursor_input,
-                            start_id=self.continue_number,
+                            start_id=self.read_number,
+                            number_of_records_to_fetch=self.number_of_records_to_fetch,
                             schema_name=schema_name,
                             table_name=table_name,
                             key_col=key_col,
@@ -324,12 +546,31 @@ class LoadData:
                     # reset start cursor
                     # note: this will disable --startwith_db_rownumber for
                     # any further lbsnobjects
-                    self.continue_number = None
+                    self.read_number = None
             elif self.dbformat_input == "json":
+                # copy and paged queries read the same table
+                schema_name, table_name, key_col = JSON_INPUT_TABLE
+                if self.cursor_input and self.copy_input:
+                    for record in self.copy_json_data_from_db(
+                        cursor=self.cursor_input,
+                        start_id=self.read_number,
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        key_col=key_col,
+                    ):
+                        yield record, self.input_lbsn_type
+                    return
                 while self.cursor_input:
                     records = self.fetch_json_data_from_lbsn(
-                        cursor=self.cursor_input, start_id=self.continue_number
+                        cursor=self.cursor_input,
+                        start_id=self.read_number,
+                        number_of_records_to_fetch=self.number_of_records_to_fetch,
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        key_col=key_col,
                     )
+                    if records is None:
+                        break
                     for record in records:
                         yield record, self.input_lbsn_type
 
@@ -341,30 +582,40 @@ class LoadData:
 
         Returns statistic-counts, modifies (adds results to) import_mapper
         """
+        if self.local_file_type == PROTO_FILE_TYPE:
+            for lbsn_record in self._pass_archived_records(records):
+                yield lbsn_record
+            return
+        if self.workers and self.workers > 1:
+            for lbsn_record in self._convert_records_parallel(records):
+                yield lbsn_record
+            return
+        if self._use_csv_batches():
+            for lbsn_record in self._convert_csv_batches(records):
+                yield lbsn_record
+            return
         for record in records:
             self.count_glob += 1
             # skip records based on count
             if self.skip_until_record and self.skip_until_record > self.count_glob:
                 print(f"Skipping record {self.count_glob}", end="\r")
                 continue
-            record_type = None
-            if self.is_local_input or self.dbformat_input == "lbsn":
-                single_record = record[0]
-                record_type = record[1]
-            else:
-                # e.g. dbformat_input == "json"
-                self.db_row_number = record[0]
-                single_record = record[2]
+            single_record, record_type, db_row_number = self._unpack_record(record)
+            if db_row_number is not None:
+                self.db_row_number = db_row_number
+            if isinstance(single_record, str) and self._is_json_input():
+                # raw json text, e.g. from --copy_input
+                single_record = HF.json_load_wrapper(single_record, single=True)
             if LoadData.skip_empty_or_other(single_record):
                 # skip empty or malformed records
                 continue
             # pass arguments by position,
             # record_type may not always be avaiable/ used by mapping
             args = [single_record, record_type]
-            if self.local_file_type == "json" or not self.is_local_input:
+            if self._is_json_input():
                 # note: db-records always returned as json-dict
                 lbsn_records = self.import_mapper.parse_json_record(*args)
-            elif self.local_file_type in ("txt", "csv"):
+            elif self._is_csv_input():
                 lbsn_records = self.import_mapper.parse_csv_record(*args)
             else:
                 sys.exit(f"Format {self.local_file_type} not supported.")
@@ -374,6 +625,233 @@ class LoadData:
             for lbsn_record in lbsn_records:
                 yield lbsn_record
 
+    def _pass_archived_records(
+        self, records: Iterator[Tuple[LBSNObjects, None]]
+    ) -> Iterator[LBSNObjects]:
+        """Return lbsn records read from archives, without mapping"""
+        for lbsn_record, __ in records:
+            self.count_glob += 1
+            if self.skip_until_record and self.skip_until_record > self.count_glob:
+                print(f"Skipping record {self.count_glob}", end="\r")
+                continue
+            yield lbsn_record
+
+    def _use_csv_batches(self) -> bool:
+        """Check whether csv records are mapped in batches
+
+        Requires --map_csv_batches and an importer with parse_csv_batch
+        (columnar conversion of coordinates, geoaccuracy etc.). Records are
+        then not tracked individually (_track_checkpoint, _track_processed),
+        count_glob and checkpoint are updated per batch.
+        """
+        return (
+            bool(self.map_csv_batches)
+            and not self._is_json_input()
+            and self._is_csv_input()
+            and hasattr(self.import_mapper, "parse_csv_batch")
+        )
+
+    def _convert_csv_batches(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[LBSNObjects]:
+        """Map csv records in batches with parse_csv_batch of importer
+
+        count_glob, db_row_number and checkpoint are updated once
+        all records of a batch have been returned.
+        """
+        for batch, (
+            count,
+            db_row_number,
+            read_position,
+            resume_state,
+        ) in self._batch_records(records):
+            lbsn_records = self.import_mapper.parse_csv_batch(
+                [single_record for single_record, __ in batch]
+            )
+            for lbsn_record in lbsn_records:
+                yield lbsn_record
+            self.count_glob = count
+            self.db_row_number = db_row_number
+            if read_position:
+                self.checkpoint.update(*read_position, count)
+            if resume_state:
+                self.resume_state = resume_state
+
+    def _is_json_input(self) -> bool:
+        """Return True if records are mapped from json (files or db)"""
+        return self.local_file_type == "json" or not self.is_local_input
+
+    def _is_csv_input(self) -> bool:
+        """Return True if records are mapped as csv rows
+        (lists, or dicts from --use_csv_dictreader, parquet and arrow)
+        """
+        return self.local_file_type in ("txt", "csv", *ARROW_FILE_TYPES)
+
+    def _unpack_record(self, record) -> Tuple[Any, Optional[str], Optional[int]]:
+        """Return single record, record type and (optional) db row number"""
+        if self.is_local_input or self.dbformat_input == "lbsn":
+            return record[0], record[1], None
+        # e.g. dbformat_input == "json"
+        return record[2], None, record[0]
+
+    def _convert_records_parallel(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[LBSNObjects]:
+        """Map records in batches in a pool of worker processes
+
+        Results are returned in input order; count_glob and db_row_number
+        are updated once all records of a batch have been returned.
+        """
+        if self.origin is None:
+            raise ValueError("Mapping with workers requires origin of importer.")
+        if not self._is_json_input() and not self._is_csv_input():
+            sys.exit(f"Format {self.local_file_type} not supported.")
+        pool = self._get_mapping_pool()
+        try:
+            for (
+                count,
+                db_row_number,
+                read_position,
+                resume_state,
+            ), lbsn_records, counters, __ in pool.map_batches(
+                self._batch_records(records)
+            ):
+                for lbsn_record in lbsn_records:
+                    yield lbsn_record
+                self.count_glob = count
+                self.db_row_number = db_row_number
+                if read_position:
+                    self.checkpoint.update(*read_position, count)
+                if resume_state:
+                    self.resume_state = resume_state
+                self._add_worker_counters(counters)
+        finally:
+            pool.close()
+
+    def _get_mapping_pool(self) -> MappingPool:
+        """Start pool of worker processes for mapping records"""
+        if self.origin is None:
+            raise ValueError("Mapping with workers requires origin of importer.")
+        return MappingPool(
+            workers=self.workers,
+            origin=self.origin,
+            mappings_path=self.mappings_path,
+            importer_kwargs=self.importer_kwargs,
+            is_json=self._is_json_input(),
+            json_backend=self.json_backend,
+        )
+
+    def _add_worker_counters(self, counters: Dict[str, int]):
+        """Aggregate statistics of importers in worker processes"""
+        for counter, value in counters.items():
+            setattr(
+                self.import_mapper,
+                counter,
+                getattr(self.import_mapper, counter, 0) + value,
+            )
+
+    def _use_mmap_csv(self) -> bool:
+        """Check whether local csv files can be read memory-mapped in chunks"""
+        if not self.mmap_csv:
+            return False
+        if (
+            not self.workers
+            or self.workers < 2
+            or self.file_format not in ("txt", "csv")
+            or self.zip_records
+            or self.use_csv_dictreader
+            or self.skip_until_record
+            or self.csv_join
+            or any(detect_compression(file_name) for file_name in self.filelist)
+        ):
+            logging.getLogger("__main__").warning(
+                "--mmap_csv requires --workers > 1 and uncompressed csv input "
+                "(no --zip_records, --use_csv_dictreader, --skip_until_record "
+                "or --join_files). "
+                "Continuing with regular csv reader."
+            )
+            return False
+        return True
+
+    def _convert_csv_chunks_parallel(self) -> Iterator[LBSNObjects]:
+        """Parse and map memory-mapped csv files in chunks, in worker processes
+
+        Each file is split into byte ranges aligned to line endings,
+        results are returned in input order.
+        """
+        if self.csv_delim is None:
+            self.csv_delim = ","
+        csv_kwargs = {
+            "delimiter": self.csv_delim,
+            "quotechar": '"',
+            "quoting": csv.QUOTE_NONE,
+        }
+        pool = self._get_mapping_pool()
+        try:
+            for (file_name, end), lbsn_records, counters, input_count in (
+                pool.map_csv_chunks(self._iter_file_chunks(), csv_kwargs)
+            ):
+                for lbsn_record in lbsn_records:
+                    yield lbsn_record
+                self.count_glob += input_count
+                self.current_source = file_name
+                if self.checkpoint:
+                    self.checkpoint.update(file_name, end, self.count_glob)
+                self._add_worker_counters(counters)
+        finally:
+            pool.close()
+
+    def _iter_file_chunks(
+        self,
+    ) -> Iterator[Tuple[Tuple[str, int, int], Tuple[str, int]]]:
+        """Yield byte ranges of input files, tagged with file name and end"""
+        for file_name in self.filelist:
+            self.continue_number += 1
+            HF.log_main_debug(f"Current file: {ntpath.basename(file_name)}")
+            for start, end in iter_csv_chunks(file_name, offset=self.resume_offset):
+                yield (str(file_name), start, end), (str(file_name), end)
+            self.resume_offset = 0
+
+    def _batch_records(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[Tuple[List[Tuple[Any, Optional[str]]], Tuple[int, int, Any, Any]]]:
+        """Group raw records into batches for worker processes
+
+        Each batch is tagged with the input count, db row number,
+        read position (checkpoints) and resume state (web offsets)
+        of its last record.
+        """
+        track_resume_state = self._track_resume_state()
+        count = self.count_glob
+        db_row_number = self.db_row_number
+        read_position = None
+        batch = []
+        for record in records:
+            count += 1
+            if self.checkpoint:
+                read_position = self._get_read_position()
+            # skip records based on count
+            if self.skip_until_record and self.skip_until_record > count:
+                print(f"Skipping record {count}", end="\r")
+                continue
+            single_record, record_type, row_number = self._unpack_record(record)
+            if row_number is not None:
+                db_row_number = row_number
+            if LoadData.skip_empty_or_other(single_record):
+                continue
+            batch.append((single_record, record_type))
+            if len(batch) >= WORKER_BATCH_SIZE:
+                resume_state = None
+                if track_resume_state:
+                    resume_state = self._get_resume_state()
+                yield batch, (count, db_row_number, read_position, resume_state)
+                batch = []
+        # final batch, may be empty
+        resume_state = None
+        if track_resume_state:
+            resume_state = self._get_resume_state()
+        yield batch, (count, db_row_number, read_position, resume_state)
+
     @staticmethod
     def skip_empty_or_other(single_record):
         """Detect  Rate Limiting Notice or empty records
@@ -381,7 +859,7 @@ class LoadData:
         """
         skip = False
         if not single_record or (
-            isinstance(single_record, dict) and single_record.get("limit")
+            isinstance(single_record, Mapping) and single_record.get("limit")
         ):
             skip = True
         return skip
@@ -421,27 +899,325 @@ class LoadData:
             return None
         # update last returned db_row_number
         if key_col == None:
-            self.continue_number = records[-1][0]
+            self.read_number = records[-1][0]
             if not self.start_number:
                 # first returned db_row_number
                 self.start_number = records[0][0]
         else:
-            self.continue_number = records[-1].get(key_col)
+            self.read_number = records[-1].get(key_col)
             if not self.start_number:
                 # first returned db_row_number
                 self.start_number = records[0].get(key_col)
         return records
 
+    def stream_json_data_from_lbsn(
+        self,
+        cursor,
+        start_id=None,
+        schema_name=None,
+        table_name=None,
+        key_col=None,
+    ) -> Iterator[List[str]]:
+        """Streams records from Postgres DB with a named (server-side) cursor
+
+        A single query is executed, rows are transferred in batches
+        of number_of_records_to_fetch (itersize) while iterating.
+
+        Keyword arguments:
+        cursor -- db-cursor, the server-side cursor is opened on its connection
+        start_id -- Offset for querying
+        """
+        query_sql = InputSQL.LBSN.get_sql(
+            schema_name=schema_name,
+            table_name=table_name,
+            start_id=start_id,
+            number_of_records_to_fetch=None,
+            key_col=key_col,
+        )
+        with cursor.connection.cursor(name="lbsn_input_stream") as stream_cursor:
+            stream_cursor.itersize = self.number_of_records_to_fetch
+            stream_cursor.execute(query_sql)
+            for record in stream_cursor:
+                # update last returned db_row_number
+                if key_col is None:
+                    self.read_number = record[0]
+                else:
+                    self.read_number = record.get(key_col)
+                if not self.start_number:
+                    # first returned db_row_number
+                    self.start_number = self.read_number
+                yield record
+
+    def copy_json_data_from_db(
+        self,
+        cursor,
+        start_id=None,
+        schema_name=None,
+        table_name=None,
+        key_col=None,
+    ) -> Iterator[Tuple[str, None, str]]:
+        """Streams json records from Postgres DB with COPY TO STDOUT
+
+        A single statement is executed, rows are returned as
+        tuples (key, None, json text), json is decoded during mapping
+        (in worker processes, with --workers).
+
+        Keyword arguments:
+        cursor -- db-cursor
+        start_id -- Offset for querying
+        schema_name, table_name, key_col -- json input table,
+            see JSON_INPUT_TABLE
+        """
+        copy_sql = InputSQL.COPY.get_sql(
+            schema_name=schema_name,
+            table_name=table_name,
+            start_id=start_id,
+            number_of_records_to_fetch=None,
+            key_col=key_col,
+        )
+        for key, json_text in CopyStream(cursor, copy_sql):
+            # update last returned db_row_number
+            self.read_number = key
+            if not self.start_number:
+                # first returned db_row_number
+                self.start_number = key
+            yield key, None, json_text
+
+    def _read_partitioned(
+        self, schema_name: str, table_name: str, key_col: str
+    ) -> Iterator[List[str]]:
+        """Read lbsn table in parallel key ranges
+
+        Key ranges are restored from bookmarks, if available,
+        otherwise estimated from sampled key quantiles.
+        """
+        table_ref = f"{schema_name}.{table_name}"
+        key_ranges = self.partition_bookmarks.get_ranges(table_ref)
+        if key_ranges is not None:
+            # bookmarks are updated from read positions of converted
+            # records only, see write_checkpoint()
+            key_ranges = [list(key_range) for key_range in key_ranges]
+        else:
+            key_ranges = [
+                [start_id, end_id, start_id]
+                for start_id, end_id in sample_key_ranges(
+                    self.cursor_input,
+                    schema_name=schema_name,
+                    table_name=table_name,
+                    key_col=key_col,
+                    partitions=self.input_partitions,
+                    start_id=self.read_number,
+                )
+            ]
+        logging.getLogger("__main__").info(
+            f"Reading {table_ref} in {len(key_ranges)} key ranges"
+        )
+        reader = PartitionedReader(
+            connect=self._connect_input,
+            schema_name=schema_name,
+            table_name=table_name,
+            key_col=key_col,
+            key_ranges=key_ranges,
+            number_of_records_to_fetch=self.number_of_records_to_fetch,
+        )
+        self.partition_reader = table_ref, reader
+        for record in reader:
+            yield record
+
+    def _connect_input(self):
+        """Open additional connection to input db, returns (conn, cursor)"""
+        return LoadData.initialize_connection(
+            *self.db_input_conn_args, readonly=True, dict_cursor=True
+        )
+
+    def _join_records(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[Optional[Tuple[List[str], Optional[str]]]]:
+        """Append matching rows of join files to csv records"""
+        for record, record_type in records:
+            yield self.csv_join.join(record), record_type
+
+    def _init_checkpoint(self, checkpoint_file: Path):
+        """Load checkpoint and continue input at stored file and offset"""
+        if (
+            not self.is_local_input
+            or self.source_web
+            or self.zip_records
+            or not (
+                self.file_format in ("txt", "csv")
+                or (self.file_format == "json" and self.is_line_separated_json)
+            )
+        ):
+            logging.getLogger("__main__").warning(
+                "Checkpoints are only supported for local csv, txt "
+                "and line separated json input. Continuing without checkpoints."
+            )
+            return
+        self.checkpoint = InputCheckpoint(checkpoint_file)
+        if self.checkpoint.file_name is None:
+            return
+        file_list = [str(file_name) for file_name in self.filelist]
+        if self.checkpoint.file_name not in file_list:
+            logging.getLogger("__main__").warning(
+                f"Checkpoint file {self.checkpoint.file_name} not found in input, "
+                f"starting from first file."
+            )
+            return
+        file_index = file_list.index(self.checkpoint.file_name)
+        self.filelist = self.filelist[file_index:]
+        self.resume_offset = self.checkpoint.offset
+        self.count_glob = self.checkpoint.record
+        logging.getLogger("__main__").info(
+            f"Resuming at record {self.checkpoint.record} "
+            f"(byte {self.checkpoint.offset} of {self.checkpoint.file_name})"
+        )
+
+    def _get_read_position(self) -> Optional[Tuple[str, int]]:
+        """Return current file and byte offset after the last read record"""
+        if self.line_reader is None:
+            return None
+        return self.current_source, self.line_reader.offset
+
+    def _track_checkpoint(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[Optional[Tuple[List[str], Optional[str]]]]:
+        """Update checkpoint once a record has been converted completely
+
+        The next record is requested by convert_records only after all lbsn
+        records of the previous record have been returned.
+        """
+        for record in records:
+            read_position = self._get_read_position()
+            yield record
+            if read_position:
+                self.checkpoint.update(*read_position, self.count_glob)
+
+    def write_checkpoint(self):
+        """Store checkpoint, e.g. after output has been committed"""
+        if self.checkpoint:
+            self.checkpoint.save()
+        if not self.resume_state:
+            return
+        if self.web_offsets_path:
+            save_web_offsets(self.web_offsets_path, self._get_resume_web_offsets())
+        if self.partition_bookmarks and self.resume_state[2]:
+            table_ref, key_ranges = self.resume_state[2]
+            self.partition_bookmarks.set_ranges(table_ref, key_ranges)
+            self.partition_bookmarks.save()
+
+    def _track_resume_state(self) -> bool:
+        """Return True if read positions of db or web input are stored"""
+        return bool(
+            self.web_offsets_path
+            or (self.partition_bookmarks and self.partition_bookmarks.bookmarks_path)
+        )
+
+    def _get_read_state(self) -> ResumeState:
+        """Return current read position: db key, web offsets and
+        key ranges of partitioned read
+        """
+        web_offsets = None
+        if self.web_streams:
+            web_offsets = self._get_web_offsets()
+        key_ranges = None
+        if self.partition_reader is not None:
+            table_ref, reader = self.partition_reader
+            key_ranges = table_ref, [list(key_range) for key_range in reader.key_ranges]
+        return self.read_number, web_offsets, key_ranges
+
+    def _get_resume_state(self) -> ResumeState:
+        """Return read position of input handed over for processing
+
+        With read-ahead, the read position of the last batch
+        handed over completely, not the position read ahead.
+        """
+        if self.read_ahead is not None:
+            return self.read_ahead.position
+        return self._get_read_state()
+
+    def _track_processed(
+        self, records: Iterator[Optional[Tuple[List[str], Optional[str]]]]
+    ) -> Iterator[Optional[Tuple[List[str], Optional[str]]]]:
+        """Update resume state once a record has been converted completely
+
+        The next record is requested by convert_records only after all lbsn
+        records of the previous record have been returned.
+        """
+        for record in records:
+            resume_state = self._get_resume_state()
+            yield record
+            self.resume_state = resume_state
+
+    def _get_resume_web_offsets(self) -> Dict[str, int]:
+        """Return byte offsets per web source after the records converted"""
+        offsets = dict(self.web_offsets)
+        if self.resume_state and self.resume_state[1]:
+            offsets.update(self.resume_state[1])
+        return offsets
+
+    def _get_web_stream(self, url: str) -> ResumableHTTPStream:
+        """Return stream for url, resumed from stored byte offset"""
+        offset = self.web_offsets.get(url, 0)
+        if offset:
+            logging.getLogger("__main__").info(
+                f"Resuming {url} at byte offset {offset}"
+            )
+        stream = ResumableHTTPStream(url, offset=offset)
+        self.web_streams[url] = stream
+        return stream
+
+    def _get_web_offsets(self) -> Dict[str, int]:
+        """Return current byte offset per web source"""
+        offsets = dict(self.web_offsets)
+        for url, stream in self.web_streams.items():
+            offsets[url] = stream.offset
+        return offsets
+
+    @staticmethod
+    def _get_web_header(stream: ResumableHTTPStream, kwargs) -> Optional[List[str]]:
+        """Read csv header from start of web source, if stream is resumed"""
+        if not stream.offset:
+            # header is read by DictReader
+            return None
+        header_stream = ResumableHTTPStream(stream.url)
+        header_line = next(header_stream.iter_lines()).decode("utf-8")
+        return next(csv.reader([header_line], **kwargs))
+
     def fetch_record_from_file(self, file_handle):
         """Fetches CSV or JSON data (including stacked json) from file"""
         if self.file_format in ["txt", "csv"]:
             record_reader = self.fetch_csv_data_from_file(file_handle)
+        elif self.file_format in ARROW_FILE_TYPES:
+            # rows of parquet or arrow files, as dicts
+            record_reader = file_handle
+        elif self.file_format == PROTO_FILE_TYPE:
+            # archived lbsn records
+            record_reader = read_proto_stream(file_handle)
         else:
             sys.exit(f"Format {self.file_format} not supported.")
         # return record pipeline
         for record in record_reader:
             yield record
 
+    def _get_arrow_reader(self, file_name: Path) -> ArrowRecordReader:
+        """Open parquet or arrow file, read only columns of importer
+
+        Mappings may define INPUT_COLUMNS (columns read) and
+        GEOTAG_COLUMNS (rows with empty values are skipped
+        with --ignore_non_geotagged).
+        """
+        not_null_columns = None
+        if self.ignore_non_geotagged:
+            not_null_columns = getattr(self.import_mapper, "GEOTAG_COLUMNS", None)
+        arrow_reader = ArrowRecordReader(
+            file_name,
+            file_type=self.file_format,
+            columns=getattr(self.import_mapper, "INPUT_COLUMNS", None),
+            not_null_columns=not_null_columns,
+        )
+        self.arrow_readers.append(arrow_reader)
+        return arrow_reader
+
     def fetch_json_data_from_file(self, file_handle):
         """Read json entries from file.
 
@@ -457,39 +1233,20 @@ class LoadData:
         # Stacked JSON is a simple file with many concatenated jsons, e.g.
         # {json1}{json2} etc.
         if self.is_stacked_json:
-            # note: this requires loading file completely first
-            # not streaming optimized yet
-            for record in HF.json_read_wrapper(HF.decode_stacked(file_handle.read())):
+            # file is decoded incrementally in chunks,
+            # records are yielded as soon as they are complete
+            for record in HF.json_read_wrapper(HF.decode_stacked_stream(file_handle)):
                 yield record
-        if self.is_line_separated_json:
+        elif self.is_line_separated_json:
             # json's separated by line ending
             for line in file_handle:
                 record = HF.json_load_wrapper(line, single=True)
                 yield record
         else:
-            # normal json nesting, e.g.  {{record1},{record2}}
-            records = HF.json_load_wrapper(file_handle)
-            if records:
-                if isinstance(records, list):
-                    for record in records:
-                        yield record
-                else:
-                    record = records
-                    yield record
-            yield None
-            # streaming version:
-            # start_pos = 0
-            # while True:
-            #     try:
-            #         record = json.load(file_handle)
-            #         yield record
-            #         return
-            #     except json.JSONDecodeError as e:
-            #         file_handle.seek(start_pos)
-            #         json_str = file_handle.read(e.pos)
-            #         record = json.loads(json_str)
-            #         start_pos += e.pos
-            #         yield record
+            # normal json nesting, e.g. [{record1},{record2}],
+            # elements are decoded incrementally
+            for record in HF.decode_json_array_stream(file_handle):
+                yield record
 
     def fetch_csv_data_from_file(self, file_handle):
         """Read csv entries from file (either *.txt or *.csv).
@@ -545,6 +1302,8 @@ class LoadData:
     ) -> List[str]:
         """Read Local Files according to config parameters and
         returns list of file-paths
+
+        Compressed files (e.g. *.json.gz) are included.
         """
         if recursive_load:
             excludefolderlist = [
@@ -561,10 +1320,11 @@ class LoadData:
                 excludestartswithfile=excludestartswithfile,
             )
         else:
-            loc_filelist_gen = input_path.glob(f"*.{local_file_type}")
             loc_filelist = []
-            for file_path in loc_filelist_gen:
-                loc_filelist.append(file_path)
+            for suffix in ("", *COMPRESSION_SUFFIXES):
+                loc_filelist_gen = input_path.glob(f"*.{local_file_type}{suffix}")
+                for file_path in loc_filelist_gen:
+                    loc_filelist.append(file_path)
         if skip_until_file:
             file_index = LoadData._item_index_list(loc_filelist, skip_until_file)
             logging.getLogger("__main__").info(
@@ -637,7 +1397,10 @@ class LoadData:
                         if efound is False:
                             do_scan(file_handle_path, output, depth + 1)
                 else:
-                    if file_handle_path.endswith(file_format):
+                    if file_handle_path.endswith(file_format) or any(
+                        file_handle_path.endswith(f"{file_format}{suffix}")
+                        for suffix in COMPRESSION_SUFFIXES
+                    ):
                         efound = False
                         for entry in excludestartswithfile:
                             if ntpath.basename(file_handle_path).startswith(entry):
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for mapping raw input records to lbsn structure
+in a pool of worker processes.
+
+Each worker process holds its own instance of the importer class.
+Batches of raw records (or byte ranges of memory-mapped csv files)
+are sent to the workers, results are returned as serialized ProtoBuf
+bytes and restored in input order.
+"""
+
+import collections
+import csv
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import lbsnstructure as lbsn
+
+from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.json_backend import set_json_backend
+
+# number of raw records sent to a worker at once
+WORKER_BATCH_SIZE = 500
+# number of bytes of a csv file parsed by a worker at once
+CSV_CHUNK_SIZE = 2**24
+# number of batches submitted per worker ahead of consumption
+WORKER_PREFETCH = 2
+# importer statistics aggregated from worker processes
+MAPPER_COUNTERS = (
+    "null_island",
+    "skipped_count",
+    "skipped_low_geoaccuracy",
+    "skipped_ignore_list",
+)
+
+# importer instance of worker process
+_WORKER_MAPPER = None
+
+
+def _init_worker(
+    origin: int,
+    mappings_path: Optional[Path],
+    importer_kwargs: Dict[str, Any],
+    json_backend: Optional[str] = None,
+):
+    """Initialize importer (and json backend) in worker process
+
+    The importer class is loaded again by origin, since
+    dynamically loaded mapping modules cannot be pickled.
+    """
+    global _WORKER_MAPPER  # pylint: disable=global-statement
+    set_json_backend(json_backend)
+    importer = HF.load_importer_mapping_module(origin, mappings_path)
+    _WORKER_MAPPER = importer(**importer_kwargs)
+
+
+def _map_records(
+    records: Iterable[Tuple[Any, Optional[str]]], is_json: bool
+) -> Tuple[List[Tuple[str, bytes]], Dict[str, int]]:
+    """Map raw records with importer of worker process
+
+    Returns serialized lbsn records and importer statistics
+    accumulated for these records.
+    """
+    results = []
+    if not is_json and hasattr(_WORKER_MAPPER, "parse_csv_batch"):
+        # columnar conversion of whole batch
+        mapped_records = [
+            _WORKER_MAPPER.parse_csv_batch([record for record, __ in records])
+        ]
+    elif is_json:
+        mapped_records = (_parse_json_record(*record) for record in records)
+    else:
+        mapped_records = (_WORKER_MAPPER.parse_csv_record(*record) for record in records)
+    for lbsn_records in mapped_records:
+        if lbsn_records is None:
+            continue
+        for lbsn_record in lbsn_records:
+            results.append(
+                (lbsn_record.DESCRIPTOR.name, lbsn_record.SerializeToString())
+            )
+    counters = {}
+    for counter in MAPPER_COUNTERS:
+        if hasattr(_WORKER_MAPPER, counter):
+            counters[counter] = getattr(_WORKER_MAPPER, counter)
+            setattr(_WORKER_MAPPER, counter, 0)
+    return results, counters
+
+
+def _parse_json_record(single_record: Any, record_type: Optional[str]):
+    """Map json record with importer of worker process
+
+    Raw json text (e.g. from --copy_input) is decoded first.
+    """
+    if isinstance(single_record, str):
+        single_record = HF.json_load_wrapper(single_record, single=True)
+        if single_record is None:
+            return None
+    return _WORKER_MAPPER.parse_json_record(single_record, record_type)
+
+
+def _map_batch(
+    batch: List[Tuple[Any, Optional[str]]], is_json: bool
+) -> Tuple[List[Tuple[str, bytes]], Dict[str, int], int]:
+    """Map batch of raw records in worker process"""
+    results, counters = _map_records(batch, is_json)
+    return results, counters, len(batch)
+
+
+def _map_csv_chunk(
+    file_name: str, start: int, end: int, csv_kwargs: Dict[str, Any]
+) -> Tuple[List[Tuple[str, bytes]], Dict[str, int], int]:
+    """Parse and map byte range of a csv file in worker process
+
+    The byte range must be aligned to line endings.
+    """
+    with open(file_name, "rb") as file_handle, mmap.mmap(
+        file_handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm_file:
+        text = mm_file[start:end].decode("utf-8", "replace")
+    # line endings as with universal newlines (text mode) of the sequential reader
+    lines = text.replace("\r\n", "\n").split("\n")
+    # empty rows are skipped, as in LoadData._process_input
+    rows = [(row, None) for row in csv.reader(lines, **csv_kwargs) if row]
+    results, counters = _map_records(rows, is_json=False)
+    return results, counters, len(rows)
+
+
+def iter_csv_chunks(
+    file_name: Union[str, Path], chunk_size: int = CSV_CHUNK_SIZE, offset: int = 0
+) -> Iterator[Tuple[int, int]]:
+    """Split file into byte ranges of about chunk_size, aligned to line endings
+
+    Args:
+        offset: Start of the first range, must be at a line start
+    """
+    with open(file_name, "rb") as file_handle:
+        file_size = os.fstat(file_handle.fileno()).st_size
+        if file_size == 0:
+            return
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mm_file:
+            start = offset
+            while start < file_size:
+                end = min(start + chunk_size, file_size)
+                if end < file_size:
+                    line_end = mm_file.find(b"\n", end)
+                    end = file_size if line_end == -1 else line_end + 1
+                yield start, end
+                start = end
+
+
+class MappingPool:
+    """Map batches of raw records in parallel, preserving input order"""
+
+    def __init__(
+        self,
+        workers: int,
+        origin: int,
+        mappings_path: Optional[Path] = None,
+        importer_kwargs: Optional[Dict[str, Any]] = None,
+        is_json: bool = True,
+        json_backend: Optional[str] = None,
+    ):
+        if importer_kwargs is None:
+            importer_kwargs = {}
+        self.workers = workers
+        self.is_json = is_json
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(origin, mappings_path, importer_kwargs, json_backend),
+        )
+
+    def map_batches(
+        self, batches: Iterator[Any]
+    ) -> Iterator[Tuple[Any, List[Any], Dict[str, int], int]]:
+        """Map batches in worker processes
+
+        Args:
+            batches: Iterator of tuples (batch, tag), the tag is
+                returned unchanged together with the batch results
+
+        Returns (tag, lbsn_records, counters, input_count) per batch,
+        in input order.
+        """
+        return self._map_ordered(
+            ((_map_batch, (batch, self.is_json)), tag) for batch, tag in batches
+        )
+
+    def map_csv_chunks(
+        self, chunks: Iterator[Any], csv_kwargs: Dict[str, Any]
+    ) -> Iterator[Tuple[Any, List[Any], Dict[str, int], int]]:
+        """Parse and map csv byte ranges in worker processes
+
+        Args:
+            chunks: Iterator of tuples ((file_name, start, end), tag)
+
+        Returns (tag, lbsn_records, counters, input_count) per chunk,
+        in input order.
+        """
+        return self._map_ordered(
+            ((_map_csv_chunk, (*chunk, csv_kwargs)), tag) for chunk, tag in chunks
+        )
+
+    def _map_ordered(
+        self, tasks: Iterator[Any]
+    ) -> Iterator[Tuple[Any, List[Any], Dict[str, int], int]]:
+        """Submit tasks ((func, args), tag), return results in order
+
+        Only a limited number of tasks is submitted ahead.
+        """
+        pending = collections.deque()
+        max_pending = self.workers * WORKER_PREFETCH
+        try:
+            for (func, args), tag in tasks:
+                pending.append((self.executor.submit(func, *args), tag))
+                if len(pending) >= max_pending:
+                    yield MappingPool._restore(*pending.popleft())
+            while pending:
+                yield MappingPool._restore(*pending.popleft())
+        finally:
+            # e.g. if consumer stops early (--transferlimit)
+            for future, _ in pending:
+                future.cancel()
+
+    @staticmethod
+    def _restore(future, tag) -> Tuple[Any, List[Any], Dict[str, int], int]:
+        """Deserialize results of a task to ProtoBuf messages"""
+        results, counters, input_count = future.result()
+        lbsn_records = []
+        for type_name, record_bytes in results:
+            lbsn_record = getattr(lbsn, type_name)()
+            lbsn_record.ParseFromString(record_bytes)
+            lbsn_records.append(lbsn_record)
+        return tag, lbsn_records, counters, input_count
+
+    def close(self):
+        """Shut down worker processes"""
+        self.executor.shutdown(wait=True)
@@ -21,6 +21,11 @@ LBSN_SCHEMA = [
     (lbsn.Event().DESCRIPTOR.name, "temporal", "event", "event_guid"),
 ]
 
+"""Table convention for json records (input db format json):
+schema, table and key column, see InputSQL"""
+JSON_INPUT_TABLE = ("public", "input", "in_id")
+
+
 
 def optional_schema_override(
     LBSN_SCHEMA: List[Tuple[str, str, str, str]],
@@ -81,6 +86,16 @@ class InputSQL(enum.Enum):
             LIMIT {number_of_records_to_fetch};
             """
 
+    """SQL for streaming JSON records stored in DB as csv text (COPY)"""
+    COPY = """
+            COPY (
+                SELECT {key_col}, data::text FROM {schema_name}."{table_name}"
+                {optional_where}
+                ORDER BY {key_col} ASC
+                LIMIT {number_of_records_to_fetch}
+            ) TO STDOUT WITH (FORMAT csv)
+            """
+
     DB_CUSTOM = """Define your own DB Mapping SQL here"""
 
     def get_sql(
@@ -88,17 +103,29 @@ class InputSQL(enum.Enum):
         schema_name: str = "public",
         table_name: str = "input",
         start_id: Optional[Union[int, str]] = None,
-        number_of_records_to_fetch: int = 10000,
+        number_of_records_to_fetch: Optional[int] = 10000,
         key_col="in_id",
+        end_id: Optional[Union[int, str]] = None,
     ):
-        """Get SQL formatted string"""
-        optional_where = ""
+        """Get SQL formatted string
+
+        If number_of_records_to_fetch is None, no limit is applied.
+        If end_id is given, only keys up to (including) end_id are returned.
+        """
+        if number_of_records_to_fetch is None:
+            number_of_records_to_fetch = "ALL"
+        quote_subst = ""
+        if self.name in ("LBSN", "COPY"):
+            # quoted string required
+            quote_subst = "'"
+        conditions = []
         if start_id is not None:
-            quote_subst = ""
-            if self.name == "LBSN":
-                # quoted string required
-                quote_subst = "'"
-            optional_where = f"WHERE {key_col} > {quote_subst}{start_id}{quote_subst}"
+            conditions.append(f"{key_col} > {quote_subst}{start_id}{quote_subst}")
+        if end_id is not None:
+            conditions.append(f"{key_col} <= {quote_subst}{end_id}{quote_subst}")
+        optional_where = ""
+        if conditions:
+            optional_where = f"WHERE {' AND '.join(conditions)}"
         # self.value refers to current ENUM,
         # which is always string
         return self.value.format(
@@ -108,3 +135,26 @@ class InputSQL(enum.Enum):
             number_of_records_to_fetch=number_of_records_to_fetch,
             key_col=key_col,
         )
+
+
+def get_key_quantiles_sql(
+    schema_name: str,
+    table_name: str,
+    key_col: str,
+    partitions: int,
+    sample_percent: float = 1.0,
+    start_id: Optional[Union[int, str]] = None,
+) -> str:
+    """Get SQL to estimate key boundaries that split a table
+    into partitions of similar size, based on a sample of rows
+    """
+    fractions = ", ".join(str(i / partitions) for i in range(1, partitions))
+    optional_where = ""
+    if start_id is not None:
+        optional_where = f"WHERE {key_col} > '{start_id}'"
+    return f"""
+        SELECT percentile_disc(ARRAY[{fractions}]::float8[])
+            WITHIN GROUP (ORDER BY {key_col}) AS boundaries
+        FROM {schema_name}."{table_name}" TABLESAMPLE SYSTEM ({sample_percent})
+        {optional_where};
+        """
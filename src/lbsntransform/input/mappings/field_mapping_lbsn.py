@@ -7,50 +7,152 @@ Module for mapping LBSN (RAW) to common LBSN Structure (Protobuf).
 # pylint: disable=no-member
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple
 import lbsnstructure as lbsn
 from google.protobuf.timestamp_pb2 import Timestamp
 from google.protobuf.duration_pb2 import Duration
-from shapely import wkb
-
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
 
 MAPPING_ID = 0
 
+# columns with Postgis hex WKB geometries
+GEOM_COLUMNS = {
+    "geom_center",
+    "geom_area",
+    "post_latlng",
+    "event_latlng",
+    "event_area",
+    "user_location_geom",
+}
+# compiled setter plans per lbsn type and column layout,
+# see get_setter_plan()
+_SETTER_PLANS: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[int, Callable]]] = {}
+
 
 def parse_geom(geom_hex):
-    """Parse Postgis hex WKB to geometry WKT"""
-    geom = wkb.loads(geom_hex, hex=True)
+    """Parse Postgis hex WKB to geometry WKT
+
+    Points are decoded directly, other geometries with shapely.
+    """
+    point = HF.decode_wkb_point(geom_hex)
+    if point is not None:
+        return HF.point_to_wkt(*point)
+    geom = lazy_import("shapely.wkb").loads(geom_hex, hex=True)
     return geom.wkt
 
 
-def set_lbsn_attr(lbsn_obj, attr_name, in_record, geom: Optional[bool] = None):
-    """Sets value for attr_name of lbsn_obj if
-    attr_value is not None"""
-    attr_value = in_record.get(attr_name)
-    if attr_value is None:
-        return
-    if isinstance(attr_value, (list, dict)):
-        if len(attr_value) == 0:
-            return
-        if isinstance(attr_value, list):
+def compile_setter(field_descriptor, geom: Optional[bool] = None) -> Optional[Callable]:
+    """Returns setter(lbsn_obj, attr_value) for a field of an lbsn type,
+    or None for fields not copied from a column of the same name
+
+    Setters are called with attr_value not None
+    (see set_lbsn_attrs and set_lbsn_attr).
+    """
+    attr_name = field_descriptor.name
+    message_type = field_descriptor.message_type
+    if geom:
+
+        def set_geom(lbsn_obj, attr_value):
+            if attr_value:
+                setattr(lbsn_obj, attr_name, parse_geom(attr_value))
+
+        return set_geom
+    if message_type is not None and message_type.GetOptions().map_entry:
+
+        def set_map(lbsn_obj, attr_value):
+            getattr(lbsn_obj, attr_name).update(attr_value)
+
+        return set_map
+    if field_descriptor.label == field_descriptor.LABEL_REPEATED:
+        if message_type is not None:
+            # e.g. user_mentions_pkey
+            return None
+
+        def set_repeated(lbsn_obj, attr_value):
             # filter None values,
             # for backwards compatibility with lbsn databases
             # with erroneous empty data written
-            attr_value = list(filter(None, attr_value))
-        getattr(lbsn_obj, attr_name).extend(attr_value)
-        return
-    if geom:
-        attr_value = parse_geom(attr_value)
-    setattr(lbsn_obj, attr_name, attr_value)
+            getattr(lbsn_obj, attr_name).extend(
+                [value for value in attr_value if value]
+            )
 
+        return set_repeated
+    if message_type is Timestamp.DESCRIPTOR:
+
+        def set_date(lbsn_obj, attr_value):
+            if attr_value:
+                getattr(lbsn_obj, attr_name).FromDatetime(attr_value)
+
+        return set_date
+    if message_type is Duration.DESCRIPTOR:
+
+        def set_duration(lbsn_obj, attr_value):
+            if attr_value:
+                copyduration_lbsn_attr(getattr(lbsn_obj, attr_name), attr_value)
+
+        return set_duration
+    if message_type is not None or field_descriptor.enum_type is not None:
+        # e.g. pkeys, languages and enums (str values)
+        return None
+
+    def set_value(lbsn_obj, attr_value):
+        setattr(lbsn_obj, attr_name, attr_value)
+
+    return set_value
+
+
+def compile_setter_plan(
+    lbsn_descriptor, columns: Tuple[str, ...]
+) -> List[Tuple[int, Callable]]:
+    """Returns list of (column index, setter) for columns
+    with the name of a field of the lbsn type"""
+    plan = []
+    for index, column in enumerate(columns):
+        field_descriptor = lbsn_descriptor.fields_by_name.get(column)
+        if field_descriptor is None:
+            continue
+        setter = compile_setter(field_descriptor, geom=column in GEOM_COLUMNS)
+        if setter is not None:
+            plan.append((index, setter))
+    return plan
+
+
+def get_setter_plan(
+    lbsn_descriptor, columns: Tuple[str, ...]
+) -> List[Tuple[int, Callable]]:
+    """Returns setter plan of lbsn type for column layout,
+    compiled on the first row"""
+    key = (lbsn_descriptor.name, columns)
+    plan = _SETTER_PLANS.get(key)
+    if plan is None:
+        plan = compile_setter_plan(lbsn_descriptor, columns)
+        _SETTER_PLANS[key] = plan
+    return plan
+
+
+def set_lbsn_attrs(lbsn_obj, in_record):
+    """Sets all attributes of lbsn_obj from columns of
+    the same name in in_record, if attr_value is not None
+
+    Special columns (pkeys, languages, enums) are mapped separately.
+    """
+    values = tuple(in_record.values())
+    for index, setter in get_setter_plan(lbsn_obj.DESCRIPTOR, tuple(in_record)):
+        attr_value = values[index]
+        if attr_value is not None:
+            setter(lbsn_obj, attr_value)
 
-def copydate_lbsn_attr(lbsn_obj_attr, copy_from_val):
-    """Some protobuf fields cannot be assigned directly,
-    this function applies copyfrom assignment"""
-    date_pb = Timestamp()
-    date_pb.FromDatetime(copy_from_val)
-    lbsn_obj_attr.CopyFrom(date_pb)
+
+def set_lbsn_attr(lbsn_obj, attr_name, in_record, geom: Optional[bool] = None):
+    """Sets value for attr_name of lbsn_obj if
+    attr_value is not None (single column, see set_lbsn_attrs)"""
+    attr_value = in_record.get(attr_name)
+    if attr_value is None:
+        return
+    setter = compile_setter(lbsn_obj.DESCRIPTOR.fields_by_name[attr_name], geom=geom)
+    if setter is not None:
+        setter(lbsn_obj, attr_value)
 
 
 def copyduration_lbsn_attr(lbsn_obj_attr, copy_from_val):
@@ -66,8 +168,9 @@ def set_lbsn_pkey(lbsn_obj_pkey, pkey_obj, pkey_val, origin_val):
     pkey_val is not None"""
     if pkey_val is None:
         return
-    pkey_obj = HF.new_lbsn_record_with_id(pkey_obj, pkey_val, origin_val)
-    lbsn_obj_pkey.CopyFrom(pkey_obj.pkey)
+    # assigned in place, pkey_obj is kept for compatibility
+    lbsn_obj_pkey.origin.CopyFrom(origin_val)
+    lbsn_obj_pkey.id = pkey_val
 
 
 class importer:
@@ -77,6 +180,8 @@ class importer:
 
     ORIGIN_NAME = "LBSN"
     ORIGIN_ID = 0
+    # mapping functions per lbsn type, see get_func_record()
+    _FUNC_MAP: Optional[Dict[str, Callable]] = None
 
     def __init__(self, **_):
         # We're dealing with LBSN in this class, lets create the OriginID
@@ -95,18 +200,20 @@ class importer:
     @classmethod
     def get_func_record(cls, record: Dict[str, Any], input_type: Optional[str] = None):
         """Returns mapping function for input_type"""
-        FUNC_MAP = {
-            lbsn.Origin().DESCRIPTOR.name: cls.extract_origin,
-            lbsn.Country().DESCRIPTOR.name: cls.extract_country,
-            lbsn.City().DESCRIPTOR.name: cls.extract_city,
-            lbsn.Place().DESCRIPTOR.name: cls.extract_place,
-            lbsn.UserGroup().DESCRIPTOR.name: cls.extract_usergroup,
-            lbsn.User().DESCRIPTOR.name: cls.extract_user,
-            lbsn.Post().DESCRIPTOR.name: cls.extract_post,
-            lbsn.PostReaction().DESCRIPTOR.name: cls.extract_postreaction,
-            lbsn.Event().DESCRIPTOR.name: cls.extract_event,
-        }
-        func_map = FUNC_MAP.get(input_type)
+        if cls._FUNC_MAP is None:
+            # compiled once, on first record
+            cls._FUNC_MAP = {
+                lbsn.Origin.DESCRIPTOR.name: cls.extract_origin,
+                lbsn.Country.DESCRIPTOR.name: cls.extract_country,
+                lbsn.City.DESCRIPTOR.name: cls.extract_city,
+                lbsn.Place.DESCRIPTOR.name: cls.extract_place,
+                lbsn.UserGroup.DESCRIPTOR.name: cls.extract_usergroup,
+                lbsn.User.DESCRIPTOR.name: cls.extract_user,
+                lbsn.Post.DESCRIPTOR.name: cls.extract_post,
+                lbsn.PostReaction.DESCRIPTOR.name: cls.extract_postreaction,
+                lbsn.Event.DESCRIPTOR.name: cls.extract_event,
+            }
+        func_map = cls._FUNC_MAP.get(input_type)
         # create origin always the same
         origin = lbsn.Origin()
         origin.origin_id = record.get("origin_id")
@@ -136,27 +243,13 @@ class importer:
         country = HF.new_lbsn_record_with_id(
             lbsn.Country(), record.get("country_guid"), origin
         )
-        set_lbsn_attr(country, "name", record)
-        geom_center = record.get("geom_center")
-        if geom_center:
-            setattr(country, "geom_center", parse_geom(geom_center))
-        geom_area = record.get("geom_area")
-        if geom_area:
-            setattr(country, "geom_area", parse_geom(geom_area))
-        set_lbsn_attr(country, "url", record)
-        set_lbsn_attr(country, "name_alternatives", record)
+        set_lbsn_attrs(country, record)
         return country
 
     @classmethod
     def extract_city(cls, record, origin):
         city = HF.new_lbsn_record_with_id(lbsn.City(), record.get("city_guid"), origin)
-        set_lbsn_attr(city, "name", record)
-        geom_center = record.get("geom_center")
-        if geom_center:
-            setattr(city, "geom_center", parse_geom(geom_center))
-        geom_area = record.get("geom_area")
-        if geom_area:
-            setattr(city, "geom_area", parse_geom(geom_area))
+        set_lbsn_attrs(city, record)
         country_guid = record.get("country_guid")
         if country_guid:
             city.country_pkey.CopyFrom(
@@ -164,9 +257,6 @@ class importer:
                     lbsn.Country(), record.get("country_guid"), origin
                 ).pkey
             )
-        set_lbsn_attr(city, "url", record)
-        set_lbsn_attr(city, "name_alternatives", record)
-        set_lbsn_attr(city, "sub_type", record)
         return city
 
     @classmethod
@@ -174,28 +264,10 @@ class importer:
         place = HF.new_lbsn_record_with_id(
             lbsn.Place(), record.get("place_guid"), origin
         )
-        set_lbsn_attr(place, "name", record)
-        set_lbsn_attr(place, "post_count", record)
-        set_lbsn_attr(place, "url", record)
-        geom_center = record.get("geom_center")
-        if geom_center:
-            setattr(place, "geom_center", parse_geom(geom_center))
-        geom_area = record.get("geom_area")
-        if geom_area:
-            setattr(place, "geom_area", parse_geom(geom_area))
+        set_lbsn_attrs(place, record)
         city_guid = record.get("city_guid")
         if city_guid:
             set_lbsn_pkey(place.city_pkey, lbsn.City(), record.get("city_guid"), origin)
-        set_lbsn_attr(place, "name_alternatives", record)
-        set_lbsn_attr(place, "place_description", record)
-        set_lbsn_attr(place, "place_website", record)
-        set_lbsn_attr(place, "place_phone", record)
-        set_lbsn_attr(place, "address", record)
-        set_lbsn_attr(place, "zip_code", record)
-        set_lbsn_attr(place, "attributes", record)
-        set_lbsn_attr(place, "checkin_count", record)
-        set_lbsn_attr(place, "like_count", record)
-        set_lbsn_attr(place, "parent_places", record)
         return place
 
     @classmethod
@@ -220,36 +292,12 @@ class importer:
     @classmethod
     def extract_user(cls, record, origin):
         user = HF.new_lbsn_record_with_id(lbsn.User(), record.get("user_guid"), origin)
-        set_lbsn_attr(user, "user_name", record)
-        set_lbsn_attr(user, "user_fullname", record)
-        set_lbsn_attr(user, "follows", record)
-        set_lbsn_attr(user, "followed", record)
-        set_lbsn_attr(user, "biography", record)
-        set_lbsn_attr(user, "post_count", record)
-        set_lbsn_attr(user, "url", record)
-        set_lbsn_attr(user, "is_private", record)
-        set_lbsn_attr(user, "is_available", record)
-
+        set_lbsn_attrs(user, record)
         lang = record.get("user_language")
         if lang:
             ref_user_language = lbsn.Language()
             ref_user_language.language_short = lang
             user.user_language.CopyFrom(ref_user_language)
-
-        set_lbsn_attr(user, "user_location", record)
-        user_location_geom = record.get("user_location_geom")
-        if user_location_geom:
-            setattr(user, "user_location_geom", parse_geom(user_location_geom))
-        set_lbsn_attr(user, "liked_count", record)
-        active_since = record.get("active_since")
-        if active_since:
-            copydate_lbsn_attr(user.active_since, active_since)
-        set_lbsn_attr(user, "profile_image_url", record)
-        set_lbsn_attr(user, "user_timezone", record)
-        set_lbsn_attr(user, "user_utc_offset", record)
-        set_lbsn_attr(user, "user_groups_member", record)
-        set_lbsn_attr(user, "user_groups_follows", record)
-        set_lbsn_attr(user, "group_count", record)
         return user
 
     @classmethod
@@ -258,9 +306,7 @@ class importer:
 
         TODO: Extract nested LBSN objects (e.g. spatial.city etc.)"""
         post = HF.new_lbsn_record_with_id(lbsn.Post(), record.get("post_guid"), origin)
-        post_latlng = record.get("post_latlng")
-        if post_latlng:
-            setattr(post, "post_latlng", parse_geom(post_latlng))
+        set_lbsn_attrs(post, record)
         place_guid = record.get("place_guid")
         if place_guid:
             set_lbsn_pkey(
@@ -275,27 +321,10 @@ class importer:
                 post.country_pkey, lbsn.Country(), record.get("country_guid"), origin
             )
         set_lbsn_pkey(post.user_pkey, lbsn.User(), record.get("user_guid"), origin)
-        pub_date = record.get("post_publish_date")
-        if pub_date:
-            copydate_lbsn_attr(post.post_publish_date, pub_date)
-        set_lbsn_attr(post, "post_body", record)
         geo_acc = record.get("post_geoaccuracy")
         if geo_acc:
             # get enum value
             post.post_geoaccuracy = lbsn.Post.PostGeoaccuracy.Value(geo_acc.upper())
-        set_lbsn_attr(post, "hashtags", record)
-        set_lbsn_attr(post, "topic_group", record)
-        set_lbsn_attr(post, "post_downvotes", record)
-        set_lbsn_attr(post, "emoji", record)
-        set_lbsn_attr(post, "post_like_count", record)
-        set_lbsn_attr(post, "post_comment_count", record)
-        set_lbsn_attr(post, "post_views_count", record)
-        set_lbsn_attr(post, "post_title", record)
-        crt_date = record.get("post_create_date")
-        if crt_date:
-            copydate_lbsn_attr(post.post_create_date, crt_date)
-        set_lbsn_attr(post, "post_thumbnail_url", record)
-        set_lbsn_attr(post, "post_url", record)
         post_type = record.get("post_type")
         if post_type:
             # compatibility: earlier lbsnstructure
@@ -305,15 +334,11 @@ class importer:
                 post_type = "image"
             # get enum value
             post.post_type = lbsn.Post.PostType.Value(post_type.upper())
-        set_lbsn_attr(post, "post_filter", record)
-        set_lbsn_attr(post, "post_quote_count", record)
-        set_lbsn_attr(post, "post_share_count", record)
         lang = record.get("post_language")
         if lang:
             ref_post_language = lbsn.Language()
             ref_post_language.language_short = lang
             post.post_language.CopyFrom(ref_post_language)
-        set_lbsn_attr(post, "input_source", record)
         user_mentions = record.get("user_mentions")
         if user_mentions:
             mentioned_users_list = []
@@ -325,7 +350,6 @@ class importer:
             post.user_mentions_pkey.extend(
                 [user_ref.pkey for user_ref in mentioned_users_list]
             )
-        set_lbsn_attr(post, "post_content_license", record)
         return post
 
     @classmethod
@@ -333,26 +357,7 @@ class importer:
         event = HF.new_lbsn_record_with_id(
             lbsn.Event(), record.get("event_guid"), origin
         )
-        set_lbsn_attr(event, "name", record)
-        event_latlng = record.get("event_latlng")
-        if event_latlng:
-            setattr(event, "event_latlng", parse_geom(event_latlng))
-        event_area = record.get("event_area")
-        if event_area:
-            setattr(event, "event_area", parse_geom(event_area))
-        set_lbsn_attr(event, "event_website", record)
-        event_date = record.get("event_date")
-        if event_date:
-            copydate_lbsn_attr(event.event_date, event_date)
-        event_date_start = record.get("event_date_start")
-        if event_date_start:
-            copydate_lbsn_attr(event.event_date_start, event_date_start)
-        event_date_end = record.get("event_date_end")
-        if event_date_end:
-            copydate_lbsn_attr(event.event_date_end, event_date_end)
-        duration = record.get("duration")
-        if duration:
-            copyduration_lbsn_attr(event.duration, duration)
+        set_lbsn_attrs(event, record)
         place_guid = record.get("place_guid")
         if place_guid:
             set_lbsn_pkey(
@@ -367,13 +372,6 @@ class importer:
                 event.country_pkey, lbsn.Country(), record.get("country_guid"), origin
             )
         set_lbsn_pkey(event.user_pkey, lbsn.User(), record.get("user_guid"), origin)
-        set_lbsn_attr(event, "event_description", record)
-        set_lbsn_attr(event, "event_type", record)
-        set_lbsn_attr(event, "event_share_count", record)
-        set_lbsn_attr(event, "event_like_count", record)
-        set_lbsn_attr(event, "event_comment_count", record)
-        set_lbsn_attr(event, "event_views_count", record)
-        set_lbsn_attr(event, "event_engage_count", record)
         return event
 
     @classmethod
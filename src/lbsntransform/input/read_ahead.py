@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for reading input records ahead of processing.
+
+A background thread consumes the input generator (db queries,
+web streams) and hands over batches of records through a bounded
+queue, overlapping fetch latency with record conversion.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+# default number of records per batch handed over to the consumer
+READ_AHEAD_BATCH_SIZE = 1000
+
+
+class ReadAhead:
+    """Iterate records of source, fetched in a background thread
+
+    Args:
+        source: Iterator of input records
+        depth: Number of batches buffered ahead of the consumer
+        batch_size: Number of records per batch
+        get_position: Optional function returning the read position
+            (e.g. the last db key read) of the source, called in the
+            background thread after each batch. The position of the
+            last batch handed over completely is available as
+            `position` in the consuming thread.
+
+    Stall metrics (seconds):
+        consumer_stall: time the consumer waited for input
+        producer_stall: time the reader waited for a free queue slot
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        source: Iterator[Any],
+        depth: int = 2,
+        batch_size: int = READ_AHEAD_BATCH_SIZE,
+        get_position: Optional[Callable[[], Any]] = None,
+    ):
+        self.source = source
+        self.batch_size = batch_size
+        self.get_position = get_position
+        self.position = get_position() if get_position else None
+        self.consumer_stall = 0.0
+        self.producer_stall = 0.0
+        self._queue = queue.Queue(maxsize=max(depth, 1))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._read, name="lbsn-read-ahead", daemon=True
+        )
+
+    def _put(self, item) -> bool:
+        """Put item to queue, returns False if consumer stopped"""
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.producer_stall += time.perf_counter() - start
+
+    def _put_batch(self, batch: List[Any]) -> bool:
+        """Put batch with read position to queue"""
+        position = self.get_position() if self.get_position else None
+        return self._put((batch, position))
+
+    def _read(self):
+        """Thread target: read source in batches"""
+        batch: List[Any] = []
+        try:
+            for record in self.source:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    if not self._put_batch(batch):
+                        return
+                    batch = []
+        except BaseException as err:  # pylint: disable=broad-except
+            # re-raised in consuming thread, also SystemExit
+            # (e.g. sys.exit() on broken web streams)
+            if batch and not self._put_batch(batch):
+                return
+            self._put(err)
+            return
+        if batch and not self._put_batch(batch):
+            return
+        self._put(self._DONE)
+
+    def __iter__(self) -> Iterator[Any]:
+        self._thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                item = self._queue.get()
+                self.consumer_stall += time.perf_counter() - start
+                if item is self._DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                batch, position = item
+                for record in batch:
+                    yield record
+                # all records of batch processed
+                self.position = position
+        finally:
+            self._stop.set()
+
+    def report(self) -> str:
+        """Return stall metrics as formatted string"""
+        return (
+            f"Read-ahead: waited {self.consumer_stall:.2f}s for input, "
+            f"input waited {self.producer_stall:.2f}s for processing."
+        )
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for streaming line based web sources (e.g. csv over http)
+with resume support.
+
+The byte offset of returned lines is tracked. If the connection
+breaks, the stream reconnects with an HTTP Range header and continues
+at the last complete line. Offsets can be stored in a json file
+to resume processing in a later run.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from lbsntransform.tools.lazy_imports import lazy_import
+
+# bytes read per chunk from the http response
+WEB_CHUNK_SIZE = 2**16
+# number of reconnects without progress before giving up
+WEB_MAX_RETRIES = 5
+# seconds to wait before reconnecting, multiplied by retry count
+WEB_RETRY_BACKOFF = 2.0
+
+
+def get_stream_errors() -> Tuple[Type[Exception], ...]:
+    """Return errors that indicate a broken stream or failed (re)connect"""
+    requests = lazy_import("requests")
+    return (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.Timeout,
+        requests.exceptions.HTTPError,
+    )
+
+
+class ResumableHTTPStream:
+    """Line iterator over a web source, resumed via HTTP Range requests
+
+    Attributes:
+        url: The url to stream from
+        offset: Byte offset after the last returned line
+    """
+
+    def __init__(
+        self,
+        url: str,
+        offset: int = 0,
+        chunk_size: int = WEB_CHUNK_SIZE,
+        max_retries: int = WEB_MAX_RETRIES,
+        retry_backoff: float = WEB_RETRY_BACKOFF,
+    ):
+        self.url = url
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def _connect(self):
+        """Request url from current offset
+
+        Returns the response and the number of bytes that need to be
+        skipped, in case the server does not support range requests.
+        The response is None if offset is at the end of the source
+        (HTTP 416, Range Not Satisfiable).
+        """
+        headers = {}
+        if self.offset:
+            headers["Range"] = f"bytes={self.offset}-"
+        # requests is imported on first use, only for web sources
+        response = lazy_import("requests").get(
+            self.url, stream=True, headers=headers
+        )
+        if self.offset and response.status_code == 416:
+            response.close()
+            logging.getLogger("__main__").info(
+                f"No data after byte {self.offset} of {self.url}."
+            )
+            return None, 0
+        response.raise_for_status()
+        skip_bytes = 0
+        if self.offset and not response.status_code == 206:
+            logging.getLogger("__main__").warning(
+                f"Server does not support range requests for {self.url}, "
+                f"skipping {self.offset} bytes.."
+            )
+            skip_bytes = self.offset
+        return response, skip_bytes
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield lines (without line ending), reconnect on broken stream"""
+        retries = 0
+        stream_errors = get_stream_errors()
+        while True:
+            pending = b""
+            try:
+                response, skip_bytes = self._connect()
+                if response is None:
+                    return
+                with closing(response):
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if skip_bytes:
+                            if len(chunk) <= skip_bytes:
+                                skip_bytes -= len(chunk)
+                                continue
+                            chunk = chunk[skip_bytes:]
+                            skip_bytes = 0
+                        retries = 0
+                        pending += chunk
+                        lines = pending.split(b"\n")
+                        pending = lines.pop()
+                        for line in lines:
+                            self.offset += len(line) + 1
+                            yield line.rstrip(b"\r")
+                if pending:
+                    self.offset += len(pending)
+                    yield pending.rstrip(b"\r")
+                return
+            except stream_errors as err:
+                retries += 1
+                if retries > self.max_retries or not self._is_retryable(err):
+                    raise
+                logging.getLogger("__main__").warning(
+                    f"Stream broken at byte {self.offset} of {self.url} "
+                    f"({err}). Reconnecting ({retries}/{self.max_retries}).."
+                )
+                time.sleep(self.retry_backoff * retries)
+
+    @staticmethod
+    def _is_retryable(err: Exception) -> bool:
+        """Return False for HTTP errors other than server errors (5xx)"""
+        response = getattr(err, "response", None)
+        if response is None or not hasattr(response, "status_code"):
+            return True
+        return response.status_code >= 500
+
+
+def load_web_offsets(offsets_path: Optional[Path]) -> Dict[str, int]:
+    """Load byte offsets per url from json file"""
+    if not offsets_path or not Path(offsets_path).exists():
+        return {}
+    with open(offsets_path, "r", encoding="utf-8") as file_handle:
+        return json.load(file_handle)
+
+
+def save_web_offsets(offsets_path: Optional[Path], offsets: Dict[str, int]):
+    """Store byte offsets per url to json file"""
+    if not offsets_path:
+        return
+    # replace atomically, offsets are stored after each commit
+    tmp_path = Path(f"{offsets_path}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file_handle:
+        json.dump(offsets, file_handle, indent=2)
+    os.replace(tmp_path, offsets_path)
+    logging.getLogger("__main__").debug(
+        f"Stored byte offsets of web sources in {offsets_path}"
+    )
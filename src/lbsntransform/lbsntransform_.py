@@ -79,6 +79,7 @@ class LBSNTransform:
         dry_run=None,
         hmac_key=None,
         commit_volume=None,
+        proto_output=None,
     ):
         """Init settings for LBSNTransform"""
 
@@ -134,10 +135,19 @@ class LBSNTransform:
             hllworker_cursor=cursor_hllworker,
             include_lbsn_bases=include_lbsn_bases,
             dry_run=self.dry_run,
+            proto_output=proto_output,
         )
         # load from local json/csv or from PostgresDB
         self.cursor_input = None
         self.is_local_input = is_local_input
+        # stored for opening additional input connections
+        self.db_input_conn_args = (
+            dbuser_input,
+            dbserveraddress_input,
+            dbname_input,
+            dbpassword_input,
+            dbserverport_input,
+        )
         if not self.is_local_input:
             __, cursor_input = LoadData.initialize_connection(
                 dbuser_input,
@@ -150,6 +160,9 @@ class LBSNTransform:
             )
             self.cursor_input = cursor_input
 
+        # functions called after each commit to output,
+        # e.g. for writing input checkpoints
+        self.store_callbacks = []
         # initialize stats
         self.processed_total = 0
         self.initial_loop = True
@@ -187,6 +200,8 @@ class LBSNTransform:
         self.output.store_lbsn_record_dicts(self.lbsn_records)
         self.output.commit_changes()
         self.lbsn_records.clear()
+        for store_callback in self.store_callbacks:
+            store_callback()
 
     def finalize_output(self):
         """finalize all transactions (csv merge etc.)"""
@@ -35,13 +35,13 @@ class LatLngBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            context = hll.get_record_context(record)
+            coordinates = context.coordinates
             self.key["latitude"] = coordinates.lat
             self.key["longitude"] = coordinates.lng
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["latlng_geom"] = context.latlng_geom
         else:
             raise ValueError("Parsing of LatLngBase only supported " "from lbsn.Post")
 
@@ -65,9 +65,9 @@ class PlaceBase(hll.HllBase):
             # Post can be of Geoaccuracy "Place" without any
             # actual place id assigned (e.g. Flickr Geoaccuracy level < 10)
             # in this case, concat lat:lng as primary key
-            coordinates_geom = record.post_latlng
+            context = hll.get_record_context(record)
             if not record.place_pkey.id:
-                coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+                coordinates = context.coordinates
                 self.key["place_guid"] = HLF.hll_concat(
                     [coordinates.lat, coordinates.lng]
                 )
@@ -75,7 +75,7 @@ class PlaceBase(hll.HllBase):
                 self.key["place_guid"] = record.place_pkey.id
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["geom_center"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["geom_center"] = context.latlng_geom
             # geom_area not available from lbsn.Post
         elif isinstance(record, lbsn.Place):
             coordinates_geom = record.geom_center
@@ -114,7 +114,7 @@ class SpatialBase(hll.HllBase):
         geom_area = None
         if isinstance(record, lbsn.Post):
             coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            coordinates = hll.get_record_context(record).coordinates
             # use concat lat:lng as key of no place_key available
             # this should later implement assignemnt based on area
             # intersection
@@ -6,9 +6,6 @@
 import lbsnstructure as lbsn
 from lbsntransform.output.hll import hll_bases as hll
 
-from lbsntransform.output.hll.hll_functions import HLLFunctions as HLF
-from lbsntransform.tools.helper_functions import HelperFunctions as HF
-
 FACET = "temporal"
 
 
@@ -23,7 +20,7 @@ class TimestampBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             self.key["timestamp"] = post_date_time
 
@@ -40,7 +37,7 @@ class DateBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             # optional: add name of date here (e.g. "New Year's Eve")
             date = post_date_time.date()
@@ -59,7 +56,7 @@ class MonthBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             date = post_date_time.date()
             self.key["year"] = date.year
@@ -77,7 +74,7 @@ class YearBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             date = post_date_time.date()
             self.key["year"] = date.year
@@ -94,7 +91,7 @@ class TimeofdayBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             # remove microseconds from datetime
             self.key["timeofday"] = post_date_time.time.replace(microsecond=0)
@@ -111,7 +108,7 @@ class HourofdayBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             # remove seconds and microseconds from datetime
             self.key["hourofday"] = post_date_time.time.replace(second=0, microsecond=0)
@@ -128,7 +125,7 @@ class DayofweekBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             self.key["weekday"] = post_date_time.weekday
 
@@ -144,7 +141,7 @@ class DayofmonthBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             self.key["dayofmonth"] = post_date_time.day
 
@@ -161,7 +158,7 @@ class DayofyearBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             self.key["month"] = post_date_time.month
             self.key["day"] = post_date_time.day
@@ -178,7 +175,7 @@ class MonthofyearBase(hll.HllBase):
         if record is None:
             # init empty
             return
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             self.key["monthofyear"] = post_date_time.month
 
@@ -205,7 +202,7 @@ class MonthHashtagBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            post_date_time = HLF.merge_dates_post(record)
+            post_date_time = hll.get_record_context(record).post_date_time
             if post_date_time:
                 date = post_date_time.date()
                 self.key["year"] = date.year
@@ -236,20 +233,20 @@ class MonthLatLngBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            post_date_time = HLF.merge_dates_post(record)
+            post_date_time = hll.get_record_context(record).post_date_time
             if post_date_time is None:
                 return
             date = post_date_time.date()
             self.key["year"] = date.year
             self.key["month"] = date.month
 
-            coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            context = hll.get_record_context(record)
+            coordinates = context.coordinates
             self.key["latitude"] = coordinates.lat
             self.key["longitude"] = coordinates.lng
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["latlng_geom"] = context.latlng_geom
         else:
             raise ValueError(
                 "Parsing of MonthLatLngBase only supported " "from lbsn.Post"
@@ -286,15 +283,15 @@ class MonthHashtagLatLngBase(hll.HllBase):
             raise ValueError(
                 "Parsing of MonthHashtagLatLngBase only supported " "from lbsn.Post"
             )
-        post_date_time = HLF.merge_dates_post(record)
+        post_date_time = hll.get_record_context(record).post_date_time
         if post_date_time:
             date = post_date_time.date()
             self.key["year"] = date.year
             self.key["month"] = date.month
-        coordinates_geom = record.post_latlng
-        coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+        context = hll.get_record_context(record)
+        coordinates = context.coordinates
         self.key["latitude"] = coordinates.lat
         self.key["longitude"] = coordinates.lng
         # additional (optional) attributes
         # formatted ready for sql upsert
-        self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+        self.attrs["latlng_geom"] = context.latlng_geom
@@ -7,7 +7,6 @@ from typing import Tuple, Union
 
 import lbsnstructure as lbsn
 from lbsntransform.output.hll import hll_bases as hll
-from lbsntransform.tools.helper_functions import HelperFunctions as HF
 
 FACET = "topical"
 
@@ -183,13 +182,13 @@ class TermLatLngBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            context = hll.get_record_context(record)
+            coordinates = context.coordinates
             self.key["latitude"] = coordinates.lat
             self.key["longitude"] = coordinates.lng
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["latlng_geom"] = context.latlng_geom
         else:
             raise ValueError("Parsing of LatLngBase only supported " "from lbsn.Post")
 
@@ -218,13 +217,13 @@ class HashtagLatLngBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            context = hll.get_record_context(record)
+            coordinates = context.coordinates
             self.key["latitude"] = coordinates.lat
             self.key["longitude"] = coordinates.lng
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["latlng_geom"] = context.latlng_geom
         else:
             raise ValueError("Parsing of LatLngBase only supported " "from lbsn.Post")
 
@@ -253,12 +252,12 @@ class EmojiLatLngBase(hll.HllBase):
             # init empty
             return
         if isinstance(record, lbsn.Post):
-            coordinates_geom = record.post_latlng
-            coordinates = HF.get_coordinates_from_ewkt(coordinates_geom)
+            context = hll.get_record_context(record)
+            coordinates = context.coordinates
             self.key["latitude"] = coordinates.lat
             self.key["longitude"] = coordinates.lng
             # additional (optional) attributes
             # formatted ready for sql upsert
-            self.attrs["latlng_geom"] = HF.return_ewkb_from_geotext(coordinates_geom)
+            self.attrs["latlng_geom"] = context.latlng_geom
         else:
             raise ValueError("Parsing of LatLngBase only supported " "from lbsn.Post")
@@ -58,13 +58,18 @@ crowd-sourced photo-graphs. Journal of Environmental Management,
 A privacy-aware model to process data from location-based social media.
 """
 
+import datetime as dt
 import inspect
 import sys
 from collections import OrderedDict, namedtuple
-from typing import List
+from functools import cached_property
+from typing import List, Optional
 
 import lbsnstructure as lbsn
+from lbsntransform.output.hll.hll_functions import HLLFunctions as HLF
+from lbsntransform.output.shared_structure import Coordinates
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.text_features import TextFeatures, get_post_features
 
 # named tuple of defined hll metrics
 HllMetrics = namedtuple(  # pylint: disable=C0103
@@ -94,6 +99,18 @@ BASE_KEY = {}
 BASE_ATTRS = {}
 BASE_METRICS = {}
 
+# bases created from text features of posts (terms, hashtags, emoji)
+TOPICAL_BASES = {
+    "hashtag",
+    "emoji",
+    "term",
+    "_term_latlng",
+    "_hashtag_latlng",
+    "_emoji_latlng",
+    "_month_hashtag",
+    "_month_hashtag_latlng",
+}
+
 
 def register_classes():
     """Function to dynamically register base classes for each facet"""
@@ -128,6 +145,66 @@ def append_baserecord(base_records: List["HllBase"], base_record: "HllBase"):
     base_records.append(base_record)
 
 
+class RecordContext:
+    """Values derived from a single lbsn.Post, shared by all hll bases
+    and metrics of the record
+
+    Values are computed on first access and cached, e.g. coordinates
+    are parsed once per post instead of once per spatial base.
+    """
+
+    def __init__(self, record: lbsn.Post):
+        self.record = record
+
+    @cached_property
+    def post_date_time(self) -> Optional[dt.datetime]:
+        """Merged post create and publish date"""
+        return HLF.merge_dates_post(self.record)
+
+    @cached_property
+    def post_date(self) -> Optional[str]:
+        """Merged post date formatted as string (%Y-%m-%d)"""
+        if self.post_date_time is None:
+            return None
+        return self.post_date_time.strftime("%Y-%m-%d")
+
+    @cached_property
+    def coordinates(self) -> Coordinates:
+        """Coordinates of post_latlng"""
+        return HF.get_coordinates_from_ewkt(self.record.post_latlng)
+
+    @cached_property
+    def latlng_geom(self) -> Optional[str]:
+        """post_latlng as EWKB, formatted for sql upsert"""
+        return HF.return_ewkb_from_geotext(self.record.post_latlng)
+
+    @cached_property
+    def user_hll(self) -> str:
+        """Concat origin and user guid"""
+        return HLF.hll_concat_user(self.record)
+
+    @cached_property
+    def text_features(self) -> TextFeatures:
+        """Terms, hashtags and emoji of the post"""
+        return get_post_features(self.record)
+
+
+_RECORD_CONTEXT: Optional[RecordContext] = None
+
+
+def get_record_context(record: lbsn.Post) -> RecordContext:
+    """Return context of record
+
+    The context of the last record is kept, which covers
+    all bases and metrics extracted from a record in sequence
+    (records must not be modified in between).
+    """
+    global _RECORD_CONTEXT  # pylint: disable=global-statement
+    if _RECORD_CONTEXT is None or _RECORD_CONTEXT.record is not record:
+        _RECORD_CONTEXT = RecordContext(record)
+    return _RECORD_CONTEXT
+
+
 def base_factory(facet=None, base=None, record: lbsn.Post = None):
     """Base is initialized based on facet-base tuple
     and constructed by parsing lbsn records
@@ -140,24 +217,28 @@ def base_factory(facet=None, base=None, record: lbsn.Post = None):
     base_structure = BASE_REGISTER.get((facet, base))
     if base_structure is None:
         return
+    if base in TOPICAL_BASES:
+        # text features of a post are extracted once and
+        # shared by all topical bases
+        post_features = get_record_context(record).text_features
     # for topical bases (e.g. hashtag, emoji, term)
     # multiple bases can be created
     # from a single lbsn record
     if base == "hashtag":
         # only explicit hashtags
-        tag_terms = HF.filter_terms(record.hashtags)
+        tag_terms = post_features.tag_terms
         for tag in tag_terms:
             records.append(base_structure(tag))
     elif base == "emoji":
         # do nothing
-        all_post_emoji = HF.extract_emoji(record.post_body)
+        all_post_emoji = post_features.emoji
         for emoji in all_post_emoji:
             # create base for each term
             records.append(base_structure(emoji))
     elif base == "term":
         # any term mentioned in title,
         # body or hashtag
-        all_post_terms = HF.get_all_post_terms(record)
+        all_post_terms = post_features.all_terms
         for term in all_post_terms:
             # create base for each term
             records.append(base_structure(term))
@@ -170,34 +251,34 @@ def base_factory(facet=None, base=None, record: lbsn.Post = None):
     elif base == "_term_latlng":
         # any term mentioned in title,
         # body or hashtag
-        all_post_terms = HF.get_all_post_terms(record)
+        all_post_terms = post_features.all_terms
         for term in all_post_terms:
             # create base for each term
             base_record = base_structure(record=record, term=term)
             append_baserecord(records, base_record)
     elif base == "_hashtag_latlng":
         # any hashtag explicitly used
-        tag_terms = HF.filter_terms(record.hashtags)
+        tag_terms = post_features.tag_terms
         for tag in tag_terms:
             base_record = base_structure(record=record, hashtag=tag)
             append_baserecord(records, base_record)
     elif base == "_emoji_latlng":
         # any term mentioned in title,
         # body or hashtag
-        all_post_emoji = HF.extract_emoji(record.post_body)
+        all_post_emoji = post_features.emoji
         for emoji in all_post_emoji:
             # create base for each emoji
             base_record = base_structure(record=record, emoji=emoji)
             append_baserecord(records, base_record)
     elif base == "_month_hashtag":
         # any hashtag explicitly used
-        tag_terms = HF.filter_terms(record.hashtags)
+        tag_terms = post_features.tag_terms
         for tag in tag_terms:
             base_record = base_structure(record=record, hashtag=tag)
             append_baserecord(records, base_record)
     elif base == "_month_hashtag_latlng":
         # any hashtag explicitly used
-        tag_terms = HF.filter_terms(record.hashtags)
+        tag_terms = post_features.tag_terms
         for tag in tag_terms:
             base_record = base_structure(record=record, hashtag=tag)
             append_baserecord(records, base_record)
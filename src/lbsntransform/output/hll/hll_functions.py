@@ -7,10 +7,10 @@ Collection of functions used in hll transformation
 import datetime as dt
 from typing import Dict, Generator, List, Optional, Set, Tuple, Union
 
-import psycopg2
-
 import lbsnstructure as lbsn
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
+from lbsntransform.tools.text_features import get_post_features
 
 
 class HLLFunctions:
@@ -103,6 +103,7 @@ class HLLFunctions:
         """Calculates shards from batched hll_items
         using hll_worker connection
         """
+        psycopg2 = lazy_import("psycopg2")
         tsuccessful = False
         shard_sql = HLLFunctions.make_shard_sql(values_str)
         while not tsuccessful:
@@ -198,13 +199,13 @@ class HLLFunctions:
         return None
 
     @staticmethod
-    def hll_concat_upt_hll(record: lbsn.Post) -> List[str]:
+    def hll_concat_upt_hll(record: lbsn.Post, user_hll: str = None) -> List[str]:
         """Concat all post terms (body, title, hashtags) and return list"""
-        body_terms = HF.select_terms(record.post_body)
-        title_terms = HF.select_terms(record.post_title)
+        post_terms = get_post_features(record).terms
         tag_terms = {item.lower() for item in record.hashtags if len(item) > 2}
-        all_post_terms = set.union(body_terms, title_terms, tag_terms)
-        user_hll = HLLFunctions.hll_concat_user(record)
+        all_post_terms = post_terms | tag_terms
+        if user_hll is None:
+            user_hll = HLLFunctions.hll_concat_user(record)
         upt_hll = HLLFunctions.hll_concat_user_terms(user_hll, all_post_terms)
         return upt_hll
 
@@ -288,12 +288,14 @@ class ProtoHLLMapping:
     @staticmethod
     def get_post_metrics(record) -> hll.HllMetrics:
         """Get hll metrics from lbsn.Post record"""
+        # derived values are shared with the bases of this record
+        context = hll.get_record_context(record)
         post_hll = HLF.hll_concat_origin_guid(record)
-        user_hll = HLF.hll_concat_user(record)
-        pud_hll = HLF.hll_concat_userday(record)
+        user_hll = context.user_hll
+        pud_hll = HLF.hll_concat([user_hll, context.post_date])
         latlng_hll = HLF.hll_concat_latlng(record)
         place_hll = HLF.hll_concat_place(record)
-        upt_hll = HLF.hll_concat_upt_hll(record)
+        upt_hll = HLF.hll_concat_upt_hll(record, user_hll=user_hll)
         hll_metrics = hll.HllMetrics(
             post_hll=post_hll,
             user_hll=user_hll,
@@ -0,0 +1 @@
+"""lbsntransform output proto submodule"""
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for storing and reading lbsn records as length-delimited
+ProtoBuf archives.
+
+Each file holds records of a single lbsn type:
+    - header: PROTO_MAGIC, varint length and name of lbsn type (e.g. Post)
+    - records: varint length and serialized message, repeated
+
+Archives can be read as input (`--file_type lbsnproto`), records are
+then passed on without mapping.
+"""
+
+# pylint: disable=no-member
+
+import logging
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional
+
+import lbsnstructure as lbsn
+
+PROTO_MAGIC = b"LBSNPB\x00\x01"
+# file type and suffix of archives
+PROTO_FILE_TYPE = "lbsnproto"
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode unsigned integer as protobuf varint"""
+    parts = bytearray()
+    while value > 0x7F:
+        parts.append((value & 0x7F) | 0x80)
+        value >>= 7
+    parts.append(value)
+    return bytes(parts)
+
+
+def read_varint(file_handle: IO[bytes]) -> Optional[int]:
+    """Read protobuf varint from binary stream, None at end of stream"""
+    result = 0
+    shift = 0
+    while True:
+        byte = file_handle.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Archive truncated in length prefix.")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def write_header(file_handle: IO[bytes], type_name: str):
+    """Write archive header for lbsn type"""
+    type_name_bytes = type_name.encode("utf-8")
+    file_handle.write(
+        PROTO_MAGIC + encode_varint(len(type_name_bytes)) + type_name_bytes
+    )
+
+
+def read_header(file_handle: IO[bytes]) -> str:
+    """Read archive header, returns name of lbsn type"""
+    if file_handle.read(len(PROTO_MAGIC)) != PROTO_MAGIC:
+        raise ValueError("Not a length-delimited lbsn archive.")
+    name_length = read_varint(file_handle)
+    if name_length is None:
+        raise ValueError("Archive header truncated.")
+    return file_handle.read(name_length).decode("utf-8")
+
+
+def read_proto_stream(file_handle: IO[bytes]) -> Iterator[Any]:
+    """Yield lbsn records of archive (binary stream)"""
+    type_name = read_header(file_handle)
+    record_class = getattr(lbsn, type_name)
+    while True:
+        record_length = read_varint(file_handle)
+        if record_length is None:
+            return
+        record_bytes = file_handle.read(record_length)
+        if len(record_bytes) < record_length:
+            raise ValueError(f"Archive truncated in {type_name} record.")
+        record = record_class()
+        record.ParseFromString(record_bytes)
+        yield record
+
+
+class LBSNProtoStream:
+    """Append lbsn records to length-delimited archives,
+    one file per lbsn type (e.g. `Post.lbsnproto`)
+
+    Existing archives are continued.
+
+    Attributes:
+        output_path     Folder of archives
+    """
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.files: Dict[str, IO[bytes]] = {}
+        self.count_records = 0
+
+    def _open(self, type_name: str) -> IO[bytes]:
+        """Open archive of lbsn type for appending"""
+        file_path = self.output_path / f"{type_name}.{PROTO_FILE_TYPE}"
+        if file_path.exists() and file_path.stat().st_size > 0:
+            with open(file_path, "rb") as file_handle:
+                archive_type = read_header(file_handle)
+            if archive_type != type_name:
+                raise ValueError(
+                    f"Archive {file_path} contains {archive_type} records, "
+                    f"cannot append {type_name} records."
+                )
+            file_handle = open(file_path, "ab")
+        else:
+            file_handle = open(file_path, "wb")
+            write_header(file_handle, type_name)
+        self.files[type_name] = file_handle
+        return file_handle
+
+    def store_record(self, record, type_name: str):
+        """Append serialized record to archive of lbsn type"""
+        file_handle = self.files.get(type_name)
+        if file_handle is None:
+            file_handle = self._open(type_name)
+        record_bytes = record.SerializeToString()
+        file_handle.write(encode_varint(len(record_bytes)) + record_bytes)
+        self.count_records += 1
+
+    def flush(self):
+        """Flush archives, e.g. on commit"""
+        for file_handle in self.files.values():
+            file_handle.flush()
+
+    def close(self):
+        """Close archives"""
+        for file_handle in self.files.values():
+            file_handle.close()
+        self.files.clear()
+        logging.getLogger("__main__").info(
+            f"Archived {self.count_records} lbsn records in {self.output_path}"
+        )
@@ -6,8 +6,45 @@ Shared structural classes
 
 import time
 import csv
-from typing import Any, Iterator, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Tuple
 import lbsnstructure as lbsn
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+
+# kinds of fields, for merging lbsn records
+FIELD_SCALAR = 0
+FIELD_MESSAGE = 1
+FIELD_REPEATED_SCALAR = 2
+FIELD_REPEATED_MESSAGE = 3
+FIELD_MAP = 4
+
+
+@lru_cache(maxsize=None)
+def get_field_kinds(descriptor: Descriptor) -> Dict[str, int]:
+    """Return (cached) kind of each field of a message type"""
+    field_kinds = {}
+    for field in descriptor.fields:
+        is_message = field.type == FieldDescriptor.TYPE_MESSAGE
+        if field.label != FieldDescriptor.LABEL_REPEATED:
+            kind = FIELD_MESSAGE if is_message else FIELD_SCALAR
+        elif is_message and field.message_type.GetOptions().map_entry:
+            kind = FIELD_MAP
+        else:
+            kind = FIELD_REPEATED_MESSAGE if is_message else FIELD_REPEATED_SCALAR
+        field_kinds[field.name] = kind
+    return field_kinds
+
+
+@lru_cache(maxsize=None)
+def get_repeated_fields(descriptor: Descriptor) -> Tuple[Tuple[str, bool], ...]:
+    """Return (cached) names of repeated fields (except maps) of a message
+    type, with True for repeated messages (e.g. user mentions)
+    """
+    return tuple(
+        (name, kind == FIELD_REPEATED_MESSAGE)
+        for name, kind in get_field_kinds(descriptor).items()
+        if kind in (FIELD_REPEATED_SCALAR, FIELD_REPEATED_MESSAGE)
+    )
 
 
 class Coordinates:
@@ -140,25 +177,10 @@ class LBSNRecordDicts:
         self.count_dup_merge = 0
 
     def deep_compare_merge_messages(self, old_record, new_record):
-        """Do a deep compare & merge of two lbsn records
-
-        ProtoBuf MergeFrom does a fine job
-        only problem is it concatenates repeated strings,
-        which may result in duplicate entries
-        we take care of this prior to submission (see submitData classes)
+        """Do a deep compare & merge of two lbsn records,
+        see merge_existing_records()
         """
-        old_record.MergeFrom(new_record)
-        # for descriptor in oldRecord.DESCRIPTOR.fields:
-        #        if descriptor.label == descriptor.LABEL_REPEATED:
-        #            if value_old == value_new:
-        #                return oldRecord
-        #            elif not value_old:
-        #                newEntries = value_new
-        #            else:
-        #                # only add difference (e.g. = new values)
-        #                newEntries = list(set(value_new) - set(value_old))
-        #            x = getattr(oldRecord, descriptor.name)
-        #            x.extend(newEntries)
+        self.merge_existing_records(old_record, new_record)
         return old_record
 
     def add_records_to_dict(self, records):
@@ -227,16 +249,36 @@ class LBSNRecordDicts:
     def merge_existing_records(cls, oldrecord, newrecord):
         """Merge two lbsn records
 
-        Basic Compare function for GUIDS
-        First check if length of both ProtoBuf Messages are the same
+        Values of fields populated in newrecord replace those of
+        oldrecord (ProtoBuf MergeFrom), except for repeated fields,
+        which are merged as sets: repeated values are stored sorted
+        and without duplicates (as with sort_clean_proto_repeated_field()
+        before submission), repeated messages (e.g. user mentions)
+        are only added if new.
         """
-        old_record_string = oldrecord.SerializeToString()
-        new_record_string = newrecord.SerializeToString()
-        if not len(old_record_string) == len(new_record_string):
-            # no need to do anything if same lengt
-            oldrecord.MergeFrom(newrecord)
-            # updatedrecord = self.deepCompareMergeMessages(oldrecord,
-            #                                               newrecord)
+        if oldrecord is newrecord or oldrecord == newrecord:
+            return
+        merged_fields = []
+        for name, is_message in get_repeated_fields(newrecord.DESCRIPTOR):
+            new_values = getattr(newrecord, name)
+            if not new_values:
+                continue
+            old_values = getattr(oldrecord, name)
+            if is_message:
+                merged = [item for item in new_values if item not in old_values]
+                merged_fields.append((name, len(old_values), merged))
+            elif not set(new_values).issubset(old_values):
+                merged = sorted(set(old_values).union(new_values))
+                merged_fields.append((name, 0, merged))
+            else:
+                merged_fields.append((name, len(old_values), ()))
+        oldrecord.MergeFrom(newrecord)
+        # MergeFrom appends repeated values,
+        # replace them with the merged values
+        for name, keep_count, merged in merged_fields:
+            values = getattr(oldrecord, name)
+            del values[keep_count:]
+            values.extend(merged)
 
 
 class GeocodeLocations:
@@ -9,14 +9,16 @@ Module for storing common Proto LBSN Structure to PG DB.
 import traceback
 import logging
 import sys
+from pathlib import Path
 from typing import Any, Dict, List, Tuple, Union, Optional
 
-import psycopg2
-
 import lbsnstructure as lbsn
 from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.lazy_imports import lazy_import
 
 from lbsntransform.output.csv.store_csv import LBSNcsv
+from lbsntransform.output.proto.store_proto import LBSNProtoStream
+from lbsntransform.output.shared_structure import get_repeated_fields
 from lbsntransform.output.hll import hll_bases as hll
 from lbsntransform.output.hll.base import social, spatial, temporal, topical
 from lbsntransform.output.hll.hll_functions import HLLFunctions as HLF
@@ -43,6 +45,7 @@ class LBSNTransfer:
         hllworker_cursor=None,
         include_lbsn_bases=None,
         dry_run: Optional[bool] = None,
+        proto_output: Optional[Path] = None,
     ):
         self.db_cursor = db_cursor
         self.db_connection = db_connection
@@ -123,9 +126,15 @@ class LBSNTransfer:
 
         if self.store_csv:
             self.csv_output = LBSNcsv(SUPPRESS_LINEBREAKS)
+        # optional: archive lbsn records as length-delimited protobuf
+        self.proto_output = None
+        if proto_output and not self.dry_run:
+            self.proto_output = LBSNProtoStream(proto_output)
 
     def commit_changes(self):
         """Commit Changes to DB"""
+        if self.proto_output:
+            self.proto_output.flush()
         if self.db_cursor:
             self.db_connection.commit()  #
             self.count_entries_commit = 0
@@ -184,6 +193,8 @@ class LBSNTransfer:
                 f"Converting {r_cnt} of {g_cnt} " f"lbsn records ({type_name})..",
                 end="\r",
             )
+            if self.proto_output:
+                self.proto_output.store_record(record, type_name)
             self.prepare_lbsn_record(record, type_name)
             self.count_glob += 1  # self.dbCursor.rowcount
             self.count_entries_commit += 1  # self.dbCursor.rowcount
@@ -519,6 +530,7 @@ class LBSNTransfer:
         tsuccessful = False
         if self.dry_run:
             return
+        psycopg2 = lazy_import("psycopg2")
         self.db_cursor.execute("SAVEPOINT submit_recordBatch")
         while not tsuccessful:
             try:
@@ -594,29 +606,30 @@ class LBSNTransfer:
 
         ProtocolBuffers has no unique list field type. This function will
         remove duplicates from lists, which is needed for unique compare.
+        Lists of merged records are already sorted and without duplicates
+        (see LBSNRecordDicts.merge_existing_records()) and are skipped.
         """
-        for descriptor in record.DESCRIPTOR.fields:
-            if descriptor.label == descriptor.LABEL_REPEATED:
-                x_attr = getattr(record, descriptor.name)
-                if x_attr and not len(x_attr) == 1:
-                    try:
-                        x_attr_cleaned = set(x_attr)
-                    except TypeError:
-                        # needed to catch
-                        # TypeError for unhashable type: 'CompositeKey'
-                        # (lazy-initialized)
-                        continue
-                    x_attr_sorted = sorted(x_attr_cleaned)
-                    # Complete clear of repeated field
-                    for _ in range(0, len(x_attr)):
-                        x_attr.pop()
-                    # add sorted list
-                    x_attr.extend(x_attr_sorted)
+        for name, is_message in get_repeated_fields(record.DESCRIPTOR):
+            if is_message:
+                continue
+            x_attr = getattr(record, name)
+            if len(x_attr) < 2 or all(
+                value < next_value for value, next_value in zip(x_attr, x_attr[1:])
+            ):
+                continue
+            x_attr_sorted = sorted(set(x_attr))
+            # Complete clear of repeated field
+            del x_attr[:]
+            # add sorted list
+            x_attr.extend(x_attr_sorted)
 
     def finalize(self):
         """Final procedure calls:
         - clean and merge csv batches
+        - close protobuf archives
         """
+        if self.proto_output:
+            self.proto_output.close()
         if self.store_csv:
             raise NotImplementedError("CSV Output curently not supported")
             # self.csv_output.clean_csv_batches(
@@ -8,9 +8,7 @@ import getpass
 import logging
 import sys
 
-import psycopg2
-import psycopg2.extras
-from psycopg2.extras import DictCursor
+from lbsntransform.tools.lazy_imports import lazy_import
 
 LOG = logging.getLogger()
 
@@ -57,9 +55,12 @@ class DBConnection():
                       f"sslmode='{conf['sslmode']}'" \
                       f"port='{conf['port']}'" \
                       f"application_name='LBSN Batch Transfer'"
+        # psycopg2 is imported on first connect
+        psycopg2 = lazy_import("psycopg2")
+        extras = lazy_import("psycopg2.extras")
         cursor_factory = None
         if dict_cursor:
-            cursor_factory = DictCursor
+            cursor_factory = extras.DictCursor
         # get a connection, if a connect cannot be made an
         # exception will be raised here
         try:
@@ -68,7 +69,7 @@ class DBConnection():
             print(err)
             sys.exit()
         # activate dict to hstore conversion globally
-        psycopg2.extras.register_hstore(conn, globally=True)
+        extras.register_hstore(conn, globally=True)
         # conn.cursor will return a cursor object,
         # this will be used to perform queries
         cursor = conn.cursor()
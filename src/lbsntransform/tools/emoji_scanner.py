@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for extracting emoji from text with a codepoint trie.
+
+The trie is built once, on first use, from the emoji sequences of the
+emoji package (emoji.EMOJI_DATA), including ZWJ sequences, skin tone
+modifiers, keycaps and flags. Texts are scanned in a single left-to-right
+pass: positions of characters that may start or join an emoji are
+collected first, runs of other characters are skipped, and only
+candidate characters walk the trie.
+
+Matches are identical to emoji.emoji_list(), including the handling
+of non-RGI ZWJ sequences (the emoji joined by a ZWJ are returned
+individually).
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from lbsntransform.tools.lazy_imports import lazy_import
+
+# zero width joiner
+ZWJ = "‍"
+# variation selectors (text and emoji presentation)
+VARIATION_SELECTORS = ("︎", "️")
+# key of trie nodes that complete an emoji,
+# value is True for components (e.g. skin tones)
+TERMINAL = ""
+
+_TRIE: Dict[str, Any] = {}
+_CANDIDATES: Optional[FrozenSet[str]] = None
+
+
+def _build_trie() -> Tuple[Dict[str, Any], FrozenSet[str]]:
+    """Build codepoint trie and candidate characters from emoji sequences"""
+    emoji = lazy_import("emoji")
+    component = emoji.STATUS["component"]
+    trie: Dict[str, Any] = {}
+    for emoji_seq, emoji_data in emoji.EMOJI_DATA.items():
+        node = trie
+        for char in emoji_seq:
+            node = node.setdefault(char, {})
+        node[TERMINAL] = emoji_data["status"] == component
+    # characters that may start an emoji or join emoji
+    candidates = frozenset(trie) | {ZWJ}
+    return trie, candidates
+
+
+def get_trie() -> Tuple[Dict[str, Any], FrozenSet[str]]:
+    """Return (cached) codepoint trie and candidate characters"""
+    global _CANDIDATES  # pylint: disable=global-statement
+    if _CANDIDATES is None:
+        trie, _CANDIDATES = _build_trie()
+        _TRIE.update(trie)
+    return _TRIE, _CANDIDATES
+
+
+def scan_emoji(text: str) -> List[str]:
+    """Return emoji of text in order of occurrence (with duplicates)"""
+    if text.isascii():
+        # no emoji consists of ascii characters only
+        return []
+    trie, candidates = get_trie()
+    if candidates.isdisjoint(text):
+        return []
+    positions = [i for i, char in enumerate(text) if char in candidates]
+    found: List[str] = []
+    # tokens not yet final: (start, end, emoji or None for characters);
+    # a ZWJ following an emoji rewinds the scan to split
+    # non-RGI ZWJ sequences, which removes pending tokens
+    pending: List[Tuple[int, int, Optional[str]]] = []
+    # positions of ZWJ joining non-RGI sequences
+    ignore: Set[int] = set()
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if i in ignore:
+            i += 1
+            continue
+        node = trie.get(char)
+        if node is None and char != ZWJ:
+            # skip run of characters that cannot start an emoji
+            next_pos = bisect_left(positions, i + 1)
+            i = positions[next_pos] if next_pos < len(positions) else length
+            found.extend(token[2] for token in pending if token[2])
+            last_char = text[i - 1]
+            if last_char in VARIATION_SELECTORS:
+                pending = []
+            else:
+                pending = [(i - 1, i, None)]
+            continue
+        if node is not None:
+            j = i + 1
+            while j < length and j not in ignore:
+                child = node.get(text[j])
+                if child is None:
+                    break
+                node = child
+                j += 1
+            if TERMINAL in node:
+                pending.append((i, j, text[i:j]))
+                i = j
+                continue
+        elif pending and i > 0 and text[i - 1] in trie:
+            # ZWJ after the last token
+            start, end, emoji_seq = pending[-1]
+            if emoji_seq is not None or TERMINAL in trie.get(text[start], {}):
+                ignore.add(i)
+                if _is_component(trie, text[start:end]):
+                    # either ZWJ + component or ZWJ + emoji + component
+                    i -= sum(token[1] - token[0] for token in pending[-2:])
+                    if text[i] == ZWJ:
+                        i += 1
+                        del pending[-1]
+                    else:
+                        del pending[-2:]
+                else:
+                    # rescan last emoji up to the ZWJ
+                    i -= end - start
+                    del pending[-1]
+                continue
+        # character without emoji match
+        if pending and node is None:
+            found.extend(token[2] for token in pending if token[2])
+            pending = []
+        if char not in VARIATION_SELECTORS:
+            pending.append((i, i + 1, None))
+        i += 1
+    found.extend(token[2] for token in pending if token[2])
+    return found
+
+
+def _is_component(trie: Dict[str, Any], emoji_seq: str) -> bool:
+    """Return True if emoji sequence is a component (e.g. a skin tone)"""
+    node: Optional[Dict[str, Any]] = trie
+    for char in emoji_seq:
+        node = node.get(char)
+        if node is None:
+            return False
+    return node.get(TERMINAL, False)
+
+
+def extract_emoji(text: str) -> List[str]:
+    """Return distinct emoji of text, in order of first occurrence"""
+    return list(dict.fromkeys(scan_emoji(text)))
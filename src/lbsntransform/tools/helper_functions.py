@@ -9,45 +9,78 @@ import datetime as dt
 import importlib.util
 import json
 import logging
+import math
 import re
 import string
+import struct
 from datetime import timezone
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+from functools import lru_cache
 from json import JSONDecodeError, JSONDecoder
 from pathlib import Path
-from typing import List, Optional, Set, Union, Any, Dict
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import lbsnstructure as lbsn
-from emoji import distinct_emoji_list
 from google.protobuf.timestamp_pb2 import Timestamp
-from shapely import geos, wkt
-from shapely.geometry import Point, Polygon
 
 from lbsntransform.output.shared_structure import Coordinates
+from lbsntransform.tools import emoji_scanner, json_backend
+from lbsntransform.tools.lazy_imports import lazy_import
 
-NLTK_AVAIL = None
-STOPWORDS = None
-try:
-    # check if nltk is installed
-    import nltk
+if TYPE_CHECKING:
+    import numpy as np
+    from shapely.geometry import Point, Polygon
 
+NLTK_AVAIL = None
+if importlib.util.find_spec("nltk") is not None:
+    # nltk is installed, the stopwords corpus
+    # is loaded on first use (get_stopwords())
     NLTK_AVAIL = True
-except ImportError:
-    pass
-
-if NLTK_AVAIL:
-    try:
-        # check if stopwords corpus is available
-        from nltk.corpus import stopwords
-
-        STOPWORDS = stopwords.words("english")
-    except LookupError:
-        print(
-            "Please use "
-            "`python -c 'import nltk;nltk.download(\"stopwords\")'` "
-            "to install stopwords resource globally. Continuing without "
-            "nltk stopwords filter.."
-        )
-        STOPWORDS = None
+STOPWORDS = None
+_STOPWORDS_LOADED = False
+
+# default number of characters read per chunk
+# when streaming json from files
+STREAM_CHUNK_SIZE = 2**16
+# maximum number of characters buffered for a single json array element
+STREAM_MAX_ELEMENT_SIZE = 2**26
+NOT_WHITESPACE = re.compile(r"[^\s]")
+# line starting with "{", to resync after malformed json
+JSON_RESYNC = re.compile(r"\n[ \t]*(?=\{)")
+# line break and indentation at the end of a chunk
+JSON_RESYNC_TAIL = re.compile(r"\n[ \t]*$")
+# opening and closing anchor tags
+HYPERLINK_PATTERN = re.compile(r"<(a|/a).*?>")
+# translation table for removing punctuation from terms
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+# 2D point WKT, optionally with SRID 4326 (EWKT)
+_WKT_NUMBER = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+POINT_WKT = re.compile(
+    rf"^\s*(?:SRID=4326;)?\s*POINT\s*\(\s*{_WKT_NUMBER}\s+{_WKT_NUMBER}\s*\)\s*$",
+    re.IGNORECASE,
+)
+# WKB geometry type flag for an included SRID (EWKB)
+EWKB_SRID_FLAG = 0x20000000
+# decimal places of WKT numbers (as written by GEOS)
+WKT_PRECISION = Decimal("1e-16")
+# WKT of non-finite coordinates, as written by GEOS
+WKT_NON_FINITE = {"inf": "Infinity", "-inf": "-Infinity", "nan": "NaN"}
+# number of point EWKB encodings cached, for repeated coordinates
+EWKB_CACHE_SIZE = 2**16
+# WGS1984
+SRID_WGS84 = 4326
 # pylint: disable=no-member
 
 
@@ -105,9 +138,7 @@ class HelperFunctions:
         Note:
         - anything between <a>xxx</a> will be kept
         """
-        pattern = r"<(a|/a).*?>"
-        result = re.sub(pattern, "", text_s)
-        return result
+        return HYPERLINK_PATTERN.sub("", text_s)
 
     @staticmethod
     def get_all_post_terms(record: Optional[lbsn.Post] = None) -> Set[str]:
@@ -126,7 +157,7 @@ class HelperFunctions:
         # remove problematic characters from string
         text_s = HelperFunctions.sanitize_string(text_s)
         # remove punctuation
-        text_s = text_s.translate(str.maketrans("", "", string.punctuation))
+        text_s = text_s.translate(PUNCTUATION_TABLE)
         # split string by space character into list
         querywords = text_s.split()
         resultwords = HelperFunctions.filter_terms(querywords, selection_list)
@@ -157,15 +188,37 @@ class HelperFunctions:
         return resultwords
 
     @staticmethod
-    def nltk_stopword_filter(
-        term: str, nltk_avail=NLTK_AVAIL, stopwords=STOPWORDS
-    ) -> bool:
+    def nltk_stopword_filter(term: str, nltk_avail=NLTK_AVAIL, stopwords=None) -> bool:
         """Filter term against nltk stopwords (english)"""
-        if nltk_avail is not None and stopwords is not None:
-            if term in stopwords:
-                return False
+        if nltk_avail is None:
+            return True
+        if stopwords is None:
+            stopwords = HelperFunctions.get_stopwords()
+        if stopwords is not None and term in stopwords:
+            return False
         return True
 
+    @staticmethod
+    def get_stopwords() -> Optional[FrozenSet[str]]:
+        """Load nltk stopwords (english) on first use"""
+        global STOPWORDS, _STOPWORDS_LOADED  # pylint: disable=global-statement
+        if _STOPWORDS_LOADED or not NLTK_AVAIL:
+            return STOPWORDS
+        _STOPWORDS_LOADED = True
+        try:
+            # check if stopwords corpus is available
+            stopwords = lazy_import("nltk.corpus").stopwords
+            STOPWORDS = frozenset(stopwords.words("english"))
+        except LookupError:
+            print(
+                "Please use "
+                "`python -c 'import nltk;nltk.download(\"stopwords\")'` "
+                "to install stopwords resource globally. Continuing without "
+                "nltk stopwords filter.."
+            )
+            STOPWORDS = None
+        return STOPWORDS
+
     @staticmethod
     def reduce_ewkt_to_wkt(geom_ewkt: str) -> str:
         """Hack to reduce extended WKT (eWKT) to WKT"""
@@ -173,15 +226,81 @@ class HelperFunctions:
         return geom_wkt
 
     @staticmethod
-    def get_geom_from_ewkt(geom_ewkt: str) -> Union[Point, Polygon]:
+    def get_geom_from_ewkt(geom_ewkt: str) -> Union["Point", "Polygon"]:
         """Convert EWKT representation (without srid) to shapely geometry
 
         Note: either Point or Polygon
         """
         geom_wkt = HelperFunctions.reduce_ewkt_to_wkt(geom_ewkt)
-        shply_geom = wkt.loads(geom_wkt)
+        shply_geom = lazy_import("shapely.wkt").loads(geom_wkt)
         return shply_geom
 
+    @staticmethod
+    def decode_wkb_point(geom_hex: str) -> Optional[Tuple[float, float]]:
+        """Decode hex (E)WKB of a 2D point to (lng, lat) with struct
+
+        Returns None for other geometry types (or empty points),
+        e.g. to be decoded with shapely.
+        """
+        # 21 bytes WKB, 25 bytes EWKB with SRID
+        if len(geom_hex) not in (42, 50):
+            return None
+        try:
+            wkb_bytes = bytes.fromhex(geom_hex)
+        except ValueError:
+            return None
+        byte_order = "<" if wkb_bytes[0] == 1 else ">"
+        (geom_type,) = struct.unpack_from(f"{byte_order}I", wkb_bytes, 1)
+        offset = 5
+        if geom_type & EWKB_SRID_FLAG:
+            geom_type &= ~EWKB_SRID_FLAG
+            offset += 4
+        if geom_type != 1 or len(wkb_bytes) != offset + 16:
+            return None
+        lng, lat = struct.unpack_from(f"{byte_order}dd", wkb_bytes, offset)
+        if math.isnan(lng) or math.isnan(lat):
+            return None
+        return lng, lat
+
+    @staticmethod
+    def format_wkt_number(value: float) -> str:
+        """Format coordinate for WKT, as written by GEOS (shapely .wkt):
+        shortest representation, rounded to 16 decimal places"""
+        if not math.isfinite(value):
+            return WKT_NON_FINITE[repr(value)]
+        value_str = repr(value)
+        if "e" in value_str or len(value_str.partition(".")[2]) > 16:
+            value_dec = Decimal(value_str)
+            with localcontext() as ctx:
+                # enough digits for the integer part and 16 decimal places
+                ctx.prec = max(ctx.prec, value_dec.adjusted() + 17)
+                value_str = format(
+                    value_dec.quantize(WKT_PRECISION, rounding=ROUND_HALF_EVEN),
+                    "f",
+                )
+        if "." in value_str:
+            value_str = value_str.rstrip("0").rstrip(".")
+        if value_str == "-0":
+            return "0"
+        return value_str
+
+    @staticmethod
+    def point_to_wkt(lng: float, lat: float) -> str:
+        """Return WKT of point, e.g. 'POINT (13.7 51)'"""
+        return (
+            f"POINT ({HelperFunctions.format_wkt_number(lng)} "
+            f"{HelperFunctions.format_wkt_number(lat)})"
+        )
+
+    @staticmethod
+    def parse_point_wkt(geom: str) -> Optional[Tuple[float, float]]:
+        """Parse (lng, lat) of 2D point (E)WKT without shapely,
+        returns None for other geometries"""
+        match = POINT_WKT.match(geom)
+        if not match:
+            return None
+        return float(match.group(1)), float(match.group(2))
+
     @staticmethod
     def get_coordinates_from_ewkt(geom: str) -> Coordinates:
         """Convert EWKT representation (with srid) to geometry
@@ -195,6 +314,9 @@ class HelperFunctions:
         """
         if not geom:
             return Coordinates()
+        point = HelperFunctions.parse_point_wkt(geom)
+        if point is not None:
+            return Coordinates(lng=point[0], lat=point[1])
         geom = HelperFunctions.reduce_ewkt_to_wkt(geom)
         shply_geom = HelperFunctions.get_geom_from_ewkt(geom)
         if not shply_geom.geom_type == "Point":
@@ -262,6 +384,18 @@ class HelperFunctions:
             usernames), it is allowed and needed to extract the full reference.
         allow_underscore: Same as allow_minus, just for underscore character (_)
         """
+        extract_special_pattern = HelperFunctions.get_special_pattern(
+            startstring, allow_minus, allow_underscore
+        )
+        special_list = extract_special_pattern.findall(text_str)
+        return set(special_list)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_special_pattern(
+        startstring: str, allow_minus: bool = False, allow_underscore: bool = False
+    ) -> "re.Pattern[str]":
+        """Compile pattern of extract_special() once per startstring and options"""
         optional_minus = ""
         optional_underscore = ""
         additional_chars = ""
@@ -271,11 +405,7 @@ class HelperFunctions:
             optional_underscore = "_"
         if allow_minus or allow_underscore:
             additional_chars = rf"[{optional_minus}{optional_underscore}]?\w+"
-        extract_special_pattern = re.compile(
-            rf"(?i)(?<={startstring})\w+{additional_chars}"
-        )
-        special_list = extract_special_pattern.findall(text_str)
-        return set(special_list)
+        return re.compile(rf"(?i)(?<={startstring})\w+{additional_chars}")
 
     @staticmethod
     def json_read_wrapper(gen):
@@ -285,7 +415,7 @@ class HelperFunctions:
                 yield next(gen)
             except StopIteration:
                 # no further items produced by the iterator
-                raise
+                return
             except json.decoder.JSONDecodeError:
                 HelperFunctions._log_json_decodeerror(gen)
             except Exception as e:
@@ -293,16 +423,21 @@ class HelperFunctions:
 
     @staticmethod
     def json_load_wrapper(gen, single: bool = None):
-        """Wraps json load(s) and catches any error"""
+        """Wraps json load(s) and catches any error
+
+        Documents are decoded with the selected json backend
+        (see json_backend.set_json_backend).
+        """
         if single is None:
             single = False
         try:
             if single:
-                record = json.loads(gen)
+                record = json_backend.loads(gen)
                 return record
-            records = json.load(gen)
+            records = json_backend.loads(gen.read())
             return records
-        except json.decoder.JSONDecodeError:
+        except ValueError:
+            # JSONDecodeError, or decode errors of other backends
             HelperFunctions._log_json_decodeerror(gen)
         except Exception as exc_general:
             HelperFunctions._log_unhandled_exception(exc_general)
@@ -379,6 +514,62 @@ class HelperFunctions:
         # check post geoaccuracy
         return bool(post_geoaccuracy in allowed_geoaccuracies)
 
+    @staticmethod
+    def get_csv_column(
+        records: List[Union[List[str], Dict[str, str]]],
+        key: Union[int, str],
+        default: str = "",
+    ) -> "np.ndarray":
+        """Return column of csv rows (lists or dicts) as numpy string array
+
+        Missing or empty values are returned as default.
+        """
+        np = lazy_import("numpy")
+        if records and isinstance(records[0], dict):
+            values = [record.get(key) or default for record in records]
+        else:
+            values = [
+                record[key] if len(record) > key else default for record in records
+            ]
+        return np.array(values, dtype=str)
+
+    @staticmethod
+    def parse_float_column(values: "np.ndarray") -> "np.ndarray":
+        """Convert numpy string array to float, empty or invalid values to nan"""
+        np = lazy_import("numpy")
+        values = np.char.strip(values)
+        try:
+            return np.where(values == "", "nan", values).astype(np.float64)
+        except ValueError:
+            # at least one invalid value, convert one by one
+            return np.array(
+                [HelperFunctions._parse_float(value) for value in values.tolist()],
+                dtype=np.float64,
+            )
+
+    @staticmethod
+    def _parse_float(value: str) -> float:
+        """Convert string to float, invalid values to nan"""
+        try:
+            return float(value)
+        except ValueError:
+            return float("nan")
+
+    @staticmethod
+    def map_column_values(
+        values: "np.ndarray", mapping: Dict[str, Any]
+    ) -> "np.ndarray":
+        """Map values of column with dict, looked up once per distinct value
+
+        Values not in mapping are returned as None.
+        """
+        np = lazy_import("numpy")
+        uniques, inverse = np.unique(values, return_inverse=True)
+        mapped = np.array(
+            [mapping.get(value) for value in uniques.tolist()], dtype=object
+        )
+        return mapped[inverse.reshape(-1)]
+
     @staticmethod
     def get_version():
         """Gets the program version number from version file in root"""
@@ -413,9 +604,9 @@ class HelperFunctions:
         return cleantext
 
     @staticmethod
-    def extract_emoji(string_with_emoji: str) -> Set[str]:
-        """Extract distinct set of emoji from string"""
-        return distinct_emoji_list(string_with_emoji)
+    def extract_emoji(string_with_emoji: str) -> List[str]:
+        """Extract distinct emoji from string (in order of occurrence)"""
+        return emoji_scanner.extract_emoji(string_with_emoji)
 
     @staticmethod
     def get_rectangle_bounds(points):
@@ -433,11 +624,13 @@ class HelperFunctions:
 
     @staticmethod
     def new_lbsn_record_with_id(record, id, origin):
-        """Initialize new lbsn record with composite ID"""
-        c_key = lbsn.CompositeKey()
-        c_key.origin.CopyFrom(origin)
-        c_key.id = id
-        record.pkey.CopyFrom(c_key)
+        """Initialize new lbsn record with composite ID
+
+        See also LBSNRecordFactory, for records created in loops.
+        """
+        # composite key is assigned in place
+        record.pkey.origin.CopyFrom(origin)
+        record.pkey.id = id
         return record
 
     @staticmethod
@@ -447,16 +640,11 @@ class HelperFunctions:
         """Initialize new lbsn relationship with 2 composite IDs
         for one origin
         """
-        c_key_to = lbsn.CompositeKey()
-        c_key_to.origin.CopyFrom(relation_origin)
-        c_key_to.id = relation_to_id
-        c_key_from = lbsn.CompositeKey()
-        c_key_from.origin.CopyFrom(relation_origin)
-        c_key_from.id = relation_from_id
-        r_key = lbsn.RelationshipKey()
-        r_key.relation_to.CopyFrom(c_key_to)
-        r_key.relation_from.CopyFrom(c_key_from)
-        lbsn_relationship.pkey.CopyFrom(r_key)
+        r_key = lbsn_relationship.pkey
+        r_key.relation_to.origin.CopyFrom(relation_origin)
+        r_key.relation_to.id = relation_to_id
+        r_key.relation_from.origin.CopyFrom(relation_origin)
+        r_key.relation_from.id = relation_from_id
         return lbsn_relationship
 
     @staticmethod
@@ -651,18 +839,56 @@ class HelperFunctions:
         from PostGis Format (e.g. 'POINT(0 0)')
         with SRID for WGS1984 (4326)
 
-        Note that:
-        geos.WKBWriter.defaults['include_srid'] = True
-        must be set (see config.py)
+        Points are encoded directly (see point_to_ewkb_hex),
+        other geometries with shapely.
         """
         if text is None:
             # keep Null geometries, e.g. for geom_area columns
             return None
-        geom = wkt.loads(text)
-        # Set SRID to WGS1984
-        geos.lgeos.GEOSSetSRID(geom._geom, 4326)
-        geom = geom.wkb_hex
-        return geom
+        point = HelperFunctions.parse_point_wkt(text)
+        if point is not None:
+            return HelperFunctions.point_to_ewkb_hex(*point)
+        geom = lazy_import("shapely.wkt").loads(text)
+        return HelperFunctions.geom_to_ewkb_hex(geom)
+
+    @staticmethod
+    def point_to_ewkb_hex(lng: float, lat: float) -> str:
+        """Encode point as EWKB hex (little endian) with SRID 4326,
+        as returned by PostGis
+
+        Recently used coordinates are cached, e.g. for coordinates
+        repeated at low geoaccuracy. Points with a zero coordinate are
+        not cached: 0.0 and -0.0 are the same cache key, but are
+        encoded with their sign (as by shapely).
+        """
+        if lng == 0 or lat == 0:
+            return HelperFunctions._encode_point_ewkb_hex(lng, lat)
+        return HelperFunctions._cached_point_ewkb_hex(lng, lat)
+
+    @staticmethod
+    @lru_cache(maxsize=EWKB_CACHE_SIZE)
+    def _cached_point_ewkb_hex(lng: float, lat: float) -> str:
+        """Encode point as EWKB hex, cached (see point_to_ewkb_hex)"""
+        return HelperFunctions._encode_point_ewkb_hex(lng, lat)
+
+    @staticmethod
+    def _encode_point_ewkb_hex(lng: float, lat: float) -> str:
+        """Encode point as EWKB hex (see point_to_ewkb_hex)"""
+        ewkb = struct.pack("<BIIdd", 1, 1 | EWKB_SRID_FLAG, SRID_WGS84, lng, lat)
+        return ewkb.hex().upper()
+
+    @staticmethod
+    def geom_to_ewkb_hex(geom) -> str:
+        """Encode shapely geometry as EWKB hex with SRID 4326"""
+        shapely = lazy_import("shapely")
+        if hasattr(shapely, "to_wkb"):
+            # shapely>=2.0
+            geom = shapely.set_srid(geom, SRID_WGS84)
+            return shapely.to_wkb(geom, hex=True, include_srid=True)
+        # shapely 1.x
+        geos = lazy_import("shapely.geos")
+        geos.lgeos.GEOSSetSRID(geom._geom, SRID_WGS84)
+        return geos.WKBWriter(geos.lgeos, include_srid=True).write_hex(geom)
 
     @staticmethod
     def decode_stacked(document, pos=0, decoder=JSONDecoder()):
@@ -680,6 +906,260 @@ class HelperFunctions:
                 raise
             yield obj
 
+    @staticmethod
+    def decode_stacked_stream(
+        file_handle: IO[str],
+        chunk_size: int = None,
+        decoder=JSONDecoder(),
+        buffer: str = "",
+    ) -> Iterator[Any]:
+        """Decode stacked json incrementally from an open file handle
+
+        The file is read in chunks of chunk_size characters, records are
+        yielded as soon as they are complete. Only the current (incomplete)
+        record is kept in memory, memory use is independent of file size.
+
+        Notes:
+        - if a record spans a chunk boundary, more data is read and decoding
+          is repeated; the read size grows with the buffer, to avoid
+          quadratic re-decoding of records larger than chunk_size
+        - malformed records are logged and skipped, decoding continues
+          after the record's closing bracket, or at the next line
+          starting with "{" if brackets are unbalanced
+        - buffer: optional data already read from file_handle,
+          decoded first
+        """
+        if chunk_size is None:
+            chunk_size = STREAM_CHUNK_SIZE
+        pos = 0
+        eof = False
+        while True:
+            match = NOT_WHITESPACE.search(buffer, pos)
+            if not match:
+                if eof:
+                    return
+                # drop consumed data and continue with next chunk
+                buffer = file_handle.read(chunk_size)
+                pos = 0
+                if not buffer:
+                    return
+                continue
+            pos = match.start()
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except JSONDecodeError:
+                boundary = HelperFunctions._find_stacked_record_end(buffer, pos)
+                if boundary is not None or eof:
+                    # record is complete, but cannot be decoded
+                    if boundary is None:
+                        boundary = len(buffer)
+                    HelperFunctions._log_json_decodeerror(buffer[pos:boundary])
+                    pos = boundary
+                    continue
+                end = None
+            if end is None or (end == len(buffer) and not eof):
+                # record incomplete, or possibly incomplete (e.g. numbers):
+                # read more data before (re-)decoding
+                chunk = file_handle.read(max(chunk_size, len(buffer) - pos))
+                if not chunk:
+                    eof = True
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield obj
+            pos = end
+
+    @staticmethod
+    def decode_json_array_stream(
+        file_handle: IO[str], chunk_size: int = None, decoder=JSONDecoder()
+    ) -> Iterator[Any]:
+        """Decode elements of a top-level json array incrementally
+
+        Yields each element of [{json1},{json2}] as soon as it is parsed,
+        memory use is independent of file size (see decode_stacked_stream).
+
+        Notes:
+        - malformed elements and elements without a separating comma
+          are logged and skipped, decoding continues with the next element;
+          if the end of a malformed element cannot be determined (e.g.
+          unterminated strings, unbalanced brackets), decoding continues
+          at the next line starting with "{"
+        - elements larger than STREAM_MAX_ELEMENT_SIZE are skipped
+        - if the document is not an array (e.g. a single {json}),
+          it is decoded as stacked json
+        """
+        if chunk_size is None:
+            chunk_size = STREAM_CHUNK_SIZE
+        buffer = ""
+        pos = 0
+        eof = False
+        in_array = False
+        expect_separator = False
+        while True:
+            match = NOT_WHITESPACE.search(buffer, pos)
+            if not match:
+                if eof:
+                    return
+                buffer = file_handle.read(chunk_size)
+                pos = 0
+                if not buffer:
+                    return
+                continue
+            pos = match.start()
+            char = buffer[pos]
+            if not in_array:
+                if not char == "[":
+                    yield from HelperFunctions.json_read_wrapper(
+                        HelperFunctions.decode_stacked_stream(
+                            file_handle, chunk_size, decoder, buffer=buffer[pos:]
+                        )
+                    )
+                    return
+                in_array = True
+                pos += 1
+                continue
+            if char == ",":
+                expect_separator = False
+                pos += 1
+                continue
+            if char == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except JSONDecodeError as err:
+                end = None
+                error_pos = err.pos
+            if end is not None and (end < len(buffer) or eof):
+                if expect_separator:
+                    # e.g. [{json1} {json2}]
+                    HelperFunctions._log_json_decodeerror(buffer[pos:end])
+                else:
+                    yield obj
+                    expect_separator = True
+                pos = end
+                continue
+            if end is None:
+                boundary = HelperFunctions._find_json_element_end(buffer, pos)
+                resync = JSON_RESYNC.search(buffer, error_pos)
+                if resync:
+                    # the decoding error occurs before the next line
+                    # starting with "{": the element is malformed
+                    if boundary is None or resync.end() < boundary:
+                        boundary = resync.end()
+                if boundary is not None or eof:
+                    # element is complete, but cannot be decoded
+                    if boundary is None:
+                        boundary = len(buffer)
+                    HelperFunctions._log_json_decodeerror(
+                        buffer[pos:boundary].rstrip().rstrip(",")
+                    )
+                    expect_separator = False
+                    pos = boundary
+                    continue
+            if len(buffer) - pos > STREAM_MAX_ELEMENT_SIZE:
+                # element too large, or malformed without resync point
+                HelperFunctions._log_json_decodeerror(
+                    f"{buffer[pos : pos + 1000]} ... "
+                    f"(more than {STREAM_MAX_ELEMENT_SIZE} characters)"
+                )
+                expect_separator = False
+                buffer = HelperFunctions._skip_json_to_resync(file_handle, chunk_size)
+                pos = 0
+                if not buffer:
+                    return
+                continue
+            # element incomplete: read more data before (re-)decoding
+            chunk = file_handle.read(max(chunk_size, len(buffer) - pos))
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+    @staticmethod
+    def _skip_json_to_resync(file_handle: IO[str], chunk_size: int) -> str:
+        """Read file_handle up to the next line starting with "{"
+
+        Returns the remaining data of the last chunk read (starting
+        with "{"), or an empty string at the end of the file.
+        """
+        tail = ""
+        while True:
+            chunk = file_handle.read(chunk_size)
+            if not chunk:
+                return ""
+            data = tail + chunk
+            match = JSON_RESYNC.search(data)
+            if match:
+                return data[match.end() :]
+            # keep line break at the end of the chunk, e.g. "\n  "
+            tail_match = JSON_RESYNC_TAIL.search(data)
+            tail = tail_match.group() if tail_match else ""
+
+    @staticmethod
+    def _find_json_element_end(document: str, pos: int) -> Optional[int]:
+        """Return index of the comma or bracket that ends the json array
+        element starting at pos, or None if the element is incomplete
+        """
+        depth = 0
+        in_string = False
+        escaped = False
+        for idx in range(pos, len(document)):
+            char = document[idx]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+            if char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            elif char in "]}":
+                if depth == 0:
+                    return idx
+                depth -= 1
+            elif char == "," and depth == 0:
+                return idx
+        return None
+
+    @staticmethod
+    def _find_stacked_record_end(document: str, pos: int) -> Optional[int]:
+        """Return index after the end of the stacked json record starting
+        at pos, or None if the record is incomplete
+
+        The record ends with the bracket closing the top-level value, or
+        before the next line starting with "{" (e.g. unbalanced brackets,
+        or strings that are not terminated on the same line).
+        """
+        depth = 0
+        in_string = False
+        escaped = False
+        for idx in range(pos, len(document)):
+            char = document[idx]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char in '"\n':
+                    # raw line breaks are not allowed in json strings
+                    in_string = False
+                continue
+            if char == '"':
+                in_string = True
+            elif char in "[{":
+                if idx > pos and (depth == 0 or document[idx - 1] == "\n"):
+                    return idx
+                depth += 1
+            elif char in "]}":
+                depth -= 1
+                if depth <= 0:
+                    return idx + 1
+        return None
+
     @staticmethod
     def clean_null_bytes_from_str(text_str: str):
         """Remove null bytes from string for pg compatibility"""
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for decoding json records with a configurable backend.
+
+Backends:
+    - json: Python standard library (default)
+    - orjson: fast decoding to Python dicts and lists
+    - simdjson: on-demand decoding; objects are returned as read-only
+      dict-like facades (LazyJSONObject), nested values are only
+      converted to Python objects when accessed by the mapping
+
+The backend is selected once per process with set_json_backend()
+(`--json_backend`). Backends apply to single json documents, e.g.
+line separated json, json text from `--copy_input` and json columns
+of the input db. Stacked json and json arrays in files are split with
+the incremental standard library decoder.
+"""
+
+import importlib.util
+import json
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, Optional, Union
+
+from lbsntransform.tools.lazy_imports import lazy_import
+
+ORJSON_AVAIL = None
+if importlib.util.find_spec("orjson") is not None:
+    # orjson is installed, it is imported
+    # once selected as backend (see get_loads())
+    ORJSON_AVAIL = True
+
+SIMDJSON_AVAIL = None
+if importlib.util.find_spec("simdjson") is not None:
+    # pysimdjson is installed, it is imported
+    # once selected as backend (see get_loads())
+    SIMDJSON_AVAIL = True
+
+# simdjson module, once selected as backend
+simdjson = None  # pylint: disable=invalid-name
+
+JSON_BACKENDS = ("json", "orjson", "simdjson")
+DEFAULT_JSON_BACKEND = "json"
+
+
+def _wrap_value(value: Any) -> Any:
+    """Return simdjson objects as facades and arrays as lists"""
+    if isinstance(value, simdjson.Object):
+        return LazyJSONObject(value)
+    if isinstance(value, simdjson.Array):
+        return [_wrap_value(item) for item in value]
+    return value
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert facades (also nested in lists) to dicts"""
+    if isinstance(value, LazyJSONObject):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_builtin(item) for item in value]
+    return value
+
+
+class LazyJSONObject(Mapping):
+    """Read-only dict-like facade for a simdjson object
+
+    Values are converted when accessed for the first time and cached,
+    fields not read by the mapping are never converted. Facades are
+    pickled as plain dicts (e.g. to worker processes).
+    """
+
+    __slots__ = ("_json_object", "_cache")
+
+    def __init__(self, json_object):
+        self._json_object = json_object
+        self._cache = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = _wrap_value(self._json_object[key])
+        self._cache[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._cache or key in self._json_object
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._json_object.keys())
+
+    def __len__(self) -> int:
+        return len(self._json_object)
+
+    def __repr__(self) -> str:
+        return f"LazyJSONObject({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def to_dict(self) -> dict:
+        """Convert to dict (recursively)"""
+        return {key: _to_builtin(self[key]) for key in self}
+
+
+def _loads_simdjson(document: Union[str, bytes]) -> Any:
+    """Decode json document with simdjson, on demand"""
+    if isinstance(document, str):
+        document = document.encode("utf-8")
+    # a parser holds a single document, which is referenced
+    # by the facade until the record has been mapped
+    return _wrap_value(simdjson.Parser().parse(document))
+
+
+_LOADS: Callable[[Union[str, bytes]], Any] = json.loads
+_BACKEND = DEFAULT_JSON_BACKEND
+
+
+def get_loads(backend: Optional[str] = None) -> Callable[[Union[str, bytes]], Any]:
+    """Return loads() function of json backend"""
+    if backend is None:
+        backend = DEFAULT_JSON_BACKEND
+    if backend not in JSON_BACKENDS:
+        raise ValueError(
+            f"Json backend {backend} not supported, "
+            f"choose one of {', '.join(JSON_BACKENDS)}."
+        )
+    if backend == "orjson":
+        if not ORJSON_AVAIL:
+            raise ValueError(
+                "Json backend orjson requires the orjson package, "
+                "install with `pip install orjson`."
+            )
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return lazy_import("orjson").loads
+    if backend == "simdjson":
+        if not SIMDJSON_AVAIL:
+            raise ValueError(
+                "Json backend simdjson requires the pysimdjson package, "
+                "install with `pip install pysimdjson`."
+            )
+        global simdjson  # pylint: disable=global-statement,invalid-name
+        simdjson = lazy_import("simdjson")
+        return _loads_simdjson
+    return json.loads
+
+
+def set_json_backend(backend: Optional[str] = None):
+    """Select json backend of this process"""
+    global _LOADS, _BACKEND  # pylint: disable=global-statement
+    _LOADS = get_loads(backend)
+    _BACKEND = backend or DEFAULT_JSON_BACKEND
+
+
+def get_json_backend() -> str:
+    """Return name of selected json backend"""
+    return _BACKEND
+
+
+def loads(document: Union[str, bytes]) -> Any:
+    """Decode json document with selected backend
+
+    Raises json.JSONDecodeError (or ValueError) for malformed documents.
+    """
+    return _LOADS(document)
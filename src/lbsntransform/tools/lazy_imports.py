@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for deferred imports of heavy dependencies.
+
+Packages such as numpy, nltk, shapely, requests, pyarrow or psycopg2 take
+tens to hundreds of milliseconds to import. They are imported with
+lazy_import() by the code path that needs them (e.g. shapely for
+non-point geometries, requests for web sources), instead of at startup.
+
+Import times of deferred imports are recorded and reported with
+`--profile-imports`, together with the startup time of lbsntransform.
+"""
+
+import importlib
+import sys
+import time
+from types import ModuleType
+from typing import Callable, Dict, List
+
+# start of lbsntransform imports (this module is imported first)
+STARTUP_TIME = time.perf_counter()
+# heavy dependencies, reported if loaded
+PROFILED_MODULES = (
+    "lbsnstructure",
+    "numpy",
+    "psycopg2",
+    "shapely",
+    "nltk",
+    "emoji",
+    "requests",
+    "pyarrow",
+    "orjson",
+    "simdjson",
+)
+
+# seconds spent per deferred import
+IMPORT_TIMES: Dict[str, float] = {}
+_IMPORT_HOOKS: Dict[str, List[Callable[[ModuleType], None]]] = {}
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import module on first use and record import time"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = time.perf_counter() - start
+        if _IMPORT_HOOKS:
+            _run_import_hooks()
+    return module
+
+
+def _run_import_hooks():
+    """Run hooks of modules imported so far (also as dependencies)"""
+    for name in [name for name in _IMPORT_HOOKS if name in sys.modules]:
+        for hook in _IMPORT_HOOKS.pop(name):
+            hook(sys.modules[name])
+
+
+def on_import(name: str, hook: Callable[[ModuleType], None]):
+    """Run hook once module is imported with lazy_import(), also if
+    imported as a dependency, or immediately if already imported
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        hook(module)
+        return
+    _IMPORT_HOOKS.setdefault(name, []).append(hook)
+
+
+def import_report(startup_seconds: float) -> str:
+    """Return report of startup time, deferred imports and
+    heavy dependencies loaded so far
+    """
+    report_lines = [f"Startup (imports and config): {startup_seconds*1000:.0f} ms"]
+    for name, seconds in IMPORT_TIMES.items():
+        report_lines.append(f"Deferred import {name}: {seconds*1000:.0f} ms")
+    loaded = [name for name in PROFILED_MODULES if name in sys.modules]
+    not_loaded = [name for name in PROFILED_MODULES if name not in sys.modules]
+    report_lines.append(f"Loaded dependencies: {', '.join(loaded) or '-'}")
+    report_lines.append(f"Not loaded: {', '.join(not_loaded) or '-'}")
+    return "\n".join(report_lines)
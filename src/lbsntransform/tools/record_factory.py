@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for creating lbsn records of a single origin from
+pre-initialized templates.
+
+Importers create lbsn records with composite keys for every input
+record. Instead of building a temporary CompositeKey and copying it
+(HF.new_lbsn_record_with_id), records are parsed from a serialized
+template that already contains the origin, and only the id is set.
+Referenced keys (e.g. post_record.user_pkey) are assigned in place.
+
+Usage in importers (opt-in, per call site):
+    self.record_factory = LBSNRecordFactory(self.origin)
+    post_record = self.record_factory.new_record(lbsn.Post, post_guid)
+    self.record_factory.set_pkey(post_record.user_pkey, user_guid)
+"""
+
+# pylint: disable=no-member
+
+from typing import Any, Dict, Type
+
+import lbsnstructure as lbsn
+
+
+class LBSNRecordFactory:
+    """Create lbsn records and composite keys for a single origin
+
+    Records are equal to those of HF.new_lbsn_record_with_id(),
+    note that the origin is copied once (changes to the origin object
+    after initialization are not reflected).
+
+    Attributes:
+        origin      lbsn.Origin of all created keys
+    """
+
+    def __init__(self, origin: lbsn.Origin):
+        self.origin = lbsn.Origin()
+        self.origin.CopyFrom(origin)
+        self._templates: Dict[Type[Any], bytes] = {}
+
+    def _get_template(self, record_class: Type[Any]) -> bytes:
+        """Return serialized record with origin of pkey set"""
+        template = self._templates.get(record_class)
+        if template is None:
+            template_record = record_class()
+            template_record.pkey.origin.CopyFrom(self.origin)
+            template = template_record.SerializeToString()
+            self._templates[record_class] = template
+        return template
+
+    def new_record(self, record_class: Type[Any], record_id: str) -> Any:
+        """Return new lbsn record (e.g. lbsn.Post) with composite key"""
+        record = record_class.FromString(self._get_template(record_class))
+        record.pkey.id = record_id
+        return record
+
+    def set_pkey(self, pkey: lbsn.CompositeKey, record_id: str):
+        """Assign composite key field (e.g. post_record.user_pkey) in place"""
+        pkey.origin.CopyFrom(self.origin)
+        pkey.id = record_id
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for extracting text features (terms, hashtags, mentions, emoji)
+from post texts.
+
+Each text is tokenized once by scan_text() and the resulting
+TextFeatures bundle is cached. Mappings (e.g. hashtags and emoji of
+post bodies) and hll bases (e.g. term, hashtag and emoji bases) of the
+same post read from the same bundle, instead of scanning
+the text again for every feature and base.
+
+Features are identical to those of the respective helper functions:
+    - terms: HF.select_terms()
+    - hashtags: HF.extract_hashtags_from_string()
+    - mentions: HF.extract_atmentions_from_string()
+    - emoji: HF.extract_emoji()
+"""
+
+# pylint: disable=no-member
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+
+import lbsnstructure as lbsn
+
+from lbsntransform.tools.helper_functions import HelperFunctions as HF
+from lbsntransform.tools.helper_functions import PUNCTUATION_TABLE
+
+# number of texts and posts with cached features
+TEXT_CACHE_SIZE = 2**12
+# hashtags (#) and @-mentions, matched in a single pass;
+# @-mentions require 2+ characters, see HF.extract_atmentions_from_string()
+SPECIAL_PATTERN = re.compile(r"#(\w+)|@(\w{2,})")
+
+
+class TextFeatures:
+    """Features extracted from a single text or post
+
+    Attributes are immutable, since bundles are shared by all
+    consumers through the cache. Terms are filtered on first access,
+    e.g. mappings that only read emoji do not load nltk stopwords.
+
+    Attributes:
+        words       words of text, without punctuation and hyperlinks
+        tags        explicit hashtags (post.hashtags)
+        terms       filtered terms of text (body and title)
+        tag_terms   filtered terms of explicit hashtags (post.hashtags)
+        hashtags    hashtags (#) mentioned in text
+        mentions    @-mentions in text
+        emoji       distinct emoji of text (body)
+    """
+
+    __slots__ = (
+        "words",
+        "tags",
+        "hashtags",
+        "mentions",
+        "emoji",
+        "_terms",
+        "_tag_terms",
+    )
+
+    def __init__(
+        self,
+        words: Tuple[str, ...] = (),
+        tags: Tuple[str, ...] = (),
+        hashtags: FrozenSet[str] = frozenset(),
+        mentions: FrozenSet[str] = frozenset(),
+        emoji: Tuple[str, ...] = (),
+    ):
+        self.words = words
+        self.tags = tags
+        self.hashtags = hashtags
+        self.mentions = mentions
+        self.emoji = emoji
+        self._terms: Optional[FrozenSet[str]] = None
+        self._tag_terms: Optional[FrozenSet[str]] = None
+
+    @property
+    def terms(self) -> FrozenSet[str]:
+        """Filtered terms of text, see HF.select_terms()"""
+        if self._terms is None:
+            self._terms = frozenset(HF.filter_terms(self.words))
+        return self._terms
+
+    @property
+    def tag_terms(self) -> FrozenSet[str]:
+        """Filtered terms of explicit hashtags, see HF.filter_terms()"""
+        if self._tag_terms is None:
+            self._tag_terms = frozenset(HF.filter_terms(self.tags))
+        return self._tag_terms
+
+    @property
+    def all_terms(self) -> FrozenSet[str]:
+        """All terms of text and hashtags, see HF.get_all_post_terms()"""
+        return self.terms | self.tag_terms
+
+    def __repr__(self):
+        return (
+            f"TextFeatures(terms={set(self.terms)}, "
+            f"tag_terms={set(self.tag_terms)}, "
+            f"hashtags={set(self.hashtags)}, "
+            f"mentions={set(self.mentions)}, "
+            f"emoji={list(self.emoji)})"
+        )
+
+
+EMPTY_FEATURES = TextFeatures()
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def scan_text(text: str) -> TextFeatures:
+    """Tokenize text once and return (cached) features"""
+    if not text:
+        return EMPTY_FEATURES
+    hashtags = []
+    mentions = []
+    for hashtag, mention in SPECIAL_PATTERN.findall(text):
+        if hashtag:
+            hashtags.append(hashtag)
+        else:
+            mentions.append(mention)
+    terms_text = text
+    if "<" in terms_text:
+        terms_text = HF.remove_hyperlinks(terms_text)
+    terms_text = HF.sanitize_string(terms_text).translate(PUNCTUATION_TABLE)
+    # emoji are never ascii
+    emoji: Tuple[str, ...] = ()
+    if not text.isascii():
+        emoji = tuple(HF.extract_emoji(text))
+    return TextFeatures(
+        words=tuple(terms_text.split()),
+        hashtags=frozenset(hashtags),
+        mentions=frozenset(mentions),
+        emoji=emoji,
+    )
+
+
+def get_text_features(text: str) -> TextFeatures:
+    """Return features of a single text, e.g. a post body"""
+    return scan_text(text)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _get_post_features(
+    post_body: str, post_title: str, hashtags: Tuple[str, ...]
+) -> TextFeatures:
+    body_features = scan_text(post_body)
+    title_features = scan_text(post_title)
+    if title_features is EMPTY_FEATURES and not hashtags:
+        return body_features
+    return TextFeatures(
+        words=body_features.words + title_features.words,
+        tags=hashtags,
+        hashtags=body_features.hashtags | title_features.hashtags,
+        mentions=body_features.mentions | title_features.mentions,
+        emoji=body_features.emoji,
+    )
+
+
+def get_post_features(record: lbsn.Post) -> TextFeatures:
+    """Return features of post body, title and hashtags
+
+    Emoji are extracted from the post body only.
+    """
+    return _get_post_features(
+        record.post_body, record.post_title, tuple(record.hashtags)
+    )
+
@@ -0,0 +1,82 @@
+"""
+Tests for reading Parquet and Arrow IPC input.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.arrow_input import (  # type: ignore
+    PYARROW_AVAIL,
+    ArrowRecordReader,
+)
+
+if PYARROW_AVAIL:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+
+@unittest.skipUnless(PYARROW_AVAIL, "requires pyarrow")
+class TestArrowInput(unittest.TestCase):
+    """Test ArrowRecordReader"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.table = pa.table(
+            {
+                "occurrenceID": [str(i) for i in range(6)],
+                "decimalLatitude": [42.451464, None, 1.5, None, None, None],
+                "decimalLongitude": [-71.123464, None, 2.5, None, None, None],
+                "unused": ["x"] * 6,
+            }
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parquet_projection_and_filter(self):
+        """
+        Are only selected columns read, and rows/row groups
+        without coordinates skipped?
+        """
+        file_name = Path(self.tmp_dir.name) / "input.parquet"
+        pq.write_table(self.table, file_name, row_group_size=3)
+        reader = ArrowRecordReader(
+            file_name,
+            "parquet",
+            columns=["occurrenceID", "decimalLatitude"],
+            not_null_columns=["decimalLatitude", "decimalLongitude"],
+        )
+        rows = list(reader)
+        assert rows == [
+            {
+                "occurrenceID": "0",
+                "decimalLatitude": "42.451464",
+                "decimalLongitude": "-71.123464",
+            },
+            {
+                "occurrenceID": "2",
+                "decimalLatitude": "1.5",
+                "decimalLongitude": "2.5",
+            },
+        ]
+        assert reader.skipped_row_groups == 1
+        assert reader.skipped_rows == 4
+
+    def test_arrow_ipc(self):
+        """
+        Are Arrow IPC files and streams read completely?
+        """
+        for name, writer in (
+            ("input.arrow", pa.ipc.new_file),
+            ("stream.arrow", pa.ipc.new_stream),
+        ):
+            file_name = Path(self.tmp_dir.name) / name
+            with pa.OSFile(str(file_name), "wb") as sink:
+                with writer(sink, self.table.schema) as ipc_writer:
+                    ipc_writer.write_table(self.table, max_chunksize=4)
+            rows = list(ArrowRecordReader(file_name, "arrow", columns=["unused"]))
+            assert rows == [{"unused": "x"}] * 6
+
+
+if __name__ == "__main__":
+    unittest.main()
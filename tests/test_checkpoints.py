@@ -0,0 +1,30 @@
+"""
+Tests for byte offset checkpoints of local input.
+"""
+import io
+import unittest
+
+from lbsntransform.input.checkpoints import OffsetLineReader  # type: ignore
+
+
+class TestOffsetLineReader(unittest.TestCase):
+    """Test resuming line based input at byte offsets"""
+
+    def test_resume_at_offset(self):
+        """
+        Does reading continue at the offset of the last returned line,
+        is the header returned first?
+        """
+        content = "id;text\n1;Bäume\n2;zwei\r\n3;drei\n".encode("utf-8")
+        reader = OffsetLineReader(io.BytesIO(content))
+        lines = iter(reader)
+        assert [next(lines), next(lines)] == ["id;text\n", "1;Bäume\n"]
+        offset = reader.offset
+        assert offset == len("id;text\n1;Bäume\n".encode("utf-8"))
+        resumed = OffsetLineReader(io.BytesIO(content), offset=offset, header=True)
+        assert list(resumed) == ["id;text\n", "2;zwei\r\n", "3;drei\n"]
+        assert resumed.offset == len(content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Tests for reading compressed input files.
+"""
+import bz2
+import gzip
+import lzma
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.compression import (  # type: ignore
+    detect_compression,
+    open_compressed,
+)
+
+
+class TestCompressedInput(unittest.TestCase):
+    """Test detection and threaded decompression of input files"""
+
+    def test_open_compressed(self):
+        """
+        Are compressed files detected (by suffix or magic bytes)
+        and decompressed to text?
+        """
+        content = "".join(f'{{"id": {i}, "text": "Bäume"}}\n' for i in range(10000))
+        compressors = {
+            "gzip": (".gz", gzip.compress),
+            "bz2": (".bz2", bz2.compress),
+            "xz": (".xz", lzma.compress),
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for compression, (suffix, compress) in compressors.items():
+                data = compress(content.encode("utf-8"))
+                for file_name in (f"data.json{suffix}", f"{compression}.json"):
+                    file_path = Path(tmp_dir) / file_name
+                    file_path.write_bytes(data)
+                    assert detect_compression(file_path) == compression
+                    with open_compressed(file_path, compression) as file_handle:
+                        assert file_handle.read() == content
+            plain_path = Path(tmp_dir) / "plain.json"
+            plain_path.write_text(content, encoding="utf-8")
+            assert detect_compression(plain_path) is None
+            text_path = Path(tmp_dir) / "bzh.csv"
+            text_path.write_text("BZh,column\n", encoding="utf-8")
+            assert detect_compression(text_path) is None
+
+
+if __name__ == "__main__":
+    unittest.main()
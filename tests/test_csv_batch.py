@@ -0,0 +1,162 @@
+"""
+Tests for columnar batch mapping of csv records.
+"""
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input import mapping_pool  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+MAPPINGS_PATH = Path(__file__).parent.parent / "resources" / "mappings"
+
+YFCC_POST = [
+    "0",
+    "6985418911",
+    "4e2f7a26a1dfbf165a7e30bdabf7e72a",
+    "39089491@N00",
+    "gnuckx",
+    "2012-02-16 09:56:37.0",
+    "1331840483",
+    "Canon+PowerShot+ELPH+310+HS",
+    "IMG_0520",
+    "My+vacation",
+    "canon,canon+powershot+hs+310",
+    "landscape,hills,water",
+    "-81.804885",
+    "24.550558",
+    "12",
+    "http://www.flickr.com/photos/39089491@N00/6985418911/",
+    "http://farm8.staticflickr.com/7205/6985418911_df7747990d.jpg",
+    "Attribution-NonCommercial-NoDerivs License",
+    "http://creativecommons.org/licenses/by-nc-nd/2.0/",
+    "7205",
+    "8",
+    "df7747990d",
+    "692d7e0a7f",
+    "jpg",
+    "0",
+]
+
+
+def _yfcc_post(index: int, lng: str, lat: str, accuracy: str) -> list:
+    record = list(YFCC_POST)
+    record[0] = str(index)
+    record[1] = str(6985418911 + index)
+    record[12], record[13], record[14] = lng, lat, accuracy
+    return record
+
+
+class TestCsvBatch(unittest.TestCase):
+    """Test parse_csv_batch against parse_csv_record of importers"""
+
+    def _assert_batch_equal(self, origin: int, records: list):
+        importer = HF.load_importer_mapping_module(origin, MAPPINGS_PATH)
+        row_mapper = importer()
+        row_results = []
+        for record in records:
+            lbsn_records = row_mapper.parse_csv_record(record)
+            if lbsn_records:
+                row_results.extend(lbsn_records)
+        batch_mapper = importer()
+        batch_results = batch_mapper.parse_csv_batch(records)
+        assert [
+            lbsn_record.SerializeToString() for lbsn_record in batch_results
+        ] == [lbsn_record.SerializeToString() for lbsn_record in row_results]
+        assert batch_mapper.null_island == row_mapper.null_island
+        assert getattr(batch_mapper, "skipped_count", None) == getattr(
+            row_mapper, "skipped_count", None
+        )
+        return batch_mapper
+
+    def test_yfcc_batch(self):
+        """
+        Are yfcc batches mapped identical to single rows?
+        """
+        records = [
+            _yfcc_post(1, "-81.804885", "24.550558", "12"),
+            _yfcc_post(2, "", "", "Level16"),
+            _yfcc_post(3, "0", "0", "3"),
+            _yfcc_post(4, "181.0", "24.5", "Street"),
+            ["not a number", "x", "y", "z", "", "", "", "", "", "", "", "", ""],
+            ["6985418912", "24703176:Admiralty:Suburb,28350827:Hong_Kong:Timezone"],
+            _yfcc_post(5, "8.5", "47.25", "World") + ["6985418916", ""],
+            _yfcc_post(6, "+3", "1e1", "16"),
+            _yfcc_post(7, " 1_0", "1e-400", "16"),
+            _yfcc_post(8, "nan", "x", "16"),
+        ]
+        batch_mapper = self._assert_batch_equal(21, records)
+        assert batch_mapper.null_island == 4
+        assert batch_mapper.skipped_count == 1
+
+    def test_gbif_batch(self):
+        """
+        Are iNaturalist gbif batches mapped identical to single rows?
+        """
+        records = [
+            {
+                "occurrenceID": f"https://www.inaturalist.org/observations/{i}",
+                "identifiedBy": "Claire Nesterova",
+                "decimalLatitude": lat,
+                "decimalLongitude": lng,
+                "coordinateUncertaintyInMeters": meters,
+                "countryCode": "US",
+                "eventDate": "2019-10-02T11:35:00",
+                "species": "Prunella vulgaris",
+                "kingdom": "Plantae",
+                "license": "CC_BY_NC_4_0",
+            }
+            for i, (lat, lng, meters) in enumerate(
+                (
+                    ("42.451464", "-71.123464", "10.0"),
+                    ("", "", ""),
+                    ("91.2", "10", "829.0"),
+                    ("-33.9", "18.4", "31373.0"),
+                    ("12.5", "0", "n/a"),
+                    ("+3", "1e1", "10"),
+                    ("nan", "x", "10"),
+                )
+            )
+        ]
+        batch_mapper = self._assert_batch_equal(231, records)
+        assert batch_mapper.null_island == 3
+
+    def test_csv_chunks_crlf(self):
+        """
+        Are chunks of csv files with CRLF line endings mapped
+        identical to rows of the sequential reader?
+        """
+        records = [_yfcc_post(i, f"{i}.5", "47.25", "16") for i in range(1, 40)]
+        # empty line, empty last field
+        records[10] = []
+        records[20][-1] = ""
+        csv_kwargs = {"delimiter": "\t", "quotechar": '"', "quoting": csv.QUOTE_NONE}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / "yfcc.csv"
+            with open(file_path, "w", encoding="utf-8", newline="") as file_handle:
+                writer = csv.writer(file_handle, lineterminator="\r\n", **csv_kwargs)
+                writer.writerows(records)
+            row_mapper = HF.load_importer_mapping_module(21, MAPPINGS_PATH)()
+            with open(file_path, "r", encoding="utf-8") as file_handle:
+                row_results = [
+                    (lbsn_record.DESCRIPTOR.name, lbsn_record.SerializeToString())
+                    for row in csv.reader(file_handle, **csv_kwargs)
+                    if row
+                    for lbsn_record in row_mapper.parse_csv_record(row)
+                ]
+            mapping_pool._init_worker(21, MAPPINGS_PATH, {})
+            chunk_results = []
+            input_count = 0
+            for start, end in mapping_pool.iter_csv_chunks(file_path, chunk_size=2000):
+                results, __, count = mapping_pool._map_csv_chunk(
+                    str(file_path), start, end, csv_kwargs
+                )
+                chunk_results.extend(results)
+                input_count += count
+        assert input_count == len(records) - 1
+        assert chunk_results == row_results
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+Tests for joining csv records by key.
+"""
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.csv_join import CsvJoin  # type: ignore
+
+
+class TestCsvJoin(unittest.TestCase):
+    """Test keyed join of csv records with an on-disk index"""
+
+    def test_join_by_key(self):
+        """
+        Are rows joined by key, independent of order,
+        is the index reused?
+        """
+        csv_kwargs = {"delimiter": "\t", "quotechar": '"', "quoting": csv.QUOTE_NONE}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            places = Path(tmp_dir) / "places.csv"
+            places.write_text(
+                "".join(f"{i}\t{i}:Place+{i}:Town\n" for i in range(0, 500, 2))
+            )
+            csv_join = CsvJoin([places], key_column=1, csv_kwargs=csv_kwargs)
+            joined = csv_join.join(["0", "42", "user"])
+            unmatched = csv_join.join(["1", "43", "user"])
+            csv_join.close()
+            assert joined == ["0", "42", "user", "42", "42:Place+42:Town"]
+            assert unmatched == ["1", "43", "user"]
+            index_path = Path(f"{places}.idx")
+            index_mtime = index_path.stat().st_mtime_ns
+            csv_join = CsvJoin([places], key_column=0, csv_kwargs=csv_kwargs)
+            assert csv_join.join(["498"]) == ["498", "498", "498:Place+498:Town"]
+            csv_join.close()
+            assert index_path.stat().st_mtime_ns == index_mtime
+
+
+if __name__ == "__main__":
+    unittest.main()
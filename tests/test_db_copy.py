@@ -0,0 +1,90 @@
+"""
+Tests for streaming json input with COPY TO STDOUT.
+"""
+import csv
+import io
+import json
+import unittest
+
+from lbsntransform.input.db_copy import CopyStream  # type: ignore
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+
+class CopyCursor:
+    """Cursor writing csv rows to file in copy_expert(), like psycopg2"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.connection = self
+        self.rolled_back = False
+        self.sql = []
+        self.rowcount = 0
+
+    def execute(self, sql):
+        self.sql.append(sql)
+
+    def fetchall(self):
+        return []
+
+    def copy_expert(self, sql, file):
+        self.sql.append(sql)
+        for row in self.rows:
+            line = io.StringIO()
+            csv.writer(line, lineterminator="\n").writerow(row)
+            file.write(line.getvalue().encode("utf-8"))
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class TestCopyStream(unittest.TestCase):
+    """Test CopyStream"""
+
+    def test_copy_rows(self):
+        """
+        Are json texts with quotes, line breaks and non-ascii
+        characters returned unchanged?
+        """
+        rows = [
+            [str(i), json.dumps({"id": i, "text": 'a "b"\nc ü'}, indent=1)]
+            for i in range(2000)
+        ]
+        assert list(CopyStream(CopyCursor(rows), "COPY")) == rows
+
+    def test_stop_early(self):
+        """
+        Is COPY aborted if the consumer stops reading?
+        """
+        cursor = CopyCursor([[str(i), "{}"] for i in range(100000)])
+        stream = CopyStream(cursor, "COPY", queue_size=10)
+        for count, __ in enumerate(stream):
+            if count == 10:
+                break
+        stream._thread.join(timeout=5)
+        assert not stream._thread.is_alive()
+        assert cursor.rolled_back
+
+    def test_copy_input_table(self):
+        """
+        Do --copy_input and paged queries read the same json input table?
+        """
+        sql = []
+        for copy_input in (True, False):
+            cursor = CopyCursor([["1", '{"id": 1}']])
+            input_data = LoadData(
+                importer=HF.load_importer_mapping_module(0),
+                is_local_input=False,
+                cursor_input=cursor,
+                dbformat_input="json",
+                copy_input=copy_input,
+            )
+            list(input_data._process_input())
+            sql.append(" ".join(cursor.sql[0].split()))
+        assert 'FROM public."input"' in sql[0]
+        assert 'FROM public."input"' in sql[1]
+        assert "ORDER BY in_id" in sql[0] and "ORDER BY in_id" in sql[1]
+
+
+if __name__ == "__main__":
+    unittest.main()
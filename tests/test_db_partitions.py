@@ -0,0 +1,124 @@
+"""
+Tests for reading lbsn tables in parallel key ranges.
+"""
+import json
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.db_partitions import (  # type: ignore
+    PartitionedReader,
+    sample_key_ranges,
+)
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+ROWS = [
+    {"origin_id": 3, "post_guid": f"p{i:02d}", "user_guid": "u1", "post_body": "x"}
+    for i in range(30)
+]
+
+
+class KeyCursor:
+    """Dict cursor over rows of a lbsn table, answers key range queries"""
+
+    def __init__(self, rows, key_col, boundaries=None):
+        self.rows = rows
+        self.key_col = key_col
+        self.boundaries = boundaries
+        self.sql = None
+
+    def execute(self, sql):
+        self.sql = sql
+
+    def fetchone(self):
+        return (self.boundaries,)
+
+    def fetchall(self):
+        start = re.search(rf"{self.key_col} > '([^']*)'", self.sql)
+        end = re.search(rf"{self.key_col} <= '([^']*)'", self.sql)
+        limit = int(re.search(r"LIMIT (\d+)", self.sql).group(1))
+        rows = [
+            row
+            for row in self.rows
+            if (not start or row[self.key_col] > start.group(1))
+            and (not end or row[self.key_col] <= end.group(1))
+        ]
+        return rows[:limit]
+
+
+class TestPartitionedReader(unittest.TestCase):
+    """Test partitioned reads and bookmarks"""
+
+    def test_key_ranges(self):
+        """
+        Are duplicate sampled boundaries removed, are all rows
+        of all ranges returned once, in key order per range?
+        """
+        cursor = KeyCursor(ROWS, "post_guid", boundaries=["p09", "p09", "p19"])
+        key_ranges = sample_key_ranges(
+            cursor, "topical", "post", "post_guid", partitions=4
+        )
+        assert key_ranges == [(None, "p09"), ("p09", "p19"), ("p19", None)]
+        reader = PartitionedReader(
+            connect=lambda: (None, KeyCursor(ROWS, "post_guid")),
+            schema_name="topical",
+            table_name="post",
+            key_col="post_guid",
+            key_ranges=[[start, end, start] for start, end in key_ranges],
+            number_of_records_to_fetch=4,
+        )
+        keys = [record["post_guid"] for record in reader]
+        assert sorted(keys) == [row["post_guid"] for row in ROWS]
+        for start, end in key_ranges:
+            range_keys = [
+                key
+                for key in keys
+                if (not start or key > start) and (not end or key <= end)
+            ]
+            assert range_keys == sorted(range_keys)
+        last_keys = [key_range[2] for key_range in reader.key_ranges]
+        assert last_keys == ["p09", "p19", "p29"]
+
+    def test_bookmarks_after_commit(self):
+        """
+        Do bookmarks stored on commit cover converted records only,
+        not records read ahead?
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bookmarks_path = Path(tmp_dir) / "bookmarks.json"
+            input_data = LoadData(
+                importer=HF.load_importer_mapping_module(0),
+                is_local_input=False,
+                cursor_input=KeyCursor(ROWS, "post_guid", boundaries=["p09", "p19"]),
+                dbformat_input="lbsn",
+                input_partitions=3,
+                partition_bookmarks=bookmarks_path,
+                number_of_records_to_fetch=4,
+                prefetch_depth=1,
+            )
+            input_data._connect_input = lambda: (None, KeyCursor(ROWS, "post_guid"))
+            converted = []
+            with input_data as records:
+                for record in records:
+                    converted.append(record.pkey.id)
+                    if len(converted) == 12:
+                        input_data.write_checkpoint()
+                        break
+            with open(bookmarks_path, "r", encoding="utf-8") as file_handle:
+                key_ranges = json.load(file_handle)["topical.post"]
+        committed = {
+            row["post_guid"]
+            for row in ROWS
+            for start, __, last in key_ranges
+            if last is not None
+            and (start is None or row["post_guid"] > start)
+            and row["post_guid"] <= last
+        }
+        # read-ahead batches of 4 records
+        assert committed == set(converted[:8])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for streaming lbsn db input with a server-side cursor.
+"""
+import unittest
+
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+ROWS = [
+    {"origin_id": 3, "post_guid": f"p{i:02d}", "user_guid": "u1", "post_body": "x"}
+    for i in range(30)
+]
+
+
+class StreamCursor:
+    """Named cursor returning rows in batches of itersize, like psycopg2"""
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.connection.closed_cursors.append(self.name)
+
+    def execute(self, sql):
+        self.connection.queries.append((self.name, self.itersize, sql))
+
+    def __iter__(self):
+        return iter(self.connection.rows)
+
+
+class StreamConnection:
+    """Connection of input cursor, opens named cursors"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.closed_cursors = []
+        self.connection = self
+
+    def cursor(self, name=None):
+        return StreamCursor(self, name)
+
+
+class TestServerSideCursor(unittest.TestCase):
+    """Test stream_json_data_from_lbsn"""
+
+    def test_stream_lbsn_table(self):
+        """
+        Is a single query without limit executed on a named cursor,
+        with itersize of records_tofetch, and are first and last
+        keys of returned records tracked?
+        """
+        cursor = StreamConnection(ROWS)
+        input_data = LoadData(
+            importer=HF.load_importer_mapping_module(0),
+            is_local_input=False,
+            cursor_input=cursor,
+            dbformat_input="lbsn",
+            server_side_cursor=True,
+            number_of_records_to_fetch=7,
+        )
+        # first key is tracked if no start number is set
+        input_data.start_number = None
+        records = input_data.stream_json_data_from_lbsn(
+            cursor=cursor,
+            start_id="p00",
+            schema_name="topical",
+            table_name="post",
+            key_col="post_guid",
+        )
+        for count, record in enumerate(records, 1):
+            assert input_data.read_number == record["post_guid"]
+            if count == 10:
+                break
+        assert input_data.start_number == "p00"
+        assert input_data.read_number == "p09"
+        assert len(cursor.queries) == 1
+        name, itersize, sql = cursor.queries[0]
+        assert name and itersize == 7
+        sql = " ".join(sql.split())
+        assert 'FROM topical."post" WHERE post_guid > \'p00\'' in sql
+        assert "ORDER BY post_guid ASC LIMIT ALL" in sql
+        records.close()
+        assert cursor.closed_cursors == [name]
+
+
+if __name__ == "__main__":
+    unittest.main()
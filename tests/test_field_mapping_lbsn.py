@@ -0,0 +1,67 @@
+"""
+Tests for mapping lbsn raw db records.
+"""
+import datetime as dt
+import unittest
+
+import lbsnstructure as lbsn  # type: ignore
+from shapely.geometry import Point
+
+from lbsntransform.input.mappings import field_mapping_lbsn  # type: ignore
+
+# pylint: disable=no-member
+
+
+class TestFieldMappingLBSN(unittest.TestCase):
+    """Test compiled setter plans"""
+
+    def test_setter_plan(self):
+        """
+        Are columns set according to their field type, and
+        is the plan compiled once per column layout?
+        """
+        record = {
+            "origin_id": 3,
+            "post_guid": "1",
+            "user_guid": "u1",
+            "post_latlng": Point(13.7, 51.0).wkb_hex,
+            "post_body": "test",
+            "post_publish_date": dt.datetime(2020, 1, 2, 3, 4, 5),
+            "post_create_date": None,
+            "hashtags": ["a", None, "", "b"],
+            "emoji": [],
+            "post_like_count": 0,
+            "post_geoaccuracy": "place",
+            "post_language": "de",
+        }
+        post = field_mapping_lbsn.importer.get_func_record(record, "Post")
+        assert post.pkey.id == "1" and post.user_pkey.id == "u1"
+        assert post.post_latlng == "POINT (13.7 51)"
+        assert post.post_body == "test"
+        assert post.post_publish_date.ToDatetime() == record["post_publish_date"]
+        assert not post.HasField("post_create_date")
+        assert list(post.hashtags) == ["a", "b"]
+        assert not post.emoji
+        assert post.post_geoaccuracy == lbsn.Post.PLACE
+        assert post.post_language.language_short == "de"
+        plan = field_mapping_lbsn.get_setter_plan(
+            lbsn.Post.DESCRIPTOR, tuple(record)
+        )
+        assert [index for index, _ in plan] == [3, 4, 5, 6, 7, 8, 9]
+        field_mapping_lbsn.importer.get_func_record(record, "Post")
+        assert (
+            field_mapping_lbsn.get_setter_plan(lbsn.Post.DESCRIPTOR, tuple(record))
+            is plan
+        )
+        single = lbsn.Post()
+        for column in ("post_latlng", "post_body", "hashtags", "post_create_date"):
+            field_mapping_lbsn.set_lbsn_attr(
+                single, column, record, geom=column == "post_latlng"
+            )
+        assert single.post_latlng == post.post_latlng
+        assert list(single.hashtags) == ["a", "b"]
+        assert single.post_body == "test"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
 """
 Tests for command line interface (CLI).
 """
+import io
+import math
 import unittest
 
+import emoji
+from shapely import wkt
+from shapely.geometry import Point
+
 from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
 
 
@@ -41,6 +47,137 @@ class TestExtractors(unittest.TestCase):
 
         unittest.TestCase.assertSetEqual(self, result, expected_tags)
 
+    def test_emoji(self):
+        """
+        Are emoji extracted identically to the emoji package,
+        including ZWJ sequences, skin tones and flags?
+        """
+        test_bodies = [
+            "#germany🇩🇪 Family: 👨‍👩‍👧 👍🏽 ❤️ ❤ #️⃣ 🏳️‍🌈",
+            # non-RGI ZWJ sequence, skin tone without emoji
+            "👍‍🐕 🏽‍ abc 🏴󠁧󠁢󠁳󠁣󠁴󠁿 🇩",
+            "Dresden, keine Emoji",
+        ]
+        for test_body in test_bodies:
+            expected = {item["emoji"] for item in emoji.emoji_list(test_body)}
+            unittest.TestCase.assertSetEqual(
+                self, set(HF.extract_emoji(test_body)), expected
+            )
+        assert set(HF.extract_emoji(test_bodies[0])) >= {"🇩🇪", "👨‍👩‍👧", "👍🏽"}
+
+
+class TestJsonStreams(unittest.TestCase):
+    """Test incremental json decoding from HelperFunctions"""
+
+    def test_decode_stacked_stream(self):
+        """
+        Are stacked jsons decoded across chunk boundaries?
+        """
+        records = [{"id": i, "text": "x" * i} for i in range(20)]
+        stacked = "".join(f'{{"id": {r["id"]}, "text": "{r["text"]}"}}\n' for r in records)
+        # numbers at top level must not be split at chunk boundaries
+        stacked += "12345"
+        result = list(HF.decode_stacked_stream(io.StringIO(stacked), chunk_size=7))
+        assert result == records + [12345]
+
+    def test_decode_stacked_stream_malformed(self):
+        """
+        Are records before a malformed record returned?
+        """
+        stacked = '{"id": 1} {"id": 2} {"id": '
+        result = list(
+            HF.json_read_wrapper(HF.decode_stacked_stream(io.StringIO(stacked), 4))
+        )
+        assert result == [{"id": 1}, {"id": 2}]
+
+    def test_decode_stacked_stream_resync(self):
+        """
+        Are malformed records in the middle of a file skipped,
+        without reading the rest of the file into the buffer?
+        """
+        stacked = (
+            '{"id": 1}\n{"id": 2 "broken"}\n{"id": 3, "a": {"b\n{"id": 4}\n'
+            + '{"id": 5}\n' * 1000
+        )
+        file_handle = io.StringIO(stacked)
+        records = HF.decode_stacked_stream(file_handle, chunk_size=16)
+        result = [next(records) for _ in range(3)]
+        assert result == [{"id": 1}, {"id": 4}, {"id": 5}]
+        assert file_handle.tell() < 100
+        assert len(list(records)) == 999
+
+    def test_decode_json_array_stream(self):
+        """
+        Are array elements decoded across chunk boundaries,
+        are malformed elements skipped?
+        """
+        array = '[{"id": 1, "text": "a,]}"}, {"id": 2 "broken"},\n 3, [4, 5], {"id": 6}]'
+        result = list(HF.decode_json_array_stream(io.StringIO(array), chunk_size=5))
+        assert result == [{"id": 1, "text": "a,]}"}, 3, [4, 5], {"id": 6}]
+
+    def test_decode_json_array_stream_resync(self):
+        """
+        Are elements after unterminated strings and unbalanced brackets
+        returned, without buffering the rest of the file? Are elements
+        without a separating comma skipped with a warning?
+        """
+        for malformed in ('{"b":"x}', '{"b":[1,2}'):
+            array = (
+                f'[{{"a":1}},{malformed},\n{{"c":3}},\n{{"d":4}},\n'
+                + '{"e":5},\n' * 1000
+                + '{"f":6}]'
+            )
+            file_handle = io.StringIO(array)
+            elements = HF.decode_json_array_stream(file_handle, chunk_size=16)
+            with self.assertLogs("__main__", level="WARNING"):
+                result = [next(elements) for _ in range(3)]
+            assert result == [{"a": 1}, {"c": 3}, {"d": 4}]
+            assert file_handle.tell() < 200
+            assert len(list(elements)) == 1001
+        with self.assertLogs("__main__", level="WARNING"):
+            result = list(HF.decode_json_array_stream(io.StringIO('[{"a":1} {"b":2}]')))
+        assert result == [{"a": 1}]
+
+    def test_decode_json_array_stream_single_object(self):
+        """
+        Is a single top-level object returned as one record?
+        """
+        result = list(HF.decode_json_array_stream(io.StringIO(' {"id": 1}\n')))
+        assert result == [{"id": 1}]
+
+    def test_point_geometries(self):
+        """
+        Are points decoded without shapely, with the same
+        WKT and coordinates as with shapely?
+        """
+        for lng, lat in ((13.7, 51.0), (-0.30000000000000004, 0.03691750689350215)):
+            point = Point(lng, lat)
+            geom_wkt = HF.point_to_wkt(*HF.decode_wkb_point(point.wkb_hex))
+            assert geom_wkt == point.wkt
+            coordinates = HF.get_coordinates_from_ewkt(f"SRID=4326;{geom_wkt}")
+            point = wkt.loads(geom_wkt)
+            assert (coordinates.lng, coordinates.lat) == (point.x, point.y)
+        for lng in (1e16, -1.5e17, 1e300, 1e-20, math.inf, -math.inf, math.nan):
+            assert HF.point_to_wkt(lng, 0) == Point(lng, 0).wkt
+        assert HF.decode_wkb_point(HF.NULL_GEOM_HEX) == (0, 0)
+        assert HF.decode_wkb_point(Point(1, 2, 3).wkb_hex) is None
+
+    def test_point_ewkb(self):
+        """
+        Are points encoded as EWKB with SRID 4326,
+        as other geometries with shapely?
+        """
+        assert HF.return_ewkb_from_geotext("POINT(0 0)") == HF.NULL_GEOM_HEX
+        ewkb_hex = HF.return_ewkb_from_geotext("POINT(13.7 51.0)")
+        assert ewkb_hex == "0101000020E61000006666666666662B400000000000804940"
+        assert HF.decode_wkb_point(ewkb_hex) == (13.7, 51.0)
+        for geom_wkt in ("POINT(-0 1)", "POINT(0 1)", "POINT(1 -0)", "POINT(1 0)"):
+            assert HF.return_ewkb_from_geotext(geom_wkt) == HF.geom_to_ewkb_hex(
+                wkt.loads(geom_wkt)
+            )
+        polygon_hex = HF.return_ewkb_from_geotext("POLYGON((0 0, 1 0, 1 1, 0 0))")
+        assert polygon_hex.startswith("0103000020E6100000")
+
 
 if __name__ == "__main__":
     unittest.main()
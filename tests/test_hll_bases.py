@@ -0,0 +1,53 @@
+"""
+Tests for extracting hll bases and metrics from lbsn records.
+"""
+import datetime as dt
+import unittest
+
+import lbsnstructure as lbsn  # type: ignore
+
+from lbsntransform.output.hll import hll_bases  # type: ignore
+from lbsntransform.output.hll.shared_structure_proto_hlldb import (  # type: ignore
+    ProtoHLLMapping,
+)
+
+# pylint: disable=no-member
+
+
+class TestHllBases(unittest.TestCase):
+    """Test hll bases of posts"""
+
+    def test_record_context(self):
+        """
+        Are derived values of a post computed once and shared
+        by all bases and metrics?
+        """
+        hll_bases.register_classes()
+        record = lbsn.Post(
+            post_latlng="POINT (13.7 51)",
+            post_geoaccuracy=lbsn.Post.LATLNG,
+            post_body="Dresden",
+        )
+        record.pkey.id = "1"
+        record.pkey.origin.origin_id = 3
+        record.user_pkey.id = "u1"
+        record.post_publish_date.FromDatetime(dt.datetime(2020, 1, 2, 3, 4, 5))
+        mapping = ProtoHLLMapping(
+            include_lbsn_bases=["latlng", "date", "_month_latlng", "_term_latlng"]
+        )
+        bases = mapping.extract_hll_base_metrics(record, lbsn.Post.DESCRIPTOR.name)
+        context = hll_bases.get_record_context(record)
+        assert context.post_date == "2020-01-02"
+        assert "coordinates" in vars(context) and "user_hll" in vars(context)
+        keys = {base.NAME.base: base.get_key_value() for base in bases}
+        assert keys["latlng"] == (51.0, 13.7)
+        assert keys["date"] == (dt.date(2020, 1, 2),)
+        assert keys["_month_latlng"] == (2020, 1, 51.0, 13.7)
+        assert keys["_term_latlng"] == (51.0, 13.7, "dresden")
+        assert all(base.metrics["user_hll"] == {"3:u1"} for base in bases)
+        assert bases[0].metrics["pud_hll"] == {"3:u1:2020-01-02"}
+        assert hll_bases.get_record_context(lbsn.Post()) is not context
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for decoding json with configurable backends.
+"""
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+from lbsntransform.tools.json_backend import (  # type: ignore
+    ORJSON_AVAIL,
+    SIMDJSON_AVAIL,
+    get_loads,
+    set_json_backend,
+)
+
+MAPPINGS_PATH = Path(__file__).parent.parent / "resources" / "mappings"
+CREATED_AT = "Wed Oct 10 20:19:24 +0000 2018"
+USER = {
+    "id_str": "u1",
+    "screen_name": "user1",
+    "name": "User",
+    "description": "bio",
+    "lang": "en",
+    "location": "",
+    "protected": False,
+    "followers_count": 3,
+    "friends_count": 2,
+    "listed_count": 1,
+    "statuses_count": 9,
+    "favourites_count": 4,
+    "profile_image_url": "http://example.com/user1.png",
+    "created_at": CREATED_AT,
+}
+RECORDS = [
+    {
+        "id_str": str(i),
+        "created_at": CREATED_AT,
+        "text": "test #a ü",
+        "lang": "en",
+        "source": "<a>web</a>",
+        "truncated": False,
+        "quote_count": 0,
+        "reply_count": 0,
+        "retweet_count": 1,
+        "favorite_count": 2,
+        "user": USER,
+        "entities": {"hashtags": [{"text": "a"}], "user_mentions": [], "urls": []},
+        "coordinates": {"type": "Point", "coordinates": [13.7, 51.0]},
+        "place": None,
+    }
+    for i in range(50)
+]
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Test json backends"""
+
+    def tearDown(self):
+        set_json_backend(None)
+
+    def _map_line_separated(self, json_backend=None):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lines = [json.dumps(record) for record in RECORDS]
+            # malformed record is skipped
+            lines.insert(10, '{"id_str": "x", "user": ')
+            (Path(tmp_dir) / "input.json").write_text(
+                "\n".join(lines), encoding="utf-8"
+            )
+            input_data = LoadData(
+                importer=HF.load_importer_mapping_module(3, MAPPINGS_PATH),
+                is_local_input=True,
+                input_path=Path(tmp_dir),
+                local_file_type="json",
+                is_line_separated_json=True,
+                json_backend=json_backend,
+            )
+            with input_data as records:
+                return [record.SerializeToString() for record in records]
+
+    @unittest.skipUnless(ORJSON_AVAIL, "requires orjson")
+    def test_orjson_records_equal(self):
+        """
+        Are records decoded with orjson mapped identically?
+        """
+        records = self._map_line_separated()
+        # user and post per tweet
+        assert len(records) == 2 * len(RECORDS)
+        assert self._map_line_separated("orjson") == records
+
+    @unittest.skipUnless(SIMDJSON_AVAIL, "requires pysimdjson")
+    def test_simdjson_records_equal(self):
+        """
+        Are records decoded on demand with simdjson mapped identically?
+        """
+        records = self._map_line_separated()
+        assert self._map_line_separated("simdjson") == records
+
+    @unittest.skipUnless(SIMDJSON_AVAIL, "requires pysimdjson")
+    def test_simdjson_facade(self):
+        """
+        Does the simdjson facade behave like a dict,
+        also after pickling?
+        """
+        document = json.dumps({"a": {"b": [1, {"c": None}]}, "d": "ü"})
+        record = get_loads("simdjson")(document)
+        assert "a" in record and "x" not in record
+        assert record.get("x", 1) == 1
+        assert record["a"]["b"][1].get("c") is None
+        assert pickle.loads(pickle.dumps(record)) == json.loads(document)
+
+    def test_unknown_backend(self):
+        """
+        Are unknown backends rejected?
+        """
+        with self.assertRaises(ValueError):
+            set_json_backend("ujson")
+
+
+if __name__ == "__main__":
+    unittest.main()
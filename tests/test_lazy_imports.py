@@ -0,0 +1,52 @@
+"""
+Tests for deferred imports of heavy dependencies.
+"""
+import subprocess
+import sys
+import unittest
+
+from lbsntransform.tools import lazy_imports  # type: ignore
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test lazy_import() and import hooks"""
+
+    def test_import_hooks(self):
+        """
+        Are hooks run once a module is imported,
+        and are deferred imports reported?
+        """
+        hooked = []
+        sys.modules.pop("colorsys", None)
+        lazy_imports.on_import("colorsys", hooked.append)
+        assert not hooked
+        module = lazy_imports.lazy_import("colorsys")
+        assert hooked == [module]
+        assert lazy_imports.lazy_import("colorsys") is module
+        lazy_imports.on_import("colorsys", hooked.append)
+        assert hooked == [module, module]
+        report = lazy_imports.import_report(0.1)
+        assert "Startup (imports and config): 100 ms" in report
+        assert "Deferred import colorsys" in report
+
+    def test_startup_imports(self):
+        """
+        Are numpy and optional json backends not loaded on startup?
+        """
+        modules = ("numpy", "orjson", "simdjson")
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, lbsntransform.__main__; "
+                f"print(*[name for name in {modules} if name in sys.modules])",
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.split()
+        assert not loaded
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for mapping records in worker processes.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.input.mapping_pool import iter_csv_chunks  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+
+class TestMappingPool(unittest.TestCase):
+    """Test parallel mapping in LoadData.convert_records"""
+
+    def test_workers_preserve_order(self):
+        """
+        Are records mapped in workers identical and in input order?
+        """
+        importer = HF.load_importer_mapping_module(0)
+        records = [
+            ({"origin_id": 3, "post_guid": str(i), "post_body": "test"}, "Post")
+            for i in range(1234)
+        ]
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            (Path(tmp_dir) / "input.json").write_text("[]")
+            for workers in (None, 3):
+                input_data = LoadData(
+                    importer=importer,
+                    is_local_input=True,
+                    input_path=Path(tmp_dir),
+                    local_file_type="json",
+                    workers=workers,
+                    origin=0,
+                )
+                lbsn_records = list(input_data.convert_records(iter(records)))
+                assert input_data.count_glob == len(records)
+                results[workers] = [
+                    lbsn_record.SerializeToString() for lbsn_record in lbsn_records
+                ]
+        assert len(results[3]) == len(records)
+        assert results[None] == results[3]
+
+    def test_csv_chunks_aligned(self):
+        """
+        Are csv byte ranges aligned to line endings and complete?
+        """
+        content = b"".join(b"%d\tvalue %d\n" % (i, i * 7) for i in range(1000))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / "input.csv"
+            file_path.write_bytes(content)
+            chunks = list(iter_csv_chunks(file_path, chunk_size=100))
+            resumed = list(iter_csv_chunks(file_path, chunk_size=100, offset=12))
+        assert len(chunks) > 1
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(content)
+        for (__, end), (start, __) in zip(chunks, chunks[1:]):
+            assert end == start and content[end - 1 : end] == b"\n"
+        assert resumed[0][0] == 12
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for length-delimited protobuf archives.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import lbsnstructure as lbsn  # type: ignore
+
+from lbsntransform.input.load_data import LoadData  # type: ignore
+from lbsntransform.output.proto.store_proto import LBSNProtoStream  # type: ignore
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+
+# pylint: disable=no-member
+
+
+def _new_post(post_guid: str) -> lbsn.Post:
+    origin = lbsn.Origin()
+    origin.origin_id = lbsn.Origin.FLICKR
+    post_record = HF.new_lbsn_record_with_id(lbsn.Post(), post_guid, origin)
+    post_record.post_body = "test " * 50
+    post_record.hashtags.extend(["a", "b"])
+    return post_record
+
+
+class TestProtoStream(unittest.TestCase):
+    """Test archive output and input"""
+
+    def test_archive_roundtrip(self):
+        """
+        Are archived records read back unchanged, also if
+        archives are continued in a second run?
+        """
+        posts = [_new_post(str(i)) for i in range(300)]
+        user = HF.new_lbsn_record_with_id(lbsn.User(), "u1", posts[0].pkey.origin)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for part in (posts[:100], posts[100:]):
+                archive = LBSNProtoStream(Path(tmp_dir))
+                for post_record in part:
+                    archive.store_record(post_record, lbsn.Post.DESCRIPTOR.name)
+                archive.store_record(user, lbsn.User.DESCRIPTOR.name)
+                archive.close()
+            assert sorted(path.name for path in Path(tmp_dir).iterdir()) == [
+                "Post.lbsnproto",
+                "User.lbsnproto",
+            ]
+            input_data = LoadData(
+                importer=HF.load_importer_mapping_module(0),
+                is_local_input=True,
+                input_path=Path(tmp_dir),
+                local_file_type="lbsnproto",
+            )
+            with input_data as records:
+                lbsn_records = list(records)
+        posts_read = [
+            record for record in lbsn_records if isinstance(record, lbsn.Post)
+        ]
+        users_read = [
+            record for record in lbsn_records if isinstance(record, lbsn.User)
+        ]
+        assert posts_read == posts
+        assert users_read == [user, user]
+        assert input_data.count_glob == 302
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for reading input ahead of processing.
+"""
+import sys
+import unittest
+
+from lbsntransform.input.read_ahead import ReadAhead  # type: ignore
+
+
+class TestReadAhead(unittest.TestCase):
+    """Test background read-ahead of input records"""
+
+    def test_read_ahead_order(self):
+        """
+        Are all records returned in order?
+        """
+        read_ahead = ReadAhead(iter(range(2500)), depth=2, batch_size=100)
+        assert list(read_ahead) == list(range(2500))
+
+    def test_read_ahead_exception(self):
+        """
+        Are records before an input error returned, is the error raised?
+        """
+
+        def failing_source():
+            yield from range(10)
+            raise ValueError("connection lost")
+
+        records = []
+        with self.assertRaises(ValueError):
+            for record in ReadAhead(failing_source(), depth=1, batch_size=3):
+                records.append(record)
+        assert records == list(range(10))
+
+    def test_read_ahead_exit(self):
+        """
+        Is SystemExit of the source raised in the consuming thread,
+        instead of blocking the consumer?
+        """
+
+        def exiting_source():
+            yield from range(5)
+            sys.exit("stream broken")
+
+        with self.assertRaises(SystemExit):
+            list(ReadAhead(exiting_source(), depth=1, batch_size=2))
+
+    def test_read_ahead_position(self):
+        """
+        Is the read position of the last batch handed over returned,
+        not the position read ahead?
+        """
+        read_position = {"key": 0}
+
+        def source():
+            for key in range(1, 10):
+                read_position["key"] = key
+                yield key
+
+        read_ahead = ReadAhead(
+            source(), depth=2, batch_size=3, get_position=lambda: read_position["key"]
+        )
+        positions = []
+        for record in read_ahead:
+            positions.append((record, read_ahead.position))
+        assert positions[:4] == [(1, 0), (2, 0), (3, 0), (4, 3)]
+        assert read_ahead.position == 9
+
+
+if __name__ == "__main__":
+    unittest.main()
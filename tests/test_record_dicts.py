@@ -0,0 +1,42 @@
+"""
+Tests for collecting and merging lbsn records.
+"""
+import unittest
+
+import lbsnstructure as lbsn  # type: ignore
+
+from lbsntransform.output.shared_structure import LBSNRecordDicts  # type: ignore
+
+# pylint: disable=no-member
+
+
+class TestMergeRecords(unittest.TestCase):
+    """Test merge of duplicate lbsn records"""
+
+    def test_merge_duplicates(self):
+        """
+        Are updates of duplicates merged, also if the serialized
+        records have the same length, and repeated fields as sets?
+        """
+        record_dicts = LBSNRecordDicts()
+        records = []
+        for post_body, hashtag, mentions in (
+            ("aa", "b", ["u1"]),
+            ("bb", "a", ["u2", "u1"]),
+        ):
+            record = lbsn.Post(post_body=post_body)
+            record.pkey.id = "1"
+            record.hashtags.extend([hashtag, "c", hashtag])
+            for mention in mentions:
+                record.user_mentions_pkey.add().id = mention
+            records.append(record)
+        record_dicts.add_records_to_dict(records)
+        merged = record_dicts.lbsn_post_dict["1"]
+        assert merged.post_body == "bb"
+        assert list(merged.hashtags) == ["a", "b", "c"]
+        assert [pkey.id for pkey in merged.user_mentions_pkey] == ["u1", "u2"]
+        assert record_dicts.count_glob == 1 and record_dicts.count_dup_merge == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
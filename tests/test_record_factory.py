@@ -0,0 +1,37 @@
+"""
+Tests for creating lbsn records from templates.
+"""
+import unittest
+
+import lbsnstructure as lbsn  # type: ignore
+
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+from lbsntransform.tools.record_factory import LBSNRecordFactory  # type: ignore
+
+# pylint: disable=no-member
+
+
+class TestRecordFactory(unittest.TestCase):
+    """Test LBSNRecordFactory"""
+
+    def test_records_equal(self):
+        """
+        Are records and keys equal to those of HF.new_lbsn_record_with_id,
+        and independent of each other?
+        """
+        origin = lbsn.Origin()
+        origin.origin_id = lbsn.Origin.TWITTER
+        factory = LBSNRecordFactory(origin)
+        for record_class in (lbsn.Post, lbsn.User, lbsn.Place, lbsn.Country):
+            record = factory.new_record(record_class, "1")
+            assert record == HF.new_lbsn_record_with_id(record_class(), "1", origin)
+        post_record = factory.new_record(lbsn.Post, "2")
+        post_record.pkey.origin.name = "changed"
+        factory.set_pkey(post_record.user_pkey, "u1")
+        user_record = HF.new_lbsn_record_with_id(lbsn.User(), "u1", origin)
+        assert post_record.user_pkey == user_record.pkey
+        assert factory.new_record(lbsn.Post, "3").pkey.origin == origin
+
+
+if __name__ == "__main__":
+    unittest.main()
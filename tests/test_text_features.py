@@ -0,0 +1,45 @@
+"""
+Tests for extracting text features of posts.
+"""
+import unittest
+
+import lbsnstructure as lbsn  # type: ignore
+
+from lbsntransform.tools.helper_functions import HelperFunctions as HF  # type: ignore
+from lbsntransform.tools.text_features import (  # type: ignore
+    get_post_features,
+    get_text_features,
+)
+
+# pylint: disable=no-member
+
+
+class TestTextFeatures(unittest.TestCase):
+    """Test text feature bundles"""
+
+    def test_features_equal(self):
+        """
+        Are features equal to those of the individual helper functions,
+        and cached per post?
+        """
+        post_body = (
+            'Visiting <a href="https://example.com">Dresden</a>, '
+            "#germany🇩🇪 #Elbe_river with @user_1 @x, it's 2020! 👍🏽👨‍👩‍👧"
+        )
+        post_record = lbsn.Post(
+            post_body=post_body, post_title="Dresden Trip", hashtags=["Elbe", "de"]
+        )
+        features = get_post_features(post_record)
+        assert features.all_terms == HF.get_all_post_terms(post_record)
+        assert features.tag_terms == {"elbe"}
+        body_features = get_text_features(post_body)
+        assert body_features.hashtags == {"germany", "Elbe_river"}
+        assert body_features.hashtags == HF.extract_hashtags_from_string(post_body)
+        assert body_features.mentions == HF.extract_atmentions_from_string(post_body)
+        assert set(features.emoji) == set(HF.extract_emoji(post_body))
+        assert get_post_features(post_record) is features
+        assert get_text_features("").terms == set()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for resumable web input streams.
+"""
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lbsntransform.input.web_stream import ResumableHTTPStream  # type: ignore
+
+CONTENT = b"".join(b"%d\tline %d\n" % (i, i) for i in range(5000))
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serve CONTENT with Range support, break the first response"""
+
+    requests_served = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send content from requested offset"""
+        RangeHandler.requests_served += 1
+        offset = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            offset = int(range_header.split("=")[1].rstrip("-"))
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        body = CONTENT[offset:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if RangeHandler.requests_served == 1:
+            # drop connection in the middle of a line
+            self.wfile.write(body[: len(body) // 3])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestResumableHTTPStream(unittest.TestCase):
+    """Test reconnect of broken web streams"""
+
+    def test_resume_broken_stream(self):
+        """
+        Are all lines returned once, after the stream broke?
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/data.csv"
+            stream = ResumableHTTPStream(url, chunk_size=1000, retry_backoff=0)
+            lines = list(stream.iter_lines())
+        finally:
+            server.shutdown()
+        assert RangeHandler.requests_served == 2
+        assert lines == CONTENT.splitlines()
+        assert stream.offset == len(CONTENT)
+
+    def test_retry_failed_reconnect(self):
+        """
+        Is a failed reconnect (server error) retried, is an offset
+        at the end of the source (HTTP 416) treated as end of stream?
+        """
+
+        class FailingHandler(RangeHandler):
+            """Answer the first request with a server error"""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                if RangeHandler.requests_served == 0:
+                    RangeHandler.requests_served += 1
+                    self.send_error(503)
+                    return
+                offset = int(self.headers.get("Range", "=0").split("=")[1].rstrip("-"))
+                if offset >= len(CONTENT):
+                    self.send_error(416)
+                    return
+                # second request, not broken
+                super().do_GET()
+
+        RangeHandler.requests_served = 0
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FailingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/data.csv"
+            stream = ResumableHTTPStream(url, offset=100, retry_backoff=0)
+            lines = list(stream.iter_lines())
+            end_stream = ResumableHTTPStream(url, offset=len(CONTENT))
+            assert not list(end_stream.iter_lines())
+        finally:
+            server.shutdown()
+        assert lines == CONTENT[100:].splitlines()
+        assert stream.offset == len(CONTENT)
+
+
+if __name__ == "__main__":
+    unittest.main()